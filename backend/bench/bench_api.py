@@ -0,0 +1,263 @@
+"""
+Load test / benchmark for the /agent API against the stub LLM backend.
+
+Drives the full question flow and JD generation for many concurrent
+sessions, in-process through the ASGI app (no network, no Gemini spend),
+against SQLite by default or any DATABASE_URL (e.g. a local Postgres).
+
+    python bench/bench_api.py --sessions 200 --concurrency 50
+    python bench/bench_api.py --update-baseline
+    python bench/bench_api.py --database-url postgresql://localhost/jd_bench
+
+Exits non-zero when throughput or latency regresses past the stored
+baseline. JD throughput and latency are compared as ratios to what the
+stub's own latency allows, so a baseline recorded on one machine holds
+on another; each metric has its own tolerance (--tolerance overrides).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Metrics compared against the baseline: (worse direction, relative
+# tolerance, absolute slack so near-zero baselines don't flap).
+CHECKS = {
+    # Relative to the stub latency: machine independent.
+    "jd_throughput_ratio": ("lower", 0.25, 0.0),
+    "jd_p95_ratio": ("higher", 0.25, 0.05),
+    "jd_p99_ratio": ("higher", 0.25, 0.05),
+    "retries_per_jd": ("higher", 0.25, 0.05),
+    # Pure app time with nothing to normalize by, so it varies with the
+    # machine: only a blowup fails.
+    "question_p95_ms": ("higher", 2.0, 1.0),
+}
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def stub_latency(spec: str, seed: int, samples: int = 20000) -> dict:
+    """Mean and tail of the stub's latency alone, in ms: the floor for a JD."""
+    from llm.fake import parse_latency
+
+    sample, rng = parse_latency(spec), random.Random(seed)
+    values = [sample(rng) for _ in range(samples)]
+    return {
+        "mean_ms": sum(values) / samples * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+    }
+
+
+def configure_env(args):
+    """Must run before the app is imported: its singletons are built from get_settings()."""
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["LLM_BACKENDS"] = "stub"
+    os.environ["LLM_PREWARM"] = "false"
+    os.environ["FAKE_LLM_LATENCY"] = args.latency
+    os.environ["FAKE_LLM_FAILURE_RATE"] = str(args.failure_rate)
+    os.environ["FAKE_LLM_MALFORMED_RATE"] = str(args.malformed_rate)
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+    # Every session is unique anyway; keep the cache out of the numbers.
+    os.environ["JD_CACHE_MAX_ENTRIES"] = "0"
+    # The stub has no provider quota to respect.
+    os.environ.setdefault("LLM_RPM", "1000000")
+    os.environ.setdefault("LLM_TPM", "1000000000")
+    os.environ.setdefault("LLM_INITIAL_CONCURRENCY", "1000")
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", "1000")
+
+
+def llm_calls(stats: dict) -> int:
+    if "backends" in stats:
+        return sum(b.get("calls", 0) for b in stats["backends"].values())
+    return stats.get("calls", 0)
+
+
+async def run_session(client, index, questions, timings):
+    employee_id = str(uuid.uuid4())
+    jd_session_id = str(uuid.uuid4())
+    url = f"/agent/chat/{employee_id}/{jd_session_id}"
+    qa = []
+
+    for question in questions + [None]:
+        started = time.perf_counter()
+        response = await client.post(url, json={"qa": qa})
+        elapsed = time.perf_counter() - started
+
+        if response.status_code >= 500:
+            # e.g. every retry came back malformed; count it, keep going
+            timings["errors"] += 1
+            return
+        response.raise_for_status()
+
+        if question is None:
+            timings["jd"].append(elapsed)
+            return
+
+        timings["question"].append(elapsed)
+        answer = (
+            f"Role {index}" if question["field"] == "job_title"
+            else ["a", "b"] if question["input_type"] == "array"
+            else "answer"
+        )
+        qa.append({"field": question["field"], "answer": answer})
+
+
+def instrument_db_time(engine, db_time: list):
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._bench_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        db_time[0] += time.perf_counter() - context._bench_started
+
+    # COMMIT (and its fsync) is not a cursor execute; time it at the dialect.
+    do_commit = engine.dialect.do_commit
+
+    def timed_commit(dbapi_connection):
+        started = time.perf_counter()
+        try:
+            do_commit(dbapi_connection)
+        finally:
+            db_time[0] += time.perf_counter() - started
+
+    engine.dialect.do_commit = timed_commit
+
+
+async def run(args) -> dict:
+    import httpx
+
+    import main
+    from databases.database import get_async_engine, get_engine
+    from databases.migrate import upgrade_db
+    from llm.registry import get_llm
+    from routes.chat_routes import QUESTIONS
+
+    upgrade_db()
+
+    db_time = [0.0]
+
+    # Request handlers use the async engine, batch/cache helpers the sync one.
+    for sync_engine in (get_engine(), get_async_engine().sync_engine):
+        instrument_db_time(sync_engine, db_time)
+
+    timings = {"question": [], "jd": [], "errors": 0}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def bounded(i):
+            async with semaphore:
+                await run_session(client, i, QUESTIONS, timings)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(bounded(i) for i in range(args.sessions)))
+        wall = time.perf_counter() - started
+
+    requests = len(timings["question"]) + len(timings["jd"]) + timings["errors"]
+    jds = len(timings["jd"])
+    calls = llm_calls(get_llm().stats())
+    stub = stub_latency(args.latency, args.seed)
+    jd_p95_ms = percentile(timings["jd"], 95) * 1000
+    jd_p99_ms = percentile(timings["jd"], 99) * 1000
+    # With every session waiting on the stub, at most `concurrency` JDs
+    # complete per mean stub latency.
+    ideal_jd_per_sec = args.concurrency / (stub["mean_ms"] / 1000) if stub["mean_ms"] else 0.0
+
+    return {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "requests": requests,
+        "wall_seconds": round(wall, 3),
+        "requests_per_sec": round(requests / wall, 2),
+        "jd_per_sec": round(jds / wall, 2),
+        "question_p50_ms": round(percentile(timings["question"], 50) * 1000, 2),
+        "question_p95_ms": round(percentile(timings["question"], 95) * 1000, 2),
+        "jd_p50_ms": round(percentile(timings["jd"], 50) * 1000, 2),
+        "jd_p95_ms": round(jd_p95_ms, 2),
+        "jd_p99_ms": round(jd_p99_ms, 2),
+        "jd_throughput_ratio": round(jds / wall / ideal_jd_per_sec, 3) if ideal_jd_per_sec else 0.0,
+        "jd_p95_ratio": round(jd_p95_ms / stub["p95_ms"], 3) if stub["p95_ms"] else 0.0,
+        "jd_p99_ratio": round(jd_p99_ms / stub["p99_ms"], 3) if stub["p99_ms"] else 0.0,
+        "failed_jds": timings["errors"],
+        "retries_per_jd": round((calls - jds) / jds, 3) if jds else 0.0,
+        "db_ms_per_request": round(db_time[0] / requests * 1000, 3) if requests else 0.0,
+    }
+
+
+def regressions(result: dict, baseline: dict, tolerance: float = None) -> list:
+    failures = []
+    for key, (worse, relative, slack) in CHECKS.items():
+        if key not in baseline:
+            continue
+        relative = relative if tolerance is None else tolerance
+        if worse == "lower" and result[key] < baseline[key] * (1 - relative) - slack:
+            failures.append(f"{key}: {result[key]} < baseline {baseline[key]}")
+        if worse == "higher" and result[key] > baseline[key] * (1 + relative) + slack:
+            failures.append(f"{key}: {result[key]} > baseline {baseline[key]}")
+    return failures
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", default="lognormal:-1.6,0.5",
+                        help="stub LLM latency spec, see llm.fake.parse_latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None,
+                        help="defaults to a throwaway SQLite file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="relative tolerance for every metric; default: per metric")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{tmpdir.name}/bench.db"
+
+    # The app loads prompts relative to the backend directory.
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, str(BACKEND_DIR))
+    configure_env(args)
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("No baseline stored; run with --update-baseline to create one.")
+        return 0
+
+    failures = regressions(result, json.loads(args.baseline.read_text()), args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,172 @@
+"""
+Benchmark for the approve-path lookup on a seeded job_descriptions table.
+
+Seeds --rows JDs spread over employees and sessions, then times the
+approval lookup (latest JD for an employee's session) with the lookup
+indexes in place and again after dropping them, and prints the query plan
+for both. Runs against a throwaway SQLite file by default.
+
+    python bench/bench_approve.py --rows 1000000
+    python bench/bench_approve.py --database-url postgresql://localhost/jd_bench
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+LOOKUP_INDEXES = ("ix_jd_employee_session_created", "ix_jd_status")
+
+
+def seed(engine, rows: int, sessions_per_employee: int, seed_value: int):
+    from models.model import JobDescription
+
+    rng = random.Random(seed_value)
+    employees = [uuid.uuid4() for _ in range(max(1, rows // (sessions_per_employee * 2)))]
+    sessions = [(e, uuid.uuid4()) for e in employees for _ in range(sessions_per_employee)]
+    started_at = datetime(2024, 1, 1)
+
+    batch = []
+    with engine.begin() as connection:
+        for i in range(rows):
+            employee_id, jd_session_id = rng.choice(sessions)
+            batch.append({
+                "id": uuid.uuid4(),
+                "employee_id": employee_id,
+                "jd_session_id": jd_session_id,
+                "jd_json": {"job_title": f"Role {i}"},
+                "payload_hash": f"{i:064x}",
+                "status": rng.choice(("generated", "generated", "approved")),
+                "created_at": started_at + timedelta(seconds=i),
+            })
+            if len(batch) == 10000:
+                connection.execute(JobDescription.__table__.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(JobDescription.__table__.insert(), batch)
+
+    return sessions
+
+
+def approve_lookups() -> dict:
+    """The two approval queries: by employee + session (route), by employee (crud)."""
+    from sqlalchemy import bindparam, select
+
+    from models.model import JobDescription
+
+    by_employee = JobDescription.employee_id == bindparam("employee_id")
+    latest = JobDescription.created_at.desc()
+    return {
+        "session": (
+            select(JobDescription.id)
+            .where(by_employee, JobDescription.jd_session_id == bindparam("jd_session_id"))
+            .order_by(latest)
+            .limit(1)
+        ),
+        "employee": select(JobDescription.id).where(by_employee).order_by(latest).limit(1),
+    }
+
+
+def query_plan(engine, stmt, params) -> list:
+    """EXPLAIN the statement as the driver receives it, parameters included."""
+    from sqlalchemy import event
+
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+
+    with engine.connect() as connection:
+        captured = []
+
+        @event.listens_for(connection, "before_cursor_execute")
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            captured.append((statement, parameters))
+
+        connection.execute(stmt, params).first()
+        statement, parameters = captured[-1]
+        rows = connection.exec_driver_sql(prefix + statement, parameters).fetchall()
+    return [" ".join(str(col) for col in row) for row in rows]
+
+
+def time_lookups(engine, sessions, lookups: int, seed_value: int) -> dict:
+    results = {}
+    for name, stmt in approve_lookups().items():
+        rng = random.Random(seed_value)
+        timings = []
+
+        with engine.connect() as connection:
+            for _ in range(lookups):
+                employee_id, jd_session_id = rng.choice(sessions)
+                params = {"employee_id": employee_id, "jd_session_id": jd_session_id}
+                started = time.perf_counter()
+                connection.execute(stmt, params).first()
+                timings.append((time.perf_counter() - started) * 1000)
+
+        employee_id, jd_session_id = sessions[0]
+        timings.sort()
+        results[name] = {
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 3),
+            "plan": query_plan(engine, stmt, {"employee_id": employee_id, "jd_session_id": jd_session_id}),
+        }
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--sessions-per-employee", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None,
+                        help="defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{tmpdir.name}/bench.db"
+
+    os.environ["DATABASE_URL"] = args.database_url
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from sqlalchemy import text
+
+    from databases.database import get_engine
+    from databases.migrate import upgrade_db
+
+    upgrade_db()
+    engine = get_engine()
+
+    started = time.perf_counter()
+    sessions = seed(engine, args.rows, args.sessions_per_employee, args.seed)
+    seed_seconds = time.perf_counter() - started
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+    indexed = time_lookups(engine, sessions, args.lookups, args.seed)
+
+    with engine.begin() as connection:
+        for name in LOOKUP_INDEXES:
+            connection.execute(text(f"DROP INDEX {name}"))
+    # Fresh connections, so no statement prepared against the old schema is reused.
+    engine.dispose()
+    unindexed = time_lookups(engine, sessions, max(1, args.lookups // 10), args.seed)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "seed_seconds": round(seed_seconds, 1),
+        "indexed": indexed,
+        "unindexed": unindexed,
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
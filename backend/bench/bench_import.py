@@ -0,0 +1,99 @@
+"""
+Import-time budget for the app's entry points.
+
+Imports each module (main, worker by default) in a fresh interpreter under
+`python -X importtime`, without DATABASE_URL, and reports the total and
+the slowest top-level imports. Exits non-zero when a module fails to
+import, exceeds --budget-ms, or pulls in a module that must stay lazy
+(the LLM SDK, numpy), so a heavy import sneaking back in shows up in CI.
+
+    python bench/bench_import.py
+    python bench/bench_import.py --budget-ms 1500 --module main --top 20
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Only needed once a request uses them: the SDK by the Gemini backend
+# (llm.registry, in the lifespan), numpy by an enabled semantic cache.
+FORBIDDEN = ("google.genai", "numpy")
+BUDGET_MS = 2000
+
+
+def measure(module: str) -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    env["PYTHONPATH"] = str(BACKEND_DIR)
+    started = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    imported, total_ms, direct = set(), 0.0, []
+    for line in started.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header row
+        # Nesting is shown as two more spaces of indentation per level.
+        depth = (len(name) - 1 - len(name.lstrip())) // 2
+        name, ms = name.strip(), int(cumulative) / 1000
+        imported.add(name)
+        if depth == 0 and name == module:
+            total_ms = ms
+        elif depth == 1:
+            direct.append((name, ms))
+
+    return {
+        "module": module,
+        "ok": started.returncode == 0,
+        "error": started.stderr.strip().splitlines()[-1] if started.returncode else None,
+        "total_ms": round(total_ms, 1),
+        # What the module imports itself, each with everything it pulls in.
+        "top": sorted(direct, key=lambda item: -item[1]),
+        "forbidden": sorted(
+            name for name in imported
+            if any(name == f or name.startswith(f + ".") for f in FORBIDDEN)
+        ),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", action="append", dest="modules",
+                        help="module to import (repeatable); default: main and worker")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules or ["main", "worker"]:
+        result = measure(module)
+        print(json.dumps({
+            "module": module,
+            "total_ms": result["total_ms"],
+            "top_ms": {name: round(ms, 1) for name, ms in result["top"][:args.top]},
+        }, indent=2))
+
+        if not result["ok"]:
+            failures.append(f"{module}: import failed → {result['error']}")
+        if result["total_ms"] > args.budget_ms:
+            failures.append(f"{module}: {result['total_ms']}ms over the {args.budget_ms:.0f}ms budget")
+        if result["forbidden"]:
+            failures.append(f"{module}: imports {', '.join(result['forbidden'])} at import time")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,136 @@
+"""
+Micro-benchmark for JSON extraction from LLM output.
+
+Runs the previous regex-based extractor and utils.json_extractor over a
+corpus of model-shaped outputs (clean, fenced, chatty, long, trailing
+commas, truncated) and reports throughput and recovery rate, i.e. the
+share of outputs that end up as a valid JDOutput without another LLM call.
+
+    python bench/bench_json.py
+    python bench/bench_json.py --repeat 200 --corpus my_outputs.jsonl
+
+--corpus takes one JSON string per line (captured raw model responses);
+they are added to the generated cases under the label "captured".
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+JD = {
+    "job_title": "Senior Data Engineer",
+    "job_summary": "Own the batch and streaming pipelines {ingest -> warehouse}.",
+    "key_responsibilities": ["Design pipelines", "Review \"critical\" changes", "Mentor engineers"],
+    "required_skills": ["Python", "SQL", "Spark"],
+    "preferred_qualifications": ["Degree in CS or equivalent experience"],
+    "tools_and_technologies": ["Airflow", "dbt", "Kafka"],
+    "employment_type": "Full-time",
+    "location": "Hybrid",
+}
+
+
+def legacy_extract_json(text: str) -> dict:
+    """The extractor before the brace-balancing rewrite, for comparison."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    match = re.search(r"\{[\s\S]*\}", text)
+    if not match:
+        raise ValueError("No JSON object found in LLM output")
+    return json.loads(match.group())
+
+
+def build_corpus() -> list:
+    body = json.dumps(JD)
+    pretty = json.dumps(JD, indent=2)
+    chatter = "Sure! Here is the job description you asked for. " * 40
+
+    return [
+        ("clean", body),
+        ("pretty", pretty),
+        ("fenced", f"```json\n{pretty}\n```"),
+        ("chatty", f"{chatter}\n{pretty}\nLet me know if you need {{changes}}!"),
+        ("braces_in_prose", f"Using the {{profile}} template:\n```json\n{body}\n```\nNotes: see {{docs}}."),
+        ("long", json.dumps({**JD, "job_summary": "x" * 20000})),
+        ("two_objects", f"{body}\n\nAlternative:\n{body}"),
+        ("trailing_comma", body[:-1] + ",}"),
+        ("truncated", body[: len(body) // 2]),
+    ]
+
+
+def load_captured(path: Path) -> list:
+    return [("captured", json.loads(line)) for line in path.read_text().splitlines() if line.strip()]
+
+
+def run_extractor(name, extract, corpus, repeat, repair=None):
+    from schema.schema import JDOutput
+
+    recovered = {}
+    for label, text in corpus:
+        try:
+            parsed = extract(text)
+        except ValueError:
+            if repair is None:
+                parsed = None
+            else:
+                try:
+                    parsed = extract(repair(text))
+                except ValueError:
+                    parsed = None
+        try:
+            ok = parsed is not None and JDOutput.model_validate(parsed) is not None
+        except ValueError:
+            ok = False
+        recovered[label] = recovered.get(label, True) and ok
+
+    total_bytes = sum(len(text) for _, text in corpus) * repeat
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _, text in corpus:
+            try:
+                extract(text)
+            except ValueError:
+                pass
+    elapsed = time.perf_counter() - started
+
+    return {
+        "extractor": name,
+        "outputs_per_sec": round(len(corpus) * repeat / elapsed),
+        "mb_per_sec": round(total_bytes / elapsed / 1e6, 1),
+        "recovery_rate": round(sum(recovered.values()) / len(recovered), 3),
+        "recovered": recovered,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--corpus", type=Path, default=None,
+                        help="JSONL file of captured raw model outputs")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    from utils import json_extractor
+    from utils.json_repair import repair_json
+
+    corpus = build_corpus()
+    if args.corpus:
+        corpus += load_captured(args.corpus)
+
+    results = [
+        run_extractor("regex (previous)", legacy_extract_json, corpus, args.repeat),
+        run_extractor("balanced", json_extractor.extract_json, corpus, args.repeat),
+        run_extractor("balanced + repair", json_extractor.extract_json, corpus, args.repeat,
+                      repair=repair_json),
+    ]
+    print(json.dumps({"orjson": json_extractor.orjson is not None, "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
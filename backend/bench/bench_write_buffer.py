@@ -0,0 +1,136 @@
+"""
+Benchmark for chat_history inserts: a commit per row versus the write buffer.
+
+Writes --rows chat messages from --writers concurrent writers, once with
+crud.save_message (one transaction per row, as before) and once through
+WriteBuffer in each durability mode, and reports throughput plus the
+latency a writer sees per row. Runs against a throwaway SQLite file by
+default.
+
+    python bench/bench_write_buffer.py --rows 20000 --writers 50
+    python bench/bench_write_buffer.py --database-url postgresql://localhost/jd_bench
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def summarize(name: str, rows: int, seconds: float, latencies: list) -> dict:
+    latencies.sort()
+    return {
+        "mode": name,
+        "rows_per_second": round(rows / seconds),
+        "seconds": round(seconds, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 3),
+    }
+
+
+def messages(rows: int):
+    employee_id, jd_session_id = str(uuid.uuid4()), str(uuid.uuid4())
+    return [
+        {
+            "employee_id": employee_id,
+            "jd_session_id": jd_session_id,
+            "sender": "user",
+            "message": json.dumps({"index": i, "field": "job_title", "answer": f"answer {i}"}),
+        }
+        for i in range(rows)
+    ]
+
+
+def bench_per_row(rows: int, writers: int) -> dict:
+    """crud.save_message: add + commit per message."""
+    from databases.crud import save_message
+    from databases.database import SessionLocal
+
+    latencies = []
+
+    def write(row):
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            save_message(db, row["employee_id"], row["sender"], row["message"])
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(write, messages(rows)))
+    return summarize("per_row_commit", rows, time.perf_counter() - started, latencies)
+
+
+async def bench_buffer(rows: int, writers: int, durability: str, max_rows: int, flush_seconds: float) -> dict:
+    from models.model import ChatHistory
+    from services.write_buffer import WriteBuffer
+    from settings import get_settings
+
+    buffer = WriteBuffer(max_rows, flush_seconds, get_settings().write_buffer_max_pending, durability)
+    queue = asyncio.Queue()
+    for row in messages(rows):
+        queue.put_nowait(row)
+    latencies = []
+
+    async def writer():
+        while not queue.empty():
+            row = queue.get_nowait()
+            started = time.perf_counter()
+            await buffer.add(ChatHistory, row)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(writers)))
+    # Until everything is on disk, not just handed to the buffer.
+    await buffer.close()
+    result = summarize(f"write_buffer_{durability}", rows, time.perf_counter() - started, latencies)
+    result["flushes"] = buffer.flushes
+    return result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--writers", type=int, default=20)
+    parser.add_argument("--max-rows", type=int, default=500, help="buffer size threshold")
+    parser.add_argument("--flush-seconds", type=float, default=0.05, help="buffer time threshold")
+    parser.add_argument("--database-url", default=None,
+                        help="defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{tmpdir.name}/bench.db"
+
+    os.environ["DATABASE_URL"] = args.database_url
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from databases.database import dispose_engines
+    from databases.migrate import upgrade_db
+
+    upgrade_db()
+
+    async def buffered_runs():
+        try:
+            return [
+                await bench_buffer(args.rows, args.writers, durability, args.max_rows, args.flush_seconds)
+                for durability in ("buffered", "commit")
+            ]
+        finally:
+            await dispose_engines()
+
+    results = [bench_per_row(args.rows, args.writers)] + asyncio.run(buffered_runs())
+    print(json.dumps({"rows": args.rows, "writers": args.writers, "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,6 +1,10 @@
+import uuid
+from sqlalchemy import and_, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
-from backend.models.model import ChatHistory, JobDescription
+from models.model import ChatHistory, JobDescription
 
 def save_message(db: Session, employee_id: str, sender: str, message: str):
     chat = ChatHistory(
@@ -22,17 +26,94 @@ def create_jd(db: Session, employee_id: str, jd_json: dict):
     db.refresh(jd)
     return jd
 
-def approve_jd(db: Session, employee_id: str):
-    jd = (
-        db.query(JobDescription)
-        .filter(JobDescription.employee_id == employee_id)
-        .order_by(JobDescription.created_at.desc())
-        .first()
+def _insert_skipping_duplicates(dialect: str):
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        return dialect_insert(JobDescription).on_conflict_do_nothing(
+            index_elements=[JobDescription.jd_session_id, JobDescription.payload_hash]
+        )
+    return insert(JobDescription)
+
+def bulk_create_jds(db: Session, rows: list):
+    """
+    Insert many JobDescription rows in one executemany round trip.
+
+    Rows that already exist for their (jd_session_id, payload_hash) are
+    skipped, same as the idempotency guard on the chat route.
+    """
+    if not rows:
+        return
+
+    db.execute(_insert_skipping_duplicates(db.get_bind().dialect.name), rows)
+    db.commit()
+
+async def abulk_create_jds(db: AsyncSession, rows: list):
+    """Async counterpart of bulk_create_jds."""
+    if not rows:
+        return
+
+    await db.execute(_insert_skipping_duplicates(db.bind.dialect.name), rows)
+    await db.commit()
+
+def latest_jd_statement(employee_id: uuid.UUID, jd_session_id=None, *columns):
+    """Select `columns` (default: id) of the latest JD of a session / employee."""
+    latest = select(*(columns or (JobDescription.id,))).where(JobDescription.employee_id == employee_id)
+    if jd_session_id is not None:
+        latest = latest.where(JobDescription.jd_session_id == jd_session_id)
+    return latest.order_by(JobDescription.created_at.desc()).limit(1)
+
+def _approve(condition):
+    return (
+        update(JobDescription)
+        .where(condition, JobDescription.status == "generated")
+        .values(
+            status="approved",
+            approved_at=datetime.utcnow(),
+            version=JobDescription.version + 1,
+        )
+        .returning(
+            JobDescription.id,
+            JobDescription.jd_session_id,
+            JobDescription.version,
+            JobDescription.approved_at,
+        )
+        # Plain UPDATE; skip syncing (and version-checking) loaded objects.
+        .execution_options(synchronize_session=False)
+    )
+
+def approve_statement(employee_id: uuid.UUID, jd_session_id=None, expected_version: int = None):
+    """
+    One UPDATE ... RETURNING that approves the latest JD of a session (or
+    of the employee, without a session) if it is still "generated" and,
+    when given, still at expected_version. No row back means the approval
+    lost a race or there is nothing to approve.
+    """
+    condition = JobDescription.id == latest_jd_statement(employee_id, jd_session_id).scalar_subquery()
+    if expected_version is not None:
+        condition = and_(condition, JobDescription.version == expected_version)
+    return _approve(condition)
+
+def bulk_approve_statement(employee_id: uuid.UUID, jd_session_ids: list):
+    """Approve the latest JD of each of the sessions in one statement."""
+    ranked = (
+        select(
+            JobDescription.id,
+            func.row_number()
+            .over(
+                partition_by=JobDescription.jd_session_id,
+                order_by=JobDescription.created_at.desc(),
+            )
+            .label("rank"),
+        )
+        .where(
+            JobDescription.employee_id == employee_id,
+            JobDescription.jd_session_id.in_(jd_session_ids),
+        )
+        .subquery()
     )
-    if not jd:
-        return None
+    return _approve(JobDescription.id.in_(select(ranked.c.id).where(ranked.c.rank == 1)))
 
-    jd.status = "approved"
-    jd.approved_at = datetime.utcnow()
+def approve_jd(db: Session, employee_id: str):
+    row = db.execute(approve_statement(uuid.UUID(employee_id))).first()
     db.commit()
-    return jd
\ No newline at end of file
+    return row
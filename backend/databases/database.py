@@ -1,16 +1,130 @@
-import os
+import time
+from contextlib import asynccontextmanager
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from dotenv import load_dotenv
 
-load_dotenv()
+from settings import get_settings
+from utils.metrics import DB_POOL_CHECKOUT_SECONDS, DB_POOL_IN_USE
+
+# Async drivers for the sync URLs DATABASE_URL is usually written with.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the asyncio one."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def pool_options(url: str) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        # In-memory SQLite runs on a single static connection, not a queue pool.
+        if parsed.database in (None, "", ":memory:"):
+            return {}
+        # SQLite has a single writer; extra connections only queue up on
+        # its file lock and back off, which shows up as tail latency.
+        default_size, default_overflow = 1, 0
+    else:
+        default_size, default_overflow = 10, 20
+
+    settings = get_settings()
+    return {
+        "pool_size": default_size if settings.db_pool_size is None else settings.db_pool_size,
+        "max_overflow": default_overflow if settings.db_max_overflow is None else settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+# ============================
+# ENGINES
+# ============================
+
+# Built on first use, not at import: importing the app (or a script, or a
+# migration) must not need DATABASE_URL or open a pool.
+_engine = None
+_async_engine = None
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+_async_session_factory = async_sessionmaker(expire_on_commit=False, autoflush=False)
+
+
+def database_url() -> str:
+    url = get_settings().database_url
+    if not url:
+        raise RuntimeError("DATABASE_URL is not set")
+    return url
+
+
+def _watch_pool(name: str, sync_engine):
+    if hasattr(sync_engine.pool, "checkedout"):
+        DB_POOL_IN_USE.labels(name).set_function(sync_engine.pool.checkedout)
+
+
+def get_engine():
+    """Sync engine: batch/cache helpers run in threads, and schema management."""
+    global _engine
+    if _engine is None:
+        url = database_url()
+        _engine = create_engine(url, **pool_options(url))
+        _session_factory.configure(bind=_engine)
+        _watch_pool("sync", _engine)
+    return _engine
+
+
+def get_async_engine():
+    """Async engine: request handlers, so a DB round trip never holds a thread."""
+    global _async_engine
+    if _async_engine is None:
+        url = database_url()
+        _async_engine = create_async_engine(async_url(url), **pool_options(url))
+        _async_session_factory.configure(bind=_async_engine)
+        _watch_pool("async", _async_engine.sync_engine)
+    return _async_engine
+
+
+def SessionLocal(**kwargs):
+    get_engine()
+    return _session_factory(**kwargs)
+
+
+def AsyncSessionLocal(**kwargs) -> AsyncSession:
+    get_async_engine()
+    return _async_session_factory(**kwargs)
+
+
+async def dispose_engines():
+    """Close pooled connections of whichever engines were built (shutdown)."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+async def checkout(session: AsyncSession) -> AsyncSession:
+    """Check out the session's pooled connection, timing the wait for it."""
+    started = time.perf_counter()
+    await session.connection()
+    DB_POOL_CHECKOUT_SECONDS.labels("async").observe(time.perf_counter() - started)
+    return session
 
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@asynccontextmanager
+async def async_session():
+    """Short-lived AsyncSession for work that outlives a request."""
+    async with AsyncSessionLocal() as session:
+        yield await checkout(session)
 
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
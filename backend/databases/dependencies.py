@@ -1,4 +1,6 @@
-from databases.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from databases.database import AsyncSessionLocal, SessionLocal, checkout
 
 def get_db():
     db = SessionLocal()
@@ -6,3 +8,33 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class LazyAsyncSession:
+    """
+    Request-scoped AsyncSession that checks out a pooled connection only
+    when the route first asks for it, so handlers that end up not touching
+    the DB never hold (or wait for) a connection.
+    """
+
+    def __init__(self):
+        self._session = None
+
+    async def get(self) -> AsyncSession:
+        if self._session is None:
+            self._session = AsyncSessionLocal()
+            await checkout(self._session)
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+async def get_async_db():
+    db = LazyAsyncSession()
+    try:
+        yield db
+    finally:
+        await db.close()
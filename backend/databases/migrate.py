@@ -0,0 +1,41 @@
+import logging
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from databases.database import get_engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Revision matching the schema create_all used to build at startup.
+BASELINE_REVISION = "0001_initial"
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    # Keep the app's own logging setup.
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def upgrade_db(revision: str = "head"):
+    """Apply migrations up to `revision`, adopting a create_all-built schema."""
+    from alembic import command
+    from alembic.runtime.migration import MigrationContext
+
+    config = alembic_config()
+
+    with get_engine().connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+        unversioned = current is None and inspect(connection).has_table("job_descriptions")
+
+    if unversioned:
+        logger.info("Existing schema without migration history, stamping %s", BASELINE_REVISION)
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, revision)
@@ -5,5 +5,18 @@ class BaseLLM(ABC):
     def generate(self, system: str, user: str):
         pass
     @abstractmethod
+    async def agenerate(self, system: str, user: str):
+        pass
+    async def agenerate_stream(self, system: str, user: str):
+        # Backends without native streaming yield the whole response at once.
+        yield await self.agenerate(system, user)
+    async def awarmup(self):
+        # Open connections ahead of the first request; no-op by default.
+        pass
+    async def aclose(self):
+        pass
+    def stats(self) -> dict:
+        return {}
+    @abstractmethod
     def call_tool(self, system: str, user: str, tools: list):
         pass
@@ -0,0 +1,23 @@
+class LLMError(Exception):
+    """Provider failure, as opposed to a bad (unparseable / invalid) response."""
+
+    retryable = False
+
+    def __init__(self, message: str, status_code: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class LLMTransportError(LLMError):
+    """Network failure, timeout or 5xx: retry the same prompt after a backoff."""
+
+    retryable = True
+
+
+class LLMQuotaError(LLMTransportError):
+    """429 / quota exhausted: wait (honouring retry_after), never re-prompt."""
+
+
+# Statuses that mean "send less traffic", used to shrink adaptive concurrency.
+THROTTLE_STATUSES = (429, 503)
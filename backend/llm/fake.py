@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+
+from llm.base import BaseLLM
+from llm.errors import LLMQuotaError, LLMTransportError
+from llm.rate_limiter import estimate_tokens
+from utils.metrics import record_token_usage
+
+_JOB_TITLE = re.compile(r'"field":\s*"job_title",\s*"answer":\s*"([^"]*)"')
+
+
+def parse_latency(spec: str):
+    """
+    Build a latency sampler from a spec string:
+        "fixed:0.4"            always 0.4s
+        "uniform:0.2,1.5"      uniform between 0.2s and 1.5s
+        "lognormal:-0.5,0.6"   lognormal with mu, sigma (long right tail)
+    """
+    kind, _, args = (spec or "fixed:0").partition(":")
+    params = [float(a) for a in args.split(",") if a]
+
+    if kind == "fixed":
+        return lambda rng: params[0] if params else 0.0
+    if kind == "uniform":
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(params[0], params[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class FakeLLM(BaseLLM):
+    """
+    Offline stand-in for a provider: returns a valid JD for any prompt, with
+    configurable latency and injected quota errors, transport failures and
+    malformed JSON. Seeded, so load tests and benchmarks are repeatable
+    without network access or spend.
+
+    Context caching is simulated like GeminiLLM's: the first call with a
+    given system prompt pays for it, later calls bill only the user part.
+    prefill_seconds_per_1k adds latency per billed input token, so the
+    saving shows up in latency as well as in token counts.
+    """
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        quota_error_rate: float = 0.0,
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        retry_after: float = None,
+        seed: int = None,
+        context_cache: bool = True,
+        prefill_seconds_per_1k: float = 0.0,
+    ):
+        self.sample_latency = parse_latency(latency)
+        self.quota_error_rate = quota_error_rate
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.context_cache = context_cache
+        self.prefill_seconds_per_1k = prefill_seconds_per_1k
+        self.calls = 0
+        self.malformed = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0
+        self._contexts = set()
+
+    def _bill(self, system: str, user: str) -> float:
+        """Count input tokens like the provider would; return prefill latency."""
+        system_tokens = estimate_tokens(system)
+        billed = estimate_tokens(user)
+        cached = 0
+
+        key = hashlib.sha256(system.encode("utf-8")).hexdigest()
+        if self.context_cache and key in self._contexts:
+            cached = system_tokens
+        else:
+            billed += system_tokens
+            if self.context_cache:
+                self._contexts.add(key)
+
+        self.input_tokens += billed
+        self.cached_tokens += cached
+        record_token_usage(
+            "stub",
+            SimpleNamespace(prompt_token_count=billed + cached, cached_content_token_count=cached),
+        )
+        return billed / 1000 * self.prefill_seconds_per_1k
+
+    def _respond(self, system: str, user: str) -> str:
+        self.calls += 1
+        roll = self.rng.random()
+
+        if roll < self.quota_error_rate:
+            raise LLMQuotaError(
+                "429 RESOURCE_EXHAUSTED (injected)",
+                status_code=429,
+                retry_after=self.retry_after,
+            )
+        roll -= self.quota_error_rate
+
+        if roll < self.failure_rate:
+            raise LLMTransportError("503 UNAVAILABLE (injected)", status_code=503)
+        roll -= self.failure_rate
+
+        match = _JOB_TITLE.search(user)
+        job_title = match.group(1) if match else "Software Engineer"
+
+        body = json.dumps({
+            "job_title": job_title,
+            "job_summary": f"We are hiring a {job_title} to join our team.",
+            "key_responsibilities": ["Deliver high quality work", "Collaborate with the team"],
+            "required_skills": ["Communication", "Problem solving"],
+            "preferred_qualifications": ["Relevant degree or equivalent experience"],
+            "tools_and_technologies": ["Git"],
+            "employment_type": "Full-time",
+            "location": "Hybrid",
+        })
+
+        if roll < self.malformed_rate:
+            # Real-world near misses: markdown-wrapped, a trailing comma, or
+            # output truncated mid-object (which no local repair can save).
+            self.malformed += 1
+            kind = self.rng.choice(("fenced", "trailing_comma", "truncated"))
+            if kind == "fenced":
+                return f"```json\n{body}\n```"
+            if kind == "trailing_comma":
+                return body[:-1] + ",}"
+            return body[: len(body) // 2]
+
+        return body
+
+    def generate(self, system: str, user: str) -> str:
+        time.sleep(self.sample_latency(self.rng) + self._bill(system, user))
+        return self._respond(system, user)
+
+    async def agenerate(self, system: str, user: str) -> str:
+        await asyncio.sleep(self.sample_latency(self.rng) + self._bill(system, user))
+        return self._respond(system, user)
+
+    async def agenerate_stream(self, system: str, user: str):
+        # Latency is spread across chunks, like tokens arriving.
+        await asyncio.sleep(self._bill(system, user))
+        text = self._respond(system, user)
+        chunks = [text[i:i + 32] for i in range(0, len(text), 32)]
+        delay = self.sample_latency(self.rng) / max(1, len(chunks))
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
+
+    def call_tool(self, system: str, user: str, tools: list):
+        return self._respond(system, user)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "malformed": self.malformed,
+            "input_tokens": self.input_tokens,
+            "cached_tokens": self.cached_tokens,
+        }
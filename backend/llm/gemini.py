@@ -1,39 +1,289 @@
+import asyncio
+import hashlib
 import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# This module is only imported by llm.registry when a Gemini backend is
+# built (init_llm, in the lifespan): the SDK import is the slowest in the
+# app and stays out of its import path.
 import google.genai as genai
+import httpx
+from google.genai import errors as genai_errors
 from llm.base import BaseLLM
-from dotenv import load_dotenv
-import os
+from llm.errors import LLMError, LLMQuotaError, LLMTransportError
+from llm.rate_limiter import estimate_tokens
+from schema.schema import JDOutput
+from settings import get_settings
+from utils.metrics import record_token_usage
+
+logger = logging.getLogger(__name__)
 
-load_dotenv()   
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 MODEL_NAME = "gemini-2.5-flash"
 
+# Minimum context cache size of the Pro models (see gemini_context_cache_min_tokens).
+PRO_MIN_CACHE_TOKENS = 4096
+# Errors meaning a cached context is gone (expired / deleted provider-side):
+# not found / permission denied on it, or a 400 that names it.
+STALE_CONTEXT_STATUSES = (403, 404)
+
+
+def _retry_after(error) -> float:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+@contextmanager
+def translate_errors():
+    """Map SDK / transport exceptions onto the llm.errors hierarchy."""
+    try:
+        yield
+    except genai_errors.APIError as e:
+        if e.code == 429:
+            raise LLMQuotaError(str(e), status_code=429, retry_after=_retry_after(e)) from e
+        if e.code in (408, 500, 502, 503, 504):
+            raise LLMTransportError(str(e), status_code=e.code, retry_after=_retry_after(e)) from e
+        raise LLMError(str(e), status_code=e.code) from e
+    except httpx.TransportError as e:
+        raise LLMTransportError(str(e)) from e
+
+
+def _stale_context(error: LLMError) -> bool:
+    if error.status_code in STALE_CONTEXT_STATUSES:
+        return True
+    return error.status_code == 400 and "cached" in str(error).lower()
+
+
+def make_client(http_options: dict = None):
+    return genai.Client(api_key=get_settings().gemini_api_key, http_options=http_options)
+
+
+async def close_client(client):
+    await client.aio.aclose()
+    client.close()
+
 
 class GeminiLLM(BaseLLM):
 
-    def __init__(self):
-        self.client = genai.Client(api_key=GEMINI_API_KEY)
+    def __init__(self, model_name: str = MODEL_NAME, http_options: dict = None, client=None):
+        # Backends for different models can share one client (and its pool);
+        # a shared client is closed by whoever passed it in, once.
+        self.model_name = model_name
+        self._owns_client = client is None
+        self.client = client or make_client(http_options)
 
-    def generate(self, system: str, user: str) -> dict:
-        prompt = f"""
-SYSTEM:
-{system}
+        # sha256(system) -> (cached content name, or None if the provider
+        # refused it, e.g. below the minimum cacheable size; renew-at time)
+        self._contexts = {}
+        self._context_lock = threading.Lock()
+        self._acontext_lock = None
 
-USER:
-{user}
-"""
+    async def awarmup(self):
+        # A cheap metadata call pays DNS + TLS setup and leaves a pooled
+        # keep-alive connection for the first real request.
+        with translate_errors():
+            await self.client.aio.models.get(model=self.model_name)
 
-        response = self.client.models.generate_content(
-            model=MODEL_NAME,
-            contents=prompt,
-            config={"response_mime_type": "application/json"}
-        )
+    async def aclose(self):
+        # Cached contexts are billed for storage until they expire.
+        for name, _ in list(self._contexts.values()):
+            if name:
+                try:
+                    await self.client.aio.caches.delete(name=name)
+                except Exception as e:
+                    logger.warning("Could not delete cached context %s: %s", name, e)
+        self._contexts.clear()
+
+        if self._owns_client:
+            await close_client(self.client)
+
+    # ----------------------------
+    # cached system context
+    # ----------------------------
+
+    def _context_entry(self, key: str):
+        entry = self._contexts.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry
+        return None
 
+    def _remember_context(self, key: str, cached):
+        # Renew a minute before the provider would expire it.
+        renew_at = time.monotonic() + max(60, get_settings().gemini_context_cache_ttl - 60)
+        entry = (cached.name if cached else None, renew_at)
+        self._contexts[key] = entry
+        return entry
+
+    def _cacheable(self, system: str) -> bool:
+        settings = get_settings()
+        minimum = settings.gemini_context_cache_min_tokens
+        if "-pro" in self.model_name:
+            minimum = max(minimum, PRO_MIN_CACHE_TOKENS)
+        return settings.gemini_context_cache and estimate_tokens(system) >= minimum
+
+    def _create_failed(self, key: str, error: LLMError):
+        logger.warning("Context cache unavailable for %s: %s", self.model_name, error)
+        # A refusal holds for the TTL window; a transient failure is retried
+        # by the next call.
+        return None if error.retryable else self._remember_context(key, None)
+
+    def _cache_config(self, system: str, key: str) -> dict:
+        return {
+            "system_instruction": system,
+            "ttl": f"{get_settings().gemini_context_cache_ttl}s",
+            "display_name": f"jd-context-{key[:12]}",
+        }
+
+    def _context(self, system: str):
+        """Name of the cached content holding `system`, or None to send it inline."""
+        if not self._cacheable(system):
+            return None
+
+        key = hashlib.sha256(system.encode("utf-8")).hexdigest()
+        entry = self._context_entry(key)
+        if entry is None:
+            with self._context_lock:
+                entry = self._context_entry(key)
+                if entry is None:
+                    try:
+                        with translate_errors():
+                            cached = self.client.caches.create(
+                                model=self.model_name, config=self._cache_config(system, key)
+                            )
+                    except LLMError as e:
+                        entry = self._create_failed(key, e)
+                    else:
+                        entry = self._remember_context(key, cached)
+        return entry[0] if entry else None
+
+    async def _acontext(self, system: str):
+        if not self._cacheable(system):
+            return None
+
+        key = hashlib.sha256(system.encode("utf-8")).hexdigest()
+        entry = self._context_entry(key)
+        if entry is None:
+            if self._acontext_lock is None:
+                self._acontext_lock = asyncio.Lock()
+            async with self._acontext_lock:
+                entry = self._context_entry(key)
+                if entry is None:
+                    try:
+                        with translate_errors():
+                            cached = await self.client.aio.caches.create(
+                                model=self.model_name, config=self._cache_config(system, key)
+                            )
+                    except LLMError as e:
+                        entry = self._create_failed(key, e)
+                    else:
+                        entry = self._remember_context(key, cached)
+        return entry[0] if entry else None
+
+    def _forget_context(self, system: str):
+        self._contexts.pop(hashlib.sha256(system.encode("utf-8")).hexdigest(), None)
+
+    def _config(self, system: str, context_name: str) -> dict:
+        config = {"response_mime_type": "application/json"}
+        if get_settings().gemini_response_schema:
+            config["response_schema"] = JDOutput
+        if context_name:
+            config["cached_content"] = context_name
+        else:
+            config["system_instruction"] = system
+        return config
+
+    # ----------------------------
+    # generation
+    # ----------------------------
+
+    def generate(self, system: str, user: str) -> str:
+        context_name = self._context(system)
+        try:
+            with translate_errors():
+                response = self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=user,
+                    config=self._config(system, context_name)
+                )
+        except LLMError as e:
+            if not context_name or not _stale_context(e):
+                raise
+            self._forget_context(system)
+            with translate_errors():
+                response = self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=user,
+                    config=self._config(system, None)
+                )
+
+        record_token_usage(self.model_name, response.usage_metadata)
         return response.text
 
+    async def agenerate(self, system: str, user: str) -> str:
+        # Same request as generate(), but on the SDK's asyncio client so the
+        # event loop is free while the model is thinking.
+        context_name = await self._acontext(system)
+        try:
+            with translate_errors():
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=user,
+                    config=self._config(system, context_name)
+                )
+        except LLMError as e:
+            if not context_name or not _stale_context(e):
+                raise
+            self._forget_context(system)
+            with translate_errors():
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=user,
+                    config=self._config(system, None)
+                )
+
+        record_token_usage(self.model_name, response.usage_metadata)
+        return response.text
+
+    async def agenerate_stream(self, system: str, user: str):
+        """Yield the response text chunk by chunk as the model produces it."""
+        context_name = await self._acontext(system)
+        try:
+            with translate_errors():
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=user,
+                    config=self._config(system, context_name)
+                )
+        except LLMError as e:
+            if not context_name or not _stale_context(e):
+                raise
+            self._forget_context(system)
+            with translate_errors():
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=user,
+                    config=self._config(system, None)
+                )
+
+        with translate_errors():
+            usage = None
+            async for chunk in stream:
+                # Usage totals arrive on the final chunk.
+                usage = chunk.usage_metadata or usage
+                if chunk.text:
+                    yield chunk.text
+
+        record_token_usage(self.model_name, usage)
+
     def call_tool(self, system: str, user: str, tools: list):
         response = self.client.models.generate_content(
-            model=MODEL_NAME,
+            model=self.model_name,
             contents=[system, user],
             tools=tools
         )
@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from llm.base import BaseLLM
+from llm.errors import LLMError, THROTTLE_STATUSES
+from settings import get_settings
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute / 60` tokens per second.
+
+    reserve() always succeeds and returns how long the caller must wait
+    before using the reservation; the bucket goes into debt instead of
+    rejecting, which keeps callers first-come first-served.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            # A single request larger than the bucket would otherwise never run.
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so the next reservation waits at least `seconds`."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """Separate requests-per-minute and tokens-per-minute budgets."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def reserve(self, tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def penalize(self, seconds: float):
+        self.requests.penalize(seconds)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency cap: +1 slot per window of successes, halved on throttle.
+
+    A burst of in-flight requests that were all sent at the old limit is
+    throttled together; only the first of those throttles cuts the limit,
+    the rest (requests started before that cut) are ignored, so the limit
+    drops at most once per round trip instead of once per 429.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, decrease: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.inflight = 0
+        self.ignored_throttles = 0
+        self._decreased_at = float("-inf")
+        self._cond = None
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.inflight < int(self.limit))
+            self.inflight += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.inflight -= 1
+                self._cond.notify_all()
+
+    def on_success(self):
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self, started: float):
+        """Throttle of a request sent at `started` (time.monotonic())."""
+        if started < self._decreased_at:
+            self.ignored_throttles += 1
+            return
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self._decreased_at = time.monotonic()
+
+
+class RateLimitedLLM(BaseLLM):
+    """
+    Wrap any BaseLLM with the provider's RPM/TPM budgets and an adaptive
+    concurrency cap. Quota errors shrink concurrency and hold the request
+    bucket for the provider's retry-after before anything else is sent.
+    """
+
+    def __init__(self, inner: BaseLLM, limiter: RateLimiter, concurrency: AdaptiveConcurrency):
+        self.inner = inner
+        self.limiter = limiter
+        self.concurrency = concurrency
+        self.throttled = 0
+
+    def _reserve(self, system: str, user: str) -> float:
+        return self.limiter.reserve(
+            estimate_tokens(system) + estimate_tokens(user) + get_settings().llm_expected_output_tokens
+        )
+
+    def _on_error(self, error: LLMError, started: float):
+        if error.status_code in THROTTLE_STATUSES:
+            self.throttled += 1
+            self.concurrency.on_throttle(started)
+        if error.retry_after:
+            self.limiter.penalize(error.retry_after)
+
+    def generate(self, system: str, user: str):
+        # Sync callers are rate limited but not counted against the
+        # (asyncio-based) concurrency cap.
+        time.sleep(self._reserve(system, user))
+        started = time.monotonic()
+        try:
+            result = self.inner.generate(system, user)
+        except LLMError as e:
+            self._on_error(e, started)
+            raise
+        self.concurrency.on_success()
+        return result
+
+    async def agenerate(self, system: str, user: str):
+        await asyncio.sleep(self._reserve(system, user))
+        async with self.concurrency.slot():
+            started = time.monotonic()
+            try:
+                result = await self.inner.agenerate(system, user)
+            except LLMError as e:
+                self._on_error(e, started)
+                raise
+        self.concurrency.on_success()
+        return result
+
+    async def agenerate_stream(self, system: str, user: str):
+        await asyncio.sleep(self._reserve(system, user))
+        async with self.concurrency.slot():
+            started = time.monotonic()
+            try:
+                async for chunk in self.inner.agenerate_stream(system, user):
+                    yield chunk
+            except LLMError as e:
+                self._on_error(e, started)
+                raise
+        self.concurrency.on_success()
+
+    async def awarmup(self):
+        await self.inner.awarmup()
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+    def call_tool(self, system: str, user: str, tools: list):
+        return self.inner.call_tool(system, user, tools)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": int(self.concurrency.limit),
+            "inflight": self.concurrency.inflight,
+            "throttled": self.throttled,
+            "throttles_ignored": self.concurrency.ignored_throttles,
+            **self.inner.stats(),
+        }
+
+
+def rate_limited(inner: BaseLLM) -> RateLimitedLLM:
+    settings = get_settings()
+    return RateLimitedLLM(
+        inner,
+        RateLimiter(settings.llm_rpm, settings.llm_tpm),
+        AdaptiveConcurrency(
+            settings.llm_initial_concurrency, settings.llm_min_concurrency, settings.llm_max_concurrency
+        ),
+    )
@@ -1,4 +1,128 @@
-from llm.gemini import GeminiLLM
+import logging
+
+from llm.rate_limiter import rate_limited
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+STUB_BACKENDS = ("stub", "fake")
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+_llm = None
+# Provider clients shared by the backends of _llm; closed after them.
+_clients = []
+
+
+def backend_names() -> tuple:
+    """The configured backends: llm_backends, else the single llm_backend."""
+    settings = get_settings()
+    if settings.llm_backends:
+        return settings.llm_backends
+    backend = settings.llm_backend.lower()
+    return (backend if backend in STUB_BACKENDS else DEFAULT_MODEL,)
+
+
+def http_options() -> dict:
+    import httpx
+
+    settings = get_settings()
+    client_args = {
+        "limits": httpx.Limits(
+            max_connections=settings.llm_pool_size,
+            max_keepalive_connections=settings.llm_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        )
+    }
+    return {
+        "timeout": int(settings.llm_timeout_seconds * 1000),  # the SDK takes milliseconds
+        "client_args": client_args,
+        "async_client_args": client_args,
+    }
+
+
+def model_identity() -> str:
+    """Identifies the configured backend set, e.g. for response cache keys."""
+    return ",".join(backend_names())
+
+
+def build_backends(clients: list) -> dict:
+    """
+    One rate-limited backend per name; Gemini backends share a client.
+
+    Shared clients are appended to `clients`: the caller closes them once,
+    after every backend's aclose() (which only deletes its own contexts).
+    """
+    settings = get_settings()
+    backends = {}
+    gemini_client = None
+
+    for name in backend_names():
+        if name in STUB_BACKENDS:
+            from llm.fake import FakeLLM
+            backend = FakeLLM(
+                latency=settings.fake_llm_latency,
+                quota_error_rate=settings.fake_llm_quota_error_rate,
+                failure_rate=settings.fake_llm_failure_rate,
+                malformed_rate=settings.fake_llm_malformed_rate,
+                seed=settings.fake_llm_seed,
+                context_cache=settings.fake_llm_context_cache,
+                prefill_seconds_per_1k=settings.fake_llm_prefill_seconds_per_1k,
+            )
+        else:
+            from llm.gemini import GeminiLLM, make_client
+            if gemini_client is None:
+                gemini_client = make_client(http_options())
+                clients.append(gemini_client)
+            backend = GeminiLLM(model_name=name, client=gemini_client)
+
+        # Provider quotas are per model, so each backend has its own budget.
+        backends[name] = rate_limited(backend)
+
+    return backends
+
+
+def build_llm(clients: list):
+    backends = build_backends(clients)
+    if len(backends) == 1:
+        return next(iter(backends.values()))
+
+    from llm.router import RoutedLLM
+    return RoutedLLM(backends)
+
 
 def get_llm():
-    return GeminiLLM()
+    """
+    The process-wide LLM client.
+
+    Created by the FastAPI lifespan hook (init_llm) so its connection pool
+    is reused by every request; scripts that never run the lifespan get it
+    lazily on first use.
+    """
+    global _llm
+    if _llm is None:
+        _llm = build_llm(_clients)
+    return _llm
+
+
+init_llm = get_llm
+
+
+async def warmup_llm():
+    if not get_settings().llm_prewarm:
+        return
+    try:
+        await get_llm().awarmup()
+        logger.info("LLM client warmed up")
+    except Exception as e:
+        # A failed warm-up must not stop the app from starting.
+        logger.warning("LLM warm-up failed: %s", e)
+
+
+async def close_llm():
+    global _llm
+    if _llm is not None:
+        await _llm.aclose()
+        _llm = None
+    while _clients:
+        from llm.gemini import close_client
+        await close_client(_clients.pop())
@@ -0,0 +1,184 @@
+import asyncio
+import random
+import time
+from collections import deque
+
+from llm.base import BaseLLM
+from settings import get_settings
+
+EWMA_ALPHA = 0.2
+P95_MIN_SAMPLES = 20
+
+
+class BackendStats:
+    """EWMA latency / error rate plus a window of recent latencies for p95."""
+
+    def __init__(self, window: int = 200):
+        self.latency = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.last_failure = 0.0
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool):
+        self.requests += 1
+        self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+
+        if ok:
+            self.samples.append(seconds)
+            self.latency = (
+                seconds if self.latency is None
+                else self.latency + EWMA_ALPHA * (seconds - self.latency)
+            )
+        else:
+            self.errors += 1
+            self.last_failure = time.monotonic()
+
+    def p95(self):
+        if len(self.samples) < P95_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def healthy(self) -> bool:
+        return self.error_rate < get_settings().llm_max_error_rate
+
+    def available(self) -> bool:
+        return (
+            self.healthy()
+            or time.monotonic() - self.last_failure > get_settings().llm_unhealthy_cooldown
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "ewma_latency": self.latency,
+            "p95": self.p95(),
+            "error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "errors": self.errors,
+            "healthy": self.healthy(),
+        }
+
+
+class RoutedLLM(BaseLLM):
+    """
+    Route each call to the fastest healthy backend by EWMA latency.
+
+    Backends without samples sort first so every backend gets measured,
+    and a small share of calls explores the others so stale latencies
+    recover.
+    With hedging on, agenerate() sends a second request to the next-best
+    backend once the first has been running longer than its p95, and
+    returns whichever answers first.
+    """
+
+    def __init__(self, backends: dict, hedge: bool = None):
+        self.backends = backends
+        self.hedge = get_settings().llm_hedge if hedge is None else hedge
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.route_stats = {name: BackendStats() for name in backends}
+
+    def ranked(self) -> list:
+        def key(name):
+            stats = self.route_stats[name]
+            return (not stats.available(), stats.latency or 0.0, stats.error_rate)
+
+        order = sorted(self.backends, key=key)
+
+        healthy = [name for name in order[1:] if self.route_stats[name].available()]
+        if healthy and random.random() < get_settings().llm_explore_rate:
+            pick = random.choice(healthy)
+            order.remove(pick)
+            order.insert(0, pick)
+
+        return order
+
+    async def _acall(self, name: str, system: str, user: str):
+        started = time.perf_counter()
+        try:
+            result = await self.backends[name].agenerate(system, user)
+        except Exception:
+            self.route_stats[name].record(time.perf_counter() - started, ok=False)
+            raise
+        self.route_stats[name].record(time.perf_counter() - started, ok=True)
+        return result
+
+    def generate(self, system: str, user: str):
+        name = self.ranked()[0]
+        started = time.perf_counter()
+        try:
+            result = self.backends[name].generate(system, user)
+        except Exception:
+            self.route_stats[name].record(time.perf_counter() - started, ok=False)
+            raise
+        self.route_stats[name].record(time.perf_counter() - started, ok=True)
+        return result
+
+    async def agenerate(self, system: str, user: str):
+        order = self.ranked()
+        if not self.hedge or len(order) < 2:
+            return await self._acall(order[0], system, user)
+
+        primary, alternate = order[0], order[1]
+        delay = self.route_stats[primary].p95() or get_settings().llm_hedge_default_delay
+
+        first = asyncio.create_task(self._acall(primary, system, user))
+        pending = {first}
+        error = None
+
+        # Covers the wait for the first request too: a cancelled caller
+        # must not leave either request running unowned.
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done:
+                return first.result()
+
+            self.hedged += 1
+            second = asyncio.create_task(self._acall(alternate, system, user))
+            pending = {first, second}
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_wins += task is second
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def agenerate_stream(self, system: str, user: str):
+        # Chunks already forwarded cannot be un-sent, so streams are not hedged.
+        name = self.ranked()[0]
+        started = time.perf_counter()
+        try:
+            async for chunk in self.backends[name].agenerate_stream(system, user):
+                yield chunk
+        except Exception:
+            self.route_stats[name].record(time.perf_counter() - started, ok=False)
+            raise
+        self.route_stats[name].record(time.perf_counter() - started, ok=True)
+
+    def call_tool(self, system: str, user: str, tools: list):
+        return self.backends[self.ranked()[0]].call_tool(system, user, tools)
+
+    async def awarmup(self):
+        await asyncio.gather(*(b.awarmup() for b in self.backends.values()))
+
+    async def aclose(self):
+        for backend in self.backends.values():
+            await backend.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "backends": {
+                name: {**self.route_stats[name].as_dict(), **backend.stats()}
+                for name, backend in self.backends.items()
+            },
+        }
@@ -183,11 +183,46 @@
 
 
 # # ================= LLM Architecture building sample =================
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 from routes.chat_routes import router
-from databases.database import Base, engine
-app = FastAPI(title="LLM JD Generator")
+from routes.batch_routes import router as batch_router
+from routes.jd_routes import router as jd_router
+from routes.job_routes import router as job_router
+from services.semantic_cache import semantic_cache
+from services.session_store import session_store
+from services.write_buffer import write_buffer
+from databases.database import dispose_engines
+from databases.migrate import upgrade_db
+from llm.registry import close_llm, init_llm, warmup_llm
+from utils.metrics import setup_logging, setup_tracing
+from utils.prompt_registry import prompt_registry
+from settings import get_settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    setup_tracing()
+    if get_settings().db_auto_migrate:
+        upgrade_db()
+    prompt_registry.load_all()
+    # One pooled keep-alive LLM client for the whole process.
+    init_llm()
+    await warmup_llm()
+    await semantic_cache.load()
+    yield
+    await session_store.flush()
+    # After the session store, whose pending writes can still add rows.
+    await write_buffer.close()
+    await close_llm()
+    await dispose_engines()
+
+
+app = FastAPI(title="LLM JD Generator", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -195,6 +230,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-Base.metadata.create_all(bind=engine)
 app.include_router(router)
+app.include_router(batch_router)
+app.include_router(jd_router)
+app.include_router(job_router)
+app.mount("/metrics", make_asgi_app())
 
@@ -0,0 +1,76 @@
+"""initial schema
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-18
+
+The schema as Base.metadata.create_all built it at startup before
+migrations existed (idempotent saves and the DB-backed cache came later,
+in 0001a_jd_dedup_and_cache). A database created that way is brought
+under migrations with:
+
+    alembic stamp 0001_initial
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001_initial"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job_descriptions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("jd_session_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("employee_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("jd_json", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("approved_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "chat_history",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("employee_id", sa.String(), nullable=True),
+        sa.Column("jd_session_id", sa.String(), nullable=True),
+        sa.Column("sender", sa.String(), nullable=True),
+        sa.Column("message", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_chat_history_employee_id", "chat_history", ["employee_id"])
+    op.create_index("ix_chat_history_jd_session_id", "chat_history", ["jd_session_id"])
+
+    op.create_table(
+        "employee_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("employee_id", sa.String(), nullable=True),
+        sa.Column("jd_session_id", sa.String(), nullable=True),
+        sa.Column("current_role", sa.String(), nullable=True),
+        sa.Column("department", sa.String(), nullable=True),
+        sa.Column("experience", sa.Integer(), nullable=True),
+        sa.Column("responsibilities", sa.String(), nullable=True),
+        sa.Column("tools", sa.String(), nullable=True),
+        sa.Column("skills", sa.String(), nullable=True),
+        sa.Column("leadership", sa.String(), nullable=True),
+        sa.Column("reporting_to", sa.String(), nullable=True),
+        sa.Column("work_type", sa.String(), nullable=True),
+        sa.Column("achievements", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_employee_profiles_employee_id", "employee_profiles", ["employee_id"])
+    op.create_index("ix_employee_profiles_jd_session_id", "employee_profiles", ["jd_session_id"])
+
+
+def downgrade():
+    op.drop_index("ix_employee_profiles_jd_session_id", table_name="employee_profiles")
+    op.drop_index("ix_employee_profiles_employee_id", table_name="employee_profiles")
+    op.drop_table("employee_profiles")
+    op.drop_index("ix_chat_history_jd_session_id", table_name="chat_history")
+    op.drop_index("ix_chat_history_employee_id", table_name="chat_history")
+    op.drop_table("chat_history")
+    op.drop_table("job_descriptions")
@@ -0,0 +1,53 @@
+"""idempotent JD saves and the DB-backed response cache
+
+Revision ID: 0001a_jd_dedup_and_cache
+Revises: 0001_initial
+Create Date: 2026-10-18
+
+job_descriptions.payload_hash with a unique (jd_session_id, payload_hash),
+so a retried submission reuses its row, and the jd_cache table. Both
+were added while the schema was still built by create_all, so a database
+stamped 0001_initial may or may not have them: each is only created when
+missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001a_jd_dedup_and_cache"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {c["name"] for c in inspector.get_columns("job_descriptions")}
+    constraints = {c["name"] for c in inspector.get_unique_constraints("job_descriptions")}
+    if "payload_hash" not in columns or "uq_jd_session_payload" not in constraints:
+        # Batch mode: SQLite can only add a constraint by rebuilding the table.
+        with op.batch_alter_table("job_descriptions") as batch:
+            if "payload_hash" not in columns:
+                batch.add_column(sa.Column("payload_hash", sa.String(length=64), nullable=True))
+            if "uq_jd_session_payload" not in constraints:
+                batch.create_unique_constraint(
+                    "uq_jd_session_payload", ["jd_session_id", "payload_hash"]
+                )
+
+    if not inspector.has_table("jd_cache"):
+        op.create_table(
+            "jd_cache",
+            sa.Column("key", sa.String(length=64), primary_key=True),
+            sa.Column("jd_json", sa.JSON(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_jd_cache_expires_at", "jd_cache", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_jd_cache_expires_at", table_name="jd_cache")
+    op.drop_table("jd_cache")
+    with op.batch_alter_table("job_descriptions") as batch:
+        batch.drop_constraint("uq_jd_session_payload", type_="unique")
+        batch.drop_column("payload_hash")
@@ -0,0 +1,33 @@
+"""job description lookup indexes
+
+Revision ID: 0002_jd_lookup_indexes
+Revises: 0001a_jd_dedup_and_cache
+Create Date: 2026-10-18
+
+Approval filters on (employee_id, jd_session_id) and takes the latest
+created_at; listing filters on status. Without these both scan the table.
+On a large Postgres table, build them by hand first with
+CREATE INDEX CONCURRENTLY under the same names; this revision then skips
+them.
+"""
+from alembic import op
+
+revision = "0002_jd_lookup_indexes"
+down_revision = "0001a_jd_dedup_and_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_jd_employee_session_created",
+        "job_descriptions",
+        ["employee_id", "jd_session_id", "created_at"],
+        if_not_exists=True,
+    )
+    op.create_index("ix_jd_status", "job_descriptions", ["status"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_jd_status", table_name="job_descriptions")
+    op.drop_index("ix_jd_employee_session_created", table_name="job_descriptions")
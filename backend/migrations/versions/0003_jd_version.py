@@ -0,0 +1,28 @@
+"""job description version column
+
+Revision ID: 0003_jd_version
+Revises: 0002_jd_lookup_indexes
+Create Date: 2026-10-18
+
+Optimistic concurrency for approval and regeneration. Existing rows start
+at version 1.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_jd_version"
+down_revision = "0002_jd_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("job_descriptions") as batch_op:
+        batch_op.add_column(
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1")
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("job_descriptions") as batch_op:
+        batch_op.drop_column("version")
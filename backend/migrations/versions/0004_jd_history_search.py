@@ -0,0 +1,76 @@
+"""job description history indexes and full-text search
+
+Revision ID: 0004_jd_history_search
+Revises: 0003_jd_version
+Create Date: 2026-10-18
+
+Keyset pagination indexes on (created_at, id), plus full-text search over
+jd_json's job_title and required_skills: a GIN expression index on
+Postgres, an FTS5 table kept in sync by triggers on SQLite.
+"""
+from alembic import op
+
+revision = "0004_jd_history_search"
+down_revision = "0003_jd_version"
+branch_labels = None
+depends_on = None
+
+# Must stay identical to PG_SEARCH_MATCH in services/jd_history.py.
+PG_SEARCH_DOCUMENT = (
+    "to_tsvector('english', coalesce(jd_json->>'job_title', '') || ' ' || "
+    "coalesce(jd_json->>'required_skills', ''))"
+)
+
+SQLITE_SEARCH_ROW = (
+    "json_extract({row}.jd_json, '$.job_title'), json_extract({row}.jd_json, '$.required_skills')"
+)
+
+
+def upgrade():
+    op.create_index(
+        "ix_jd_employee_created_id", "job_descriptions", ["employee_id", "created_at", "id"]
+    )
+    op.create_index("ix_jd_created_id", "job_descriptions", ["created_at", "id"])
+
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(
+            f"CREATE INDEX ix_jd_search ON job_descriptions USING gin ({PG_SEARCH_DOCUMENT})"
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            # Rows share job_descriptions' rowid, so sync and lookup are by key.
+            "CREATE VIRTUAL TABLE jd_search USING fts5(job_title, required_skills)"
+        )
+        op.execute(
+            "INSERT INTO jd_search (rowid, job_title, required_skills) "
+            f"SELECT rowid, {SQLITE_SEARCH_ROW.format(row='job_descriptions')} FROM job_descriptions"
+        )
+        op.execute(
+            "CREATE TRIGGER jd_search_insert AFTER INSERT ON job_descriptions BEGIN "
+            "INSERT INTO jd_search (rowid, job_title, required_skills) "
+            f"VALUES (new.rowid, {SQLITE_SEARCH_ROW.format(row='new')}); END"
+        )
+        op.execute(
+            "CREATE TRIGGER jd_search_update AFTER UPDATE OF jd_json ON job_descriptions BEGIN "
+            "DELETE FROM jd_search WHERE rowid = old.rowid; "
+            "INSERT INTO jd_search (rowid, job_title, required_skills) "
+            f"VALUES (new.rowid, {SQLITE_SEARCH_ROW.format(row='new')}); END"
+        )
+        op.execute(
+            "CREATE TRIGGER jd_search_delete AFTER DELETE ON job_descriptions BEGIN "
+            "DELETE FROM jd_search WHERE rowid = old.rowid; END"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX ix_jd_search")
+    elif dialect == "sqlite":
+        for trigger in ("jd_search_insert", "jd_search_update", "jd_search_delete"):
+            op.execute(f"DROP TRIGGER {trigger}")
+        op.execute("DROP TABLE jd_search")
+
+    op.drop_index("ix_jd_created_id", table_name="job_descriptions")
+    op.drop_index("ix_jd_employee_created_id", table_name="job_descriptions")
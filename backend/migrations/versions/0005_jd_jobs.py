@@ -0,0 +1,47 @@
+"""jd generation job queue
+
+Revision ID: 0005_jd_jobs
+Revises: 0004_jd_history_search
+Create Date: 2026-10-18
+
+Durable queue of JD generations for worker.py, claimed with
+FOR UPDATE SKIP LOCKED on Postgres.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005_jd_jobs"
+down_revision = "0004_jd_history_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "jd_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("employee_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("jd_session_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("payload_hash", sa.String(length=64), nullable=True),
+        sa.Column("profile", sa.JSON(), nullable=False),
+        sa.Column("regenerate", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="3"),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("locked_by", sa.String(), nullable=True),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_jd_jobs_status_run_after", "jd_jobs", ["status", "run_after"])
+    op.create_index("ix_jd_jobs_session_payload", "jd_jobs", ["jd_session_id", "payload_hash"])
+
+
+def downgrade():
+    op.drop_index("ix_jd_jobs_session_payload", table_name="jd_jobs")
+    op.drop_index("ix_jd_jobs_status_run_after", table_name="jd_jobs")
+    op.drop_table("jd_jobs")
@@ -0,0 +1,36 @@
+"""audit log
+
+Revision ID: 0006_audit_log
+Revises: 0005_jd_jobs
+Create Date: 2026-10-18
+
+Append-only JD lifecycle events (generated, regenerated, approved),
+inserted in batches by services/write_buffer.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_audit_log"
+down_revision = "0005_jd_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "audit_log",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("action", sa.String(length=32), nullable=False),
+        sa.Column("employee_id", sa.String(), nullable=True),
+        sa.Column("jd_session_id", sa.String(), nullable=True),
+        sa.Column("detail", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_audit_log_employee_id", "audit_log", ["employee_id"])
+    op.create_index("ix_audit_log_jd_session_id", "audit_log", ["jd_session_id"])
+
+
+def downgrade():
+    op.drop_index("ix_audit_log_jd_session_id", table_name="audit_log")
+    op.drop_index("ix_audit_log_employee_id", table_name="audit_log")
+    op.drop_table("audit_log")
@@ -0,0 +1,27 @@
+"""job description source profile
+
+Revision ID: 0007_jd_profile
+Revises: 0006_audit_log
+Create Date: 2026-10-18
+
+The qa payload each JD was generated from, so the semantic cache can
+compare new profiles against approved ones. Existing rows stay NULL and
+are indexed from their jd_json instead.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_jd_profile"
+down_revision = "0006_audit_log"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("job_descriptions") as batch_op:
+        batch_op.add_column(sa.Column("profile", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("job_descriptions") as batch_op:
+        batch_op.drop_column("profile")
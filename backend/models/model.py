@@ -4,9 +4,20 @@ from sqlalchemy import Column, String, DateTime, JSON
 from databases.database import Base
 from datetime import datetime, timezone
 from sqlalchemy import Integer, DateTime, String, Column, JSON 
+from sqlalchemy import Boolean, Index, UniqueConstraint, false
 
 class JobDescription(Base):
     __tablename__ = "job_descriptions"
+    __table_args__ = (
+        # Idempotency guard: one JD per session and submitted payload.
+        UniqueConstraint("jd_session_id", "payload_hash", name="uq_jd_session_payload"),
+        # Approval: latest JD of an employee's session.
+        Index("ix_jd_employee_session_created", "employee_id", "jd_session_id", "created_at"),
+        Index("ix_jd_status", "status"),
+        # History pages: keyset on (created_at, id), per employee or overall.
+        Index("ix_jd_employee_created_id", "employee_id", "created_at", "id"),
+        Index("ix_jd_created_id", "created_at", "id"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -26,11 +37,24 @@ class JobDescription(Base):
 
     jd_json = Column(JSON, nullable=False)
 
+    # profile_hash() of the submitted qa payload (the idempotency key)
+    payload_hash = Column(String(64), nullable=True)
+    # The qa payload the JD was generated from, for the semantic cache
+    # (services/semantic_cache.py); a speculative draft's lacks its
+    # deferred answers.
+    profile = Column(JSON, nullable=True)
+
     status = Column(String, default="generated")
 
-    created_at = Column(DateTime, default=datetime.utcnow())
+    created_at = Column(DateTime, default=datetime.utcnow)
     approved_at = Column(DateTime, nullable=True)
 
+    # Optimistic concurrency: bumped by every update (ORM flushes check it
+    # automatically, the approve statements in crud bump it explicitly).
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
 class ChatHistory(Base):
     __tablename__ = "chat_history"
     id: Column[int] = Column(Integer, primary_key=True)
@@ -61,3 +85,65 @@ class EmployeeProfileDB(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
+
+
+class AuditLog(Base):
+    """Append-only record of JD lifecycle events, written through the write buffer."""
+    __tablename__ = "audit_log"
+
+    id = Column(Integer, primary_key=True)
+    action = Column(String(32), nullable=False)
+    employee_id = Column(String, index=True)
+    jd_session_id = Column(String, index=True)
+    detail = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class JDCacheEntry(Base):
+    __tablename__ = "jd_cache"
+
+    key = Column(String(64), primary_key=True)
+    jd_json = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class JDJob(Base):
+    """
+    Queued JD generation, drained by worker.py.
+
+    status: queued -> running -> done, or back to queued with a backoff
+    while attempts remain, else dead (dead-lettered, kept for inspection
+    and redrive). A running job whose lease (locked_until) expires is
+    claimable again, so a worker that dies mid-generation loses nothing.
+    """
+    __tablename__ = "jd_jobs"
+    __table_args__ = (
+        # Claim: oldest due job.
+        Index("ix_jd_jobs_status_run_after", "status", "run_after"),
+        # Enqueue: reuse an active job for the same session/payload.
+        Index("ix_jd_jobs_session_payload", "jd_session_id", "payload_hash"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    employee_id = Column(UUID(as_uuid=True), nullable=False)
+    jd_session_id = Column(UUID(as_uuid=True), nullable=False)
+    payload_hash = Column(String(64), nullable=True)
+
+    # {"qa": [...]} as the chat route builds it.
+    profile = Column(JSON, nullable=False)
+    regenerate = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    status = Column(String(16), nullable=False, default="queued", server_default="queued")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=3, server_default="3")
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+
+    result = Column(JSON, nullable=True)
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
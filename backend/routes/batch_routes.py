@@ -0,0 +1,45 @@
+import json
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from schema.schema import BatchRequest
+from services.batch_service import InvalidBatch, get_job, start_batch, stream_results
+
+router = APIRouter(prefix="/agent")
+
+
+# ============================
+# BATCH GENERATION
+# ============================
+
+@router.post("/batch")
+async def batch(data: BatchRequest):
+    try:
+        job = start_batch(data.employee_id, data.items, data.concurrency)
+    except InvalidBatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def ndjson():
+        async for event in stream_results(job):
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(
+        ndjson(),
+        media_type="application/x-ndjson",
+        headers={"X-Job-Id": job.id},
+    )
+
+
+@router.get("/batch/{job_id}")
+def batch_progress(job_id: str, include_results: bool = False):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+
+    progress = job.progress()
+    if include_results:
+        progress["results"] = job.results
+    return progress
@@ -1,12 +1,36 @@
+import asyncio
 import uuid
-import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm.exc import StaleDataError
 
-from databases.dependencies import get_db
+from databases.crud import approve_statement, bulk_approve_statement, latest_jd_statement
+from databases.dependencies import LazyAsyncSession, get_async_db
 from models.model import JobDescription
-from schema.schema import ChatRequest
-from services.jd_service import generate_jd
+from schema.schema import BulkApproveRequest, ChatRequest
+from llm.registry import get_llm
+from services.jd_cache import jd_cache
+from services.jd_service import astream_jd, replay_events
+from services.jd_store import (
+    JDAlreadyApproved,
+    claim_draft,
+    find_jd_json,
+    generate_and_save,
+    save_jd_new_session,
+    speculation_key,
+)
+from services.job_queue import enqueue, job_view, watch_job
+from services.semantic_cache import semantic_cache
+from services.session_store import AnswerOutOfOrder, session_store
+from services.singleflight import jd_flight
+from services.speculation import speculator
+from services.write_buffer import audit, write_buffer
+from settings import get_settings
+from utils.hashing import profile_hash
+from utils.metrics import stage
+from utils.prompt_registry import prompt_registry
+from utils.sse import sse_event
 
 router = APIRouter(prefix="/agent")
 
@@ -72,39 +96,94 @@ QUESTIONS = [
 # CHAT ROUTE
 # ============================
 
+def next_question(qa_list):
+    """Return the next question payload, or None once every field is answered."""
+    if len(qa_list) >= len(QUESTIONS):
+        return None
+
+    q = QUESTIONS[len(qa_list)]
+    return {
+        "type": "question",
+        "question": q["question"],
+        "field": q["field"],
+        "input_type": q["input_type"],
+    }
+
+
+def _uuid(value: str, name: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid {name}")
+
+
+async def resolve_qa(employee_id: str, jd_session_id: str, data: ChatRequest) -> list:
+    """The session's answers so far: as sent (full mode) or from the session store."""
+    if not data.incremental and data.answer is None:
+        return [qa.model_dump() for qa in data.qa]
+
+    if data.answer is None:
+        # Resuming: nothing new, just tell the client where it is.
+        return await session_store.load(employee_id, jd_session_id)
+
+    try:
+        return await session_store.answer(employee_id, jd_session_id, data.answer.model_dump(), QUESTIONS)
+    except AnswerOutOfOrder as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+def pending_fields(qa_list: list) -> list:
+    return [q["field"] for q in QUESTIONS[len(qa_list):]]
+
+
+def wants_queue(data: ChatRequest) -> bool:
+    return get_settings().jd_job_queue if data.enqueue is None else data.enqueue
+
+
 @router.post("/chat/{employee_id}/{jd_session_id}")
-def chat(
-    employee_id: str,
-    jd_session_id: str,
-    data: ChatRequest,
-    db: Session = Depends(get_db),
-):
-    qa_list = data.qa or []
+async def chat(employee_id: str, jd_session_id: str, data: ChatRequest):
+    _uuid(employee_id, "employee_id")
+    _uuid(jd_session_id, "jd_session_id")
+    qa_list = await resolve_qa(employee_id, jd_session_id, data)
 
     # Ask next question
-    if len(qa_list) < len(QUESTIONS):
-        q = QUESTIONS[len(qa_list)]
-        return {
-            "type": "question",
-            "question": q["question"],
-            "field": q["field"],
-            "input_type": q["input_type"],
-        }
-
-    # Generate JD
-    jd_output = generate_jd({"qa": [qa.dict() for qa in qa_list]})
-    jd_json = jd_output.model_dump()
-
-    jd_record = JobDescription(
-        jd_session_id=uuid.UUID(jd_session_id),
-        employee_id=uuid.UUID(employee_id),
-        jd_json=jd_json,
-        status="generated",
-    )
+    question = next_question(qa_list)
+    if question:
+        speculator.maybe_start(speculation_key(employee_id, jd_session_id), qa_list, pending_fields(qa_list))
+        return question
+
+    profile = {"qa": qa_list}
+    payload_hash = profile_hash(profile)
 
-    db.add(jd_record)
-    db.commit()
-    db.refresh(jd_record)
+    # A retry of an already-answered payload is served from the DB.
+    if not data.bypass_cache:
+        jd_json = await find_jd_json(jd_session_id, payload_hash)
+        if jd_json is not None:
+            return {"type": "job_description", "jd_json": jd_json}
+
+    # Hand off to a worker; the client polls or streams the job.
+    if wants_queue(data):
+        # The worker generates from scratch; drop the draft, not leak it.
+        speculator.discard(speculation_key(employee_id, jd_session_id))
+        job = await enqueue(employee_id, jd_session_id, profile, payload_hash, data.bypass_cache)
+        return {"type": "job", **job_view(job)}
+
+    # Generate JD; concurrent identical submissions share one generation.
+    try:
+        jd_json = await jd_flight.do(
+            f"{jd_session_id}:{payload_hash}",
+            generate_and_save,
+            employee_id,
+            jd_session_id,
+            profile,
+            payload_hash,
+            data.bypass_cache,
+        )
+    except StaleDataError:
+        # A regeneration raced an approval (or another regeneration).
+        raise HTTPException(status_code=409, detail="JD changed during regeneration, retry")
+    except JDAlreadyApproved as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
     return {
         "type": "job_description",
@@ -112,24 +191,195 @@ def chat(
     }
 
 
+# ============================
+# STREAMING CHAT ROUTE (SSE)
+# ============================
+
+@router.post("/chat/{employee_id}/{jd_session_id}/stream")
+async def chat_stream(employee_id: str, jd_session_id: str, data: ChatRequest):
+    _uuid(employee_id, "employee_id")
+    _uuid(jd_session_id, "jd_session_id")
+    qa_list = await resolve_qa(employee_id, jd_session_id, data)
+
+    async def events():
+        question = next_question(qa_list)
+        if question:
+            speculator.maybe_start(speculation_key(employee_id, jd_session_id), qa_list, pending_fields(qa_list))
+            yield sse_event("question", question)
+            return
+
+        profile = {"qa": qa_list}
+        payload_hash = profile_hash(profile)
+
+        try:
+            if not data.bypass_cache:
+                jd_json = await find_jd_json(jd_session_id, payload_hash)
+                if jd_json is not None:
+                    for event in replay_events(jd_json):
+                        yield sse_event(event["type"], event)
+                    return
+
+            if wants_queue(data):
+                speculator.discard(speculation_key(employee_id, jd_session_id))
+                job = await enqueue(employee_id, jd_session_id, profile, payload_hash, data.bypass_cache)
+                # Follow the job over this stream; if the client drops, the
+                # job still runs and can be polled by id.
+                async for view in watch_job(str(job.id)):
+                    jd_json = view.pop("jd_json", None)
+                    yield sse_event("job", {"type": "job", **view})
+                    if jd_json is not None:
+                        for event in replay_events(jd_json):
+                            yield sse_event(event["type"], event)
+                return
+
+            draft = await claim_draft(employee_id, jd_session_id, profile, data.bypass_cache)
+            if draft is not None:
+                jd_output, drafted_profile = draft
+                jd_json = await save_jd_new_session(
+                    employee_id, jd_session_id, jd_output.model_dump(),
+                    payload_hash=payload_hash, profile=drafted_profile,
+                )
+                for event in replay_events(jd_json):
+                    yield sse_event(event["type"], event)
+                return
+
+            async for event in astream_jd(profile, bypass_cache=data.bypass_cache):
+                if event["type"] == "complete":
+                    await save_jd_new_session(
+                        employee_id,
+                        jd_session_id,
+                        event["jd_json"],
+                        payload_hash=payload_hash,
+                        replace=data.bypass_cache,
+                        profile=profile,
+                    )
+                yield sse_event(event["type"], event)
+
+        except Exception as e:
+            yield sse_event("error", {"type": "error", "detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ============================
 # APPROVE JD
 # ============================
 
 @router.post("/approve/{employee_id}/{jd_session_id}")
-def approve_jd(employee_id: str, jd_session_id: str, db: Session = Depends(get_db)):
-    jd = (
-        db.query(JobDescription)
-        .filter_by(employee_id=employee_id, jd_session_id=jd_session_id)
-        .first()
+async def approve_jd(
+    employee_id: str,
+    jd_session_id: str,
+    expected_version: Optional[int] = None,
+    db: LazyAsyncSession = Depends(get_async_db),
+):
+    """
+    Approve the latest JD of the session in a single UPDATE ... RETURNING.
+
+    409 when it is no longer approvable: already approved, replaced by a
+    regeneration, or not at expected_version (the version the client saw).
+    """
+    employee_uuid = _uuid(employee_id, "employee_id")
+    session_uuid = _uuid(jd_session_id, "jd_session_id")
+    session = await db.get()
+
+    with stage("db_write"):
+        result = await session.execute(
+            approve_statement(employee_uuid, session_uuid, expected_version)
+        )
+        approved = result.first()
+        await session.commit()
+
+    if approved is None:
+        current = (
+            await session.execute(
+                latest_jd_statement(
+                    employee_uuid, session_uuid, JobDescription.status, JobDescription.version
+                )
+            )
+        ).first()
+        if current is None:
+            raise HTTPException(status_code=404, detail="JD not found")
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "JD is not approvable in its current state",
+                "status": current.status,
+                "version": current.version,
+            },
+        )
+
+    await audit(
+        "jd_approved", employee_id, jd_session_id,
+        jd_id=str(approved.id), version=approved.version,
     )
+    return {
+        "status": "approved",
+        "jd_id": str(approved.id),
+        "version": approved.version,
+        "approved_at": approved.approved_at,
+    }
+
+
+@router.post("/approve/{employee_id}")
+async def bulk_approve_jds(
+    employee_id: str, data: BulkApproveRequest, db: LazyAsyncSession = Depends(get_async_db)
+):
+    """Approve the latest JD of many sessions in one statement."""
+    employee_uuid = _uuid(employee_id, "employee_id")
+    session_uuids = [_uuid(s, "jd_session_id") for s in data.jd_session_ids]
+
+    session = await db.get()
+    with stage("db_write"):
+        result = await session.execute(
+            bulk_approve_statement(employee_uuid, session_uuids)
+        )
+        approved = result.all()
+        await session.commit()
+
+    # Concurrently, so with write_buffer_durability=commit they share one flush.
+    await asyncio.gather(*(
+        audit("jd_approved", employee_id, row.jd_session_id, jd_id=str(row.id), version=row.version)
+        for row in approved
+    ))
+
+    approved_sessions = {str(row.jd_session_id) for row in approved}
+    return {
+        "approved": [
+            {"jd_session_id": str(row.jd_session_id), "jd_id": str(row.id), "version": row.version}
+            for row in approved
+        ],
+        # Unknown, already approved, or lost a race with another update.
+        "not_approved": [s for s in data.jd_session_ids if str(uuid.UUID(s)) not in approved_sessions],
+    }
+
+
+# ============================
+# CACHE STATS
+# ============================
+
+@router.get("/cache/stats")
+def cache_stats():
+    return {
+        **jd_cache.stats(),
+        "coalesced": jd_flight.coalesced,
+        "inflight": jd_flight.inflight(),
+        "chat_sessions": session_store.stats(),
+        "speculation": speculator.stats(),
+        "semantic": semantic_cache.stats(),
+        "write_buffer": write_buffer.stats(),
+    }
+
 
-    if not jd:
-        raise HTTPException(status_code=404, detail="JD not found")
 
-    jd.status = "approved"
-    jd.approved_at = datetime.datetime.utcnow()
+@router.get("/prompts")
+def prompt_versions():
+    return prompt_registry.versions()
 
-    db.commit()
 
-    return {"status": "approved"}
+@router.get("/llm/stats")
+def llm_stats():
+    return get_llm().stats()
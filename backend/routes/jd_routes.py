@@ -0,0 +1,92 @@
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+
+from databases.dependencies import LazyAsyncSession, get_async_db
+from models.model import JobDescription
+from services.jd_history import MAX_PAGE_SIZE, list_jds, search_jds
+from utils.metrics import stage
+
+router = APIRouter(prefix="/agent")
+
+
+def _uuid(value: Optional[str], name: str):
+    if value is None:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}")
+
+
+# ============================
+# JD HISTORY
+# ============================
+
+@router.get("/jds")
+async def jd_history(
+    employee_id: Optional[str] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="comma separated, e.g. id,status,job_title"),
+    db: LazyAsyncSession = Depends(get_async_db),
+):
+    session = await db.get()
+    try:
+        with stage("db_read"):
+            return await list_jds(
+                session, _uuid(employee_id, "employee_id"), status, cursor, limit, fields
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/jds/search")
+async def jd_search(
+    q: str = Query(..., min_length=1, max_length=200),
+    employee_id: Optional[str] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: LazyAsyncSession = Depends(get_async_db),
+):
+    """Full-text search over job_title and required_skills."""
+    session = await db.get()
+    try:
+        with stage("db_read"):
+            return await search_jds(
+                session, q, _uuid(employee_id, "employee_id"), status, cursor, limit, fields
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+
+@router.get("/jds/{jd_id}")
+async def jd_detail(jd_id: str, db: LazyAsyncSession = Depends(get_async_db)):
+    session = await db.get()
+    with stage("db_read"):
+        jd = (
+            await session.execute(
+                select(JobDescription).where(JobDescription.id == _uuid(jd_id, "jd_id"))
+            )
+        ).scalars().first()
+
+    if not jd:
+        raise HTTPException(status_code=404, detail="JD not found")
+
+    return {
+        "id": jd.id,
+        "jd_session_id": jd.jd_session_id,
+        "employee_id": jd.employee_id,
+        "status": jd.status,
+        "version": jd.version,
+        "created_at": jd.created_at,
+        "approved_at": jd.approved_at,
+        "jd_json": jd.jd_json,
+    }
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from services.job_queue import get_job, job_view, queue_stats, redrive, watch_job
+from utils.sse import sse_event
+
+router = APIRouter(prefix="/agent")
+
+
+# ============================
+# QUEUED GENERATION JOBS
+# ============================
+
+@router.get("/jobs/stats")
+async def job_stats():
+    return await queue_stats()
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """SSE: a `job` event on every status change, the last one done or dead."""
+    if await get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        async for view in watch_job(job_id):
+            yield sse_event("job", {"type": "job", **view})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/jobs/{job_id}/redrive")
+async def redrive_job(job_id: str):
+    """Requeue a dead-lettered job."""
+    if await get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not await redrive(job_id):
+        raise HTTPException(status_code=409, detail="Only dead jobs can be redriven")
+    return job_view(await get_job(job_id))
@@ -1,5 +1,5 @@
 from typing import List, Optional, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class QA(BaseModel):
     field: str
@@ -7,7 +7,32 @@ class QA(BaseModel):
 
 
 class ChatRequest(BaseModel):
+    # Full mode: every answer so far, resent each turn.
     qa: List[QA] = []
+    # Incremental mode: only this turn's answer; the server keeps the rest.
+    # incremental=True without an answer returns the session's next question.
+    answer: Optional[QA] = None
+    incremental: bool = False
+    # Force a fresh generation even if an identical profile is cached.
+    bypass_cache: bool = False
+    # Generate in a queued background job and return its id right away
+    # (poll or stream /agent/jobs/{job_id}). None: server default, JD_JOB_QUEUE.
+    enqueue: Optional[bool] = None
+
+class BatchItem(BaseModel):
+    # A fresh session id is assigned when omitted.
+    jd_session_id: Optional[str] = None
+    qa: List[QA]
+
+
+class BatchRequest(BaseModel):
+    employee_id: str
+    items: List[BatchItem]
+    # Capped by BATCH_MAX_CONCURRENCY on the server.
+    concurrency: Optional[int] = None
+
+class BulkApproveRequest(BaseModel):
+    jd_session_ids: List[str] = Field(min_length=1)
 
 class Project(BaseModel):
     project_name: str
@@ -32,12 +57,14 @@ class JDJson(BaseModel):
     projects: Optional[List[Project]] = []
 
 class JDOutput(BaseModel):
-    job_title: str
+    # Also the response schema for constrained decoding (llm/gemini.py), so
+    # the min_length constraints keep the model from returning empty arrays.
+    job_title: str = Field(min_length=1)
     job_summary: str
-    key_responsibilities: List[str]
-    required_skills: List[str]
-    preferred_qualifications: List[str]
-    tools_and_technologies: List[str]
+    key_responsibilities: List[str] = Field(min_length=1)
+    required_skills: List[str] = Field(min_length=1)
+    preferred_qualifications: List[str] = Field(min_length=1)
+    tools_and_technologies: List[str] = Field(min_length=1)
     employment_type: str
     location: str
 
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+
+from databases.crud import abulk_create_jds
+from databases.database import async_session
+from services.jd_service import agenerate_jd
+from utils.hashing import profile_hash
+from settings import get_settings
+from utils.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept around for progress polling.
+BATCH_JOBS_RETAINED = 256
+
+
+class InvalidBatch(ValueError):
+    """The request names an employee or session that is not a valid id."""
+
+
+class BatchJob:
+    def __init__(self, employee_id: str, total: int, concurrency: int):
+        self.id = str(uuid.uuid4())
+        self.employee_id = employee_id
+        self.total = total
+        self.concurrency = concurrency
+        self.completed = 0
+        self.failed = 0
+        self.status = "running"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.results = []
+        # Sessions reported "ok" whose JDs could not be saved.
+        self.unsaved = []
+        self.task = None
+        # Results are also pushed here for the streaming response; the job
+        # itself keeps running if the client goes away.
+        self.queue = asyncio.Queue()
+
+    def progress(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "unsaved": len(self.unsaved),
+            "concurrency": self.concurrency,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+batch_jobs = OrderedDict()
+
+
+def get_job(job_id: str):
+    return batch_jobs.get(job_id)
+
+
+async def _persist(rows: list):
+    if not rows:
+        return
+    async with async_session() as db:
+        with stage("db_write"):
+            await abulk_create_jds(db, rows)
+
+
+async def _run(job: BatchJob, items: list):
+    semaphore = asyncio.Semaphore(job.concurrency)
+    employee_uuid = uuid.UUID(job.employee_id)
+
+    async def work(index, item):
+        jd_session_id = item.jd_session_id or str(uuid.uuid4())
+        profile = {"qa": [qa.model_dump() for qa in item.qa]}
+
+        async with semaphore:
+            try:
+                jd_output = await agenerate_jd(profile)
+            except Exception as e:
+                return index, jd_session_id, profile, None, str(e)
+
+        return index, jd_session_id, profile, jd_output.model_dump(), None
+
+    tasks = [asyncio.create_task(work(i, item)) for i, item in enumerate(items)]
+    rows = []
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, jd_session_id, profile, jd_json, error = await next_done
+
+            result = {"type": "result", "index": index, "jd_session_id": jd_session_id}
+            if error is None:
+                job.completed += 1
+                result.update(status="ok", jd_json=jd_json)
+                rows.append({
+                    "id": uuid.uuid4(),
+                    "jd_session_id": uuid.UUID(jd_session_id),
+                    "employee_id": employee_uuid,
+                    "jd_json": jd_json,
+                    "payload_hash": profile_hash(profile),
+                    "profile": profile,
+                    "status": "generated",
+                })
+            else:
+                job.failed += 1
+                result.update(status="error", detail=error)
+
+            job.results.append(result)
+            await job.queue.put(result)
+
+        # One bulk insert for the whole batch instead of a commit per JD.
+        try:
+            await _persist(rows)
+        except Exception as e:
+            # The "ok" results were already sent: say which ones were lost.
+            job.unsaved = [str(row["jd_session_id"]) for row in rows]
+            job.status = "failed"
+            logger.error("Batch %s: saving %s JDs failed: %s", job.id, len(rows), e)
+            await job.queue.put({
+                "type": "error",
+                "detail": f"Saving the generated JDs failed: {e}",
+                "unsaved_jd_session_ids": job.unsaved,
+            })
+        else:
+            job.status = "done"
+
+    except Exception as e:
+        for task in tasks:
+            task.cancel()
+        job.status = "failed"
+        await job.queue.put({"type": "error", "detail": str(e)})
+
+    finally:
+        job.finished_at = time.time()
+        await job.queue.put(None)
+
+
+def validate_ids(employee_id: str, items: list):
+    """Fail fast on a bad id, before any LLM spend (and not after, mid-batch)."""
+    try:
+        uuid.UUID(employee_id)
+    except ValueError:
+        raise InvalidBatch(f"Invalid employee_id: {employee_id!r}")
+    for index, item in enumerate(items):
+        if item.jd_session_id is None:
+            continue
+        try:
+            uuid.UUID(item.jd_session_id)
+        except ValueError:
+            raise InvalidBatch(f"items[{index}]: invalid jd_session_id {item.jd_session_id!r}")
+
+
+def start_batch(employee_id: str, items: list, concurrency: int = None) -> BatchJob:
+    validate_ids(employee_id, items)
+    settings = get_settings()
+    if len(items) > settings.batch_max_items:
+        raise ValueError(f"Batch too large: {len(items)} items (max {settings.batch_max_items})")
+
+    limit = settings.batch_max_concurrency
+    concurrency = max(1, min(concurrency or limit, limit))
+    job = BatchJob(employee_id, len(items), concurrency)
+
+    batch_jobs[job.id] = job
+    while len(batch_jobs) > BATCH_JOBS_RETAINED:
+        batch_jobs.popitem(last=False)
+
+    job.task = asyncio.create_task(_run(job, items))
+    return job
+
+
+async def stream_results(job: BatchJob):
+    """Job header, then one event per item as it finishes, then a summary."""
+    yield {"type": "job", **job.progress()}
+
+    while True:
+        event = await job.queue.get()
+        if event is None:
+            break
+        yield event
+
+    yield {"type": "summary", **job.progress()}
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from databases.database import SessionLocal
+from models.model import JDCacheEntry
+from settings import Settings, get_settings
+
+class LRUTTLCache:
+    """Thread-safe in-process LRU with a per-entry TTL and a size bound."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLCache:
+    """Second cache tier in the jd_cache table, shared by every API replica."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key):
+        db = SessionLocal()
+        try:
+            entry = db.get(JDCacheEntry, key)
+            if entry is None or entry.expires_at < datetime.utcnow():
+                return None
+            return entry.jd_json
+        finally:
+            db.close()
+
+    def set(self, key, value):
+        now = datetime.utcnow()
+        row = {
+            "key": key,
+            "jd_json": value,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl_seconds),
+        }
+
+        db = SessionLocal()
+        try:
+            dialect = db.get_bind().dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = insert(JDCacheEntry).values(**row)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[JDCacheEntry.key],
+                    set_={k: stmt.excluded[k] for k in ("jd_json", "created_at", "expires_at")},
+                )
+                db.execute(stmt)
+            else:
+                db.merge(JDCacheEntry(**row))
+            db.commit()
+        finally:
+            db.close()
+
+
+class JDCache:
+    """
+    Two-tier cache of generated JDs (in-process LRU, then optional SQL).
+
+    Keys are content addresses computed by the caller, so entries never
+    need invalidating: a changed profile, prompt or model is a new key.
+    """
+
+    def __init__(self, memory: LRUTTLCache, sql: SQLCache = None):
+        self.memory = memory
+        self.sql = sql
+        self.hits = 0
+        self.sql_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "JDCache":
+        return cls(
+            LRUTTLCache(settings.jd_cache_max_entries, settings.jd_cache_ttl_seconds),
+            SQLCache(settings.jd_cache_ttl_seconds) if settings.jd_cache_sql else None,
+        )
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if self.sql is not None:
+            value = self.sql.get(key)
+            if value is not None:
+                self.hits += 1
+                self.sql_hits += 1
+                self.memory.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.sql is not None:
+            self.sql.set(key, value)
+
+    async def aget(self, key):
+        # The SQL tier is sync; keep it off the event loop.
+        if self.sql is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key, value):
+        if self.sql is None:
+            self.memory.set(key, value)
+        else:
+            await asyncio.to_thread(self.set, key, value)
+
+    def record_bypass(self):
+        self.bypasses += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "sql_hits": self.sql_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.memory),
+            "evictions": self.memory.evictions,
+            "sql_enabled": self.sql is not None,
+        }
+
+
+jd_cache = JDCache.from_settings(get_settings())
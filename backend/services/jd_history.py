@@ -0,0 +1,139 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.model import JobDescription
+
+MAX_PAGE_SIZE = 100
+
+# Projectable fields. jd_json is opt-in: list views usually only need the
+# title, not the whole blob.
+LIST_FIELDS = {
+    "id": JobDescription.id,
+    "jd_session_id": JobDescription.jd_session_id,
+    "employee_id": JobDescription.employee_id,
+    "status": JobDescription.status,
+    "version": JobDescription.version,
+    "created_at": JobDescription.created_at,
+    "approved_at": JobDescription.approved_at,
+    "job_title": JobDescription.jd_json["job_title"].as_string(),
+    "jd_json": JobDescription.jd_json,
+}
+DEFAULT_FIELDS = ("id", "jd_session_id", "status", "created_at", "job_title")
+
+# Postgres: must stay identical to the GIN expression index created in
+# migrations/versions/0004_jd_history_search.py, or the index is not used.
+PG_SEARCH_MATCH = text(
+    "to_tsvector('english', coalesce(job_descriptions.jd_json->>'job_title', '') || ' ' || "
+    "coalesce(job_descriptions.jd_json->>'required_skills', '')) "
+    "@@ plainto_tsquery('english', :query)"
+)
+
+# SQLite: FTS5 table sharing job_descriptions' rowid, kept in sync by
+# triggers (same migration).
+SQLITE_SEARCH_MATCH = text(
+    "job_descriptions.rowid IN (SELECT rowid FROM jd_search WHERE jd_search MATCH :query)"
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, jd_id) -> str:
+    raw = json.dumps([created_at.isoformat(), str(jd_id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, jd_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), uuid.UUID(jd_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def parse_fields(fields: str = None) -> list:
+    names = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(DEFAULT_FIELDS)
+    unknown = [name for name in names if name not in LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # The cursor is built from these, so they are always selected.
+    for name in ("created_at", "id"):
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def fts5_query(query: str) -> str:
+    """Quote every term so user input is never parsed as FTS5 syntax."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def _page_statement(names, employee_id=None, status=None, cursor=None, limit=20):
+    stmt = select(*(LIST_FIELDS[name].label(name) for name in names))
+    if employee_id is not None:
+        stmt = stmt.where(JobDescription.employee_id == employee_id)
+    if status is not None:
+        stmt = stmt.where(JobDescription.status == status)
+    if cursor is not None:
+        created_at, jd_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(JobDescription.created_at, JobDescription.id) < tuple_(created_at, jd_id)
+        )
+    # One extra row tells whether there is a next page.
+    return stmt.order_by(JobDescription.created_at.desc(), JobDescription.id.desc()).limit(limit + 1)
+
+
+async def _page(db: AsyncSession, stmt, names, limit) -> dict:
+    rows = (await db.execute(stmt)).all()
+    items = [{name: getattr(row, name) for name in names} for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def list_jds(
+    db: AsyncSession,
+    employee_id: uuid.UUID = None,
+    status: str = None,
+    cursor: str = None,
+    limit: int = 20,
+    fields: str = None,
+) -> dict:
+    """Newest-first page of JDs, keyset-paginated on (created_at, id)."""
+    names = parse_fields(fields)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    stmt = _page_statement(names, employee_id, status, cursor, limit)
+    return await _page(db, stmt, names, limit)
+
+
+async def search_jds(
+    db: AsyncSession,
+    query: str,
+    employee_id: uuid.UUID = None,
+    status: str = None,
+    cursor: str = None,
+    limit: int = 20,
+    fields: str = None,
+) -> dict:
+    """Full-text search over job_title and required_skills, newest first."""
+    names = parse_fields(fields)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    stmt = _page_statement(names, employee_id, status, cursor, limit)
+
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        stmt = stmt.where(PG_SEARCH_MATCH.bindparams(query=query))
+    elif dialect == "sqlite":
+        stmt = stmt.where(SQLITE_SEARCH_MATCH.bindparams(query=fts5_query(query)))
+    else:
+        raise NotImplementedError(f"Full-text search is not available on {dialect}")
+
+    return await _page(db, stmt, names, limit)
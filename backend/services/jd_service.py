@@ -1,10 +1,27 @@
+import asyncio
 import json
+import logging
 import time
-from llm.registry import get_llm
-from utils.prmpt_loader import load_prompt
+from llm.errors import LLMError
+from llm.rate_limiter import estimate_tokens
+from llm.registry import get_llm, model_identity
+from schema.schema import JDOutput
+from services.jd_cache import jd_cache
+from services.semantic_cache import semantic_cache
+from utils.hashing import normalize_profile, stable_hash
+from utils.metrics import (
+    PROMPT_TRIMMED_ANSWERS,
+    record_attempt,
+    record_jd_calls,
+    record_prompt_tokens,
+    stage,
+)
+from utils.prompt_budget import fit_profile, summarize_error
+from utils.prompt_registry import prompt_registry
+from utils.stream_parser import IncrementalJDParser
 from utils.validator import validate_jd_output
 
-llm = get_llm()
+logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 BACKOFF_SECONDS = 1.5
@@ -26,7 +43,12 @@ def validate_jd(jd):
 
 
 def self_correction_prompt(base_prompt, error_msg):
-    """Return the prompt to use when the previous attempt failed."""
+    """
+    Return the prompt to use when the previous attempt failed.
+
+    Always built from the original prompt with only the latest error
+    (summarize_error), so retries do not stack correction blocks.
+    """
     return (
         base_prompt
         + "\n\n"
@@ -51,45 +73,288 @@ Regenerate the job description now.
 
 def attempt_jd_generation(system_prompt, user_prompt):
     """Single attempt to generate JD."""
-    jd_data = llm.generate(system=system_prompt, user=user_prompt)
+    with stage("llm_call"):
+        jd_data = get_llm().generate(system=system_prompt, user=user_prompt)
+    jd = validate_jd_output(jd_data)
+    with stage("validate"):
+        validate_jd(jd)
+    return jd
+
+
+async def aattempt_jd_generation(system_prompt, user_prompt):
+    """Single async attempt to generate JD."""
+    with stage("llm_call"):
+        jd_data = await get_llm().agenerate(system=system_prompt, user=user_prompt)
     jd = validate_jd_output(jd_data)
-    validate_jd(jd)
+    with stage("validate"):
+        validate_jd(jd)
     return jd
 
 
-def generate_jd(profile: dict):
+def build_prompts(profile: dict):
+    """Return the (system, user) prompt pair for a profile, answers fitted to the token budget."""
+    with stage("prompt_load"):
+        template = prompt_registry.get("jd_generator")
+        profile, trimmed = fit_profile(profile)
+        if trimmed:
+            PROMPT_TRIMMED_ANSWERS.inc(trimmed)
+        return template.system, template.render(profile)
+
+
+def count_prompt_tokens(attempt: int, system_prompt: str, user_prompt: str):
+    """Record the estimated input tokens of one attempt's LLM call."""
+    record_prompt_tokens(attempt, estimate_tokens(system_prompt) + estimate_tokens(user_prompt))
+
+
+def cache_key(profile: dict) -> str:
+    """Content address of a generation: normalized profile + prompt + model(s)."""
+    return stable_hash(
+        normalize_profile(profile),
+        prompt_registry.get("jd_generator").content_hash,
+        model_identity(),
+    )
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff before the next attempt."""
+    return BACKOFF_SECONDS * (2 ** (attempt - 1))
+
+
+def retry_plan(error: Exception, attempt: int):
+    """
+    Decide how to retry after a failed attempt: (delay_seconds, self_correct).
+
+    Provider errors (network, 5xx, quota) resend the same prompt after a
+    backoff, honouring the provider's retry-after; re-prompting cannot fix
+    them. Bad output is re-prompted with a correction straight away, since
+    waiting does not help there. Provider errors that retrying cannot fix
+    (auth, bad request) are re-raised.
+    """
+    if isinstance(error, LLMError):
+        if not error.retryable:
+            raise error
+        return max(backoff_delay(attempt), error.retry_after or 0), False
+    return 0.0, True
+
+
+def generate_jd(profile: dict, bypass_cache: bool = False):
     """
     Production-grade JD generation with:
+    - response cache (skipped with bypass_cache)
     - schema validation
     - retry logic
     - self-correction
     - exponential backoff
     """
 
-    prompt = load_prompt("jd_generator")
-    system_prompt = prompt["role"]
+    key = cache_key(profile)
+    if bypass_cache:
+        jd_cache.record_bypass()
+    else:
+        with stage("cache_lookup"):
+            cached = jd_cache.get(key)
+        if cached is not None:
+            logger.debug("JD cache hit")
+            return JDOutput.model_validate(cached)
+
+    jd = _generate_jd_uncached(profile)
+    jd_cache.set(key, jd.model_dump())
+    return jd
 
-    base_user_prompt = prompt["user_prompt"].replace(
-        "{{profile}}", json.dumps(profile, indent=2)
-    )
+
+def _generate_jd_uncached(profile: dict):
+    system_prompt, base_user_prompt = build_prompts(profile)
+    user_prompt = base_user_prompt
 
     last_error = None
 
     for attempt in range(1, MAX_RETRIES + 1):
+        started = time.perf_counter()
         try:
-            print(f"🤖 JD generation attempt {attempt}")
-            return attempt_jd_generation(system_prompt, base_user_prompt)
+            logger.debug("JD generation attempt %s", attempt)
+            count_prompt_tokens(attempt, system_prompt, user_prompt)
+            jd = attempt_jd_generation(system_prompt, user_prompt)
+            record_attempt(attempt, started, "ok")
+            record_jd_calls(attempt, "ok")
+            return jd
 
         except Exception as e:
+            record_attempt(attempt, started, "error")
             last_error = e
-            print(f"⚠️ Attempt {attempt} failed → {e}")
-            base_user_prompt = self_correction_prompt(base_user_prompt, str(e))
+            logger.warning("Attempt %s failed: %s", attempt, e)
+            try:
+                delay, self_correct = retry_plan(e, attempt)
+            except LLMError:
+                record_jd_calls(attempt, "failed")
+                raise
+            if self_correct:
+                user_prompt = self_correction_prompt(base_user_prompt, summarize_error(e))
 
-            if attempt < MAX_RETRIES:
+            if attempt < MAX_RETRIES and delay:
                 # Exponential backoff
-                time.sleep(BACKOFF_SECONDS * (2 ** (attempt - 1)))
+                with stage("backoff"):
+                    time.sleep(delay)
 
     # Hard failure after all retries
+    record_jd_calls(MAX_RETRIES, "failed")
+    raise RuntimeError(
+        f"JD generation failed after {MAX_RETRIES} attempts"
+    ) from last_error
+
+
+async def agenerate_jd(profile: dict, bypass_cache: bool = False):
+    """
+    Async counterpart of generate_jd.
+
+    Same cache / retry / self-correction / backoff policy, but the LLM call
+    and the backoff sleep are awaited, so a pending generation only holds a
+    coroutine instead of a worker thread.
+    """
+
+    key = cache_key(profile)
+    if bypass_cache:
+        jd_cache.record_bypass()
+    else:
+        with stage("cache_lookup"):
+            cached = await jd_cache.aget(key)
+        if cached is not None:
+            logger.debug("JD cache hit")
+            return JDOutput.model_validate(cached)
+
+        similar = await semantic_cache.lookup(profile)
+        if similar is not None:
+            await jd_cache.aset(key, similar)
+            return JDOutput.model_validate(similar)
+
+    jd = await _agenerate_jd_uncached(profile)
+    await jd_cache.aset(key, jd.model_dump())
+    return jd
+
+
+async def _agenerate_jd_uncached(profile: dict):
+    system_prompt, base_user_prompt = build_prompts(profile)
+    user_prompt = base_user_prompt
+
+    last_error = None
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        started = time.perf_counter()
+        try:
+            logger.debug("JD generation attempt %s", attempt)
+            count_prompt_tokens(attempt, system_prompt, user_prompt)
+            jd = await aattempt_jd_generation(system_prompt, user_prompt)
+            record_attempt(attempt, started, "ok")
+            record_jd_calls(attempt, "ok")
+            return jd
+
+        except Exception as e:
+            record_attempt(attempt, started, "error")
+            last_error = e
+            logger.warning("Attempt %s failed: %s", attempt, e)
+            try:
+                delay, self_correct = retry_plan(e, attempt)
+            except LLMError:
+                record_jd_calls(attempt, "failed")
+                raise
+            if self_correct:
+                user_prompt = self_correction_prompt(base_user_prompt, summarize_error(e))
+
+            if attempt < MAX_RETRIES and delay:
+                with stage("backoff"):
+                    await asyncio.sleep(delay)
+
+    record_jd_calls(MAX_RETRIES, "failed")
+    raise RuntimeError(
+        f"JD generation failed after {MAX_RETRIES} attempts"
+    ) from last_error
+
+
+def replay_events(jd_json: dict):
+    """Parser-shaped events for an already complete JD (cache hits)."""
+    for field, value in jd_json.items():
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                yield {"type": "item", "field": field, "index": index, "value": item}
+        yield {"type": "field", "field": field, "value": value}
+    yield {"type": "complete", "jd_json": jd_json}
+
+
+async def astream_jd(profile: dict, bypass_cache: bool = False):
+    """
+    Streaming JD generation.
+
+    Yields parser events ("item" / "field") as soon as each value of the
+    JSON response is complete, followed by a final "complete" event with
+    the validated JD. A malformed stream is abandoned on the first bad
+    value; it is retried only if nothing was yielded yet, since events
+    already sent to the client cannot be taken back.
+    """
+
+    key = cache_key(profile)
+    if bypass_cache:
+        jd_cache.record_bypass()
+    else:
+        with stage("cache_lookup"):
+            cached = await jd_cache.aget(key)
+        if cached is None:
+            cached = await semantic_cache.lookup(profile)
+            if cached is not None:
+                await jd_cache.aset(key, cached)
+        if cached is not None:
+            logger.debug("JD cache hit")
+            for event in replay_events(cached):
+                yield event
+            return
+
+    system_prompt, base_user_prompt = build_prompts(profile)
+    user_prompt = base_user_prompt
+
+    last_error = None
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        parser = IncrementalJDParser()
+        emitted = False
+        started = time.perf_counter()
+
+        try:
+            logger.debug("JD stream attempt %s", attempt)
+            count_prompt_tokens(attempt, system_prompt, user_prompt)
+            async for chunk in get_llm().agenerate_stream(
+                system=system_prompt, user=user_prompt
+            ):
+                for event in parser.feed(chunk):
+                    emitted = True
+                    yield event
+
+            with stage("validate"):
+                jd = parser.finish()
+                validate_jd(jd)
+            record_attempt(attempt, started, "ok")
+            record_jd_calls(attempt, "ok")
+            await jd_cache.aset(key, jd.model_dump())
+            yield {"type": "complete", "jd_json": jd.model_dump()}
+            return
+
+        except Exception as e:
+            record_attempt(attempt, started, "error")
+            last_error = e
+            logger.warning("Stream attempt %s failed: %s", attempt, e)
+            if emitted:
+                record_jd_calls(attempt, "failed")
+                raise
+            try:
+                delay, self_correct = retry_plan(e, attempt)
+            except LLMError:
+                record_jd_calls(attempt, "failed")
+                raise
+            if self_correct:
+                user_prompt = self_correction_prompt(base_user_prompt, summarize_error(e))
+
+            if attempt < MAX_RETRIES and delay:
+                with stage("backoff"):
+                    await asyncio.sleep(delay)
+
+    record_jd_calls(MAX_RETRIES, "failed")
     raise RuntimeError(
         f"JD generation failed after {MAX_RETRIES} attempts"
     ) from last_error
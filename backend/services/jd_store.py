@@ -0,0 +1,131 @@
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from databases.database import async_session
+from models.model import JobDescription
+from services.jd_service import agenerate_jd
+from services.speculation import speculator
+from services.write_buffer import audit
+from utils.metrics import stage
+
+
+class JDAlreadyApproved(ValueError):
+    pass
+
+
+async def find_jd(db: AsyncSession, jd_session_id: str, payload_hash: str):
+    result = await db.execute(
+        select(JobDescription)
+        .filter_by(jd_session_id=uuid.UUID(jd_session_id), payload_hash=payload_hash)
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def save_jd(
+    db: AsyncSession,
+    employee_id: str,
+    jd_session_id: str,
+    jd_json: dict,
+    payload_hash: str = None,
+    replace: bool = False,
+    profile: dict = None,
+):
+    """
+    Insert the JD for a session/payload, at most once.
+
+    A retried or double-submitted payload finds the existing row (or loses
+    the insert race on uq_jd_session_payload) and gets that row back
+    instead of writing a duplicate. replace=True overwrites it, for
+    explicit regenerations, unless it is approved (JDAlreadyApproved).
+    """
+    existing = await find_jd(db, jd_session_id, payload_hash) if payload_hash else None
+
+    if existing is None:
+        jd_record = JobDescription(
+            jd_session_id=uuid.UUID(jd_session_id),
+            employee_id=uuid.UUID(employee_id),
+            jd_json=jd_json,
+            payload_hash=payload_hash,
+            profile=profile,
+            status="generated",
+        )
+
+        db.add(jd_record)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            # Only a lost race on uq_jd_session_payload leaves a row to return.
+            existing = await find_jd(db, jd_session_id, payload_hash) if payload_hash else None
+            if existing is None:
+                raise
+        else:
+            await audit("jd_generated", employee_id, jd_session_id, jd_id=str(jd_record.id))
+            return jd_record
+
+    if replace:
+        if existing.status == "approved":
+            raise JDAlreadyApproved(f"JD {existing.id} is approved and cannot be regenerated")
+        existing.jd_json = jd_json
+        existing.status = "generated"
+        existing.approved_at = None
+        await db.commit()
+        await audit(
+            "jd_regenerated", employee_id, jd_session_id,
+            jd_id=str(existing.id), version=existing.version,
+        )
+
+    return existing
+
+
+# Background tasks and streams can outlive the request, so they open
+# their own short-lived session instead of a request-scoped one.
+
+async def save_jd_new_session(employee_id: str, jd_session_id: str, jd_json: dict, **kwargs):
+    async with async_session() as db:
+        with stage("db_write"):
+            return (await save_jd(db, employee_id, jd_session_id, jd_json, **kwargs)).jd_json
+
+
+async def find_jd_json(jd_session_id: str, payload_hash: str):
+    async with async_session() as db:
+        with stage("db_read"):
+            jd = await find_jd(db, jd_session_id, payload_hash)
+            return jd.jd_json if jd else None
+
+
+def speculation_key(employee_id: str, jd_session_id: str) -> str:
+    return f"{employee_id}:{jd_session_id}"
+
+
+async def claim_draft(employee_id: str, jd_session_id: str, profile: dict, regenerate: bool):
+    """
+    (JD, profile it was drafted from) of the session's speculative draft if
+    still valid, else None (always on regenerate).
+    """
+    key = speculation_key(employee_id, jd_session_id)
+    if regenerate:
+        speculator.discard(key)
+        return None
+    return await speculator.claim(key, profile["qa"])
+
+
+async def generate_and_save(employee_id, jd_session_id, profile, payload_hash, regenerate):
+    draft = await claim_draft(employee_id, jd_session_id, profile, regenerate)
+    if draft is not None:
+        jd_output, profile = draft
+    else:
+        jd_output = await agenerate_jd(profile, bypass_cache=regenerate)
+
+    return await save_jd_new_session(
+        employee_id,
+        jd_session_id,
+        jd_output.model_dump(),
+        payload_hash=payload_hash,
+        replace=regenerate,
+        profile=profile,
+    )
@@ -0,0 +1,280 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm.exc import StaleDataError
+
+from databases.database import async_session
+from llm.errors import LLMError
+from models.model import JDJob
+from settings import get_settings
+from utils.metrics import JD_JOBS_TOTAL, stage
+
+ACTIVE_STATUSES = ("queued", "running")
+FINAL_STATUSES = ("done", "dead")
+
+
+def job_view(job: JDJob) -> dict:
+    view = {
+        "job_id": str(job.id),
+        "jd_session_id": str(job.jd_session_id),
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+    if job.status == "done":
+        view["jd_json"] = job.result
+    if job.last_error is not None:
+        view["error"] = job.last_error
+    return view
+
+
+# Database failures a later attempt can get past: connection lost or
+# refused, pool exhausted, or an update that raced another writer.
+TRANSIENT_DB_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError, StaleDataError)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Only transient failures are retried: retryable provider errors (5xx,
+    429, network) and transient database or connection errors. Anything
+    else (auth, bad request, invalid output, JDAlreadyApproved, bugs)
+    fails the same way every time and goes straight to dead.
+    """
+    if isinstance(error, LLMError):
+        return error.retryable
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, TRANSIENT_DB_ERRORS + (ConnectionError, TimeoutError))
+
+
+def retry_delay(attempts: int) -> float:
+    return get_settings().jd_job_retry_backoff_seconds * (2 ** (attempts - 1))
+
+
+# ============================
+# PRODUCER SIDE (API)
+# ============================
+
+async def enqueue(
+    employee_id: str,
+    jd_session_id: str,
+    profile: dict,
+    payload_hash: str,
+    regenerate: bool = False,
+) -> JDJob:
+    """
+    Queue a generation, or return the job already queued / running for the
+    same session and payload (a retried or double-submitted turn).
+    """
+    session_uuid = uuid.UUID(jd_session_id)
+    async with async_session() as db:
+        with stage("db_write"):
+            if not regenerate:
+                active = (
+                    await db.execute(
+                        select(JDJob)
+                        .where(
+                            JDJob.jd_session_id == session_uuid,
+                            JDJob.payload_hash == payload_hash,
+                            JDJob.status.in_(ACTIVE_STATUSES),
+                        )
+                        .limit(1)
+                    )
+                ).scalars().first()
+                if active is not None:
+                    JD_JOBS_TOTAL.labels("reused").inc()
+                    return active
+
+            job = JDJob(
+                employee_id=uuid.UUID(employee_id),
+                jd_session_id=session_uuid,
+                payload_hash=payload_hash,
+                profile=profile,
+                regenerate=regenerate,
+                max_attempts=get_settings().jd_job_max_attempts,
+                run_after=datetime.utcnow(),
+            )
+            db.add(job)
+            await db.commit()
+
+    JD_JOBS_TOTAL.labels("enqueued").inc()
+    return job
+
+
+async def get_job(job_id: str):
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        return None
+    async with async_session() as db:
+        with stage("db_read"):
+            return await db.get(JDJob, job_uuid)
+
+
+async def watch_job(job_id: str):
+    """Yield the job's view on every status change, until it is final."""
+    last = None
+    while True:
+        job = await get_job(job_id)
+        if job is None:
+            return
+        if (job.status, job.attempts) != last:
+            last = (job.status, job.attempts)
+            yield job_view(job)
+        if job.status in FINAL_STATUSES:
+            return
+        await asyncio.sleep(get_settings().jd_job_watch_interval)
+
+
+async def redrive(job_id: str) -> bool:
+    """Put a dead-lettered job back on the queue with a fresh attempt budget."""
+    async with async_session() as db:
+        with stage("db_write"):
+            result = await db.execute(
+                update(JDJob)
+                .where(JDJob.id == uuid.UUID(job_id), JDJob.status == "dead")
+                .values(
+                    status="queued",
+                    attempts=0,
+                    run_after=datetime.utcnow(),
+                    finished_at=None,
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            await db.commit()
+    return result.rowcount == 1
+
+
+async def queue_stats() -> dict:
+    async with async_session() as db:
+        with stage("db_read"):
+            counts = dict(
+                (
+                    await db.execute(select(JDJob.status, func.count()).group_by(JDJob.status))
+                ).all()
+            )
+            oldest = (
+                await db.execute(
+                    select(func.min(JDJob.run_after)).where(JDJob.status == "queued")
+                )
+            ).scalar()
+
+    return {
+        "by_status": counts,
+        "oldest_queued_seconds": (
+            max(0.0, (datetime.utcnow() - oldest).total_seconds()) if oldest else 0.0
+        ),
+    }
+
+
+# ============================
+# CONSUMER SIDE (worker.py)
+# ============================
+
+def claim_statement(worker_id: str, limit: int, now: datetime):
+    """
+    Lease up to `limit` due jobs in one UPDATE ... RETURNING.
+
+    Due: queued and past run_after, or running with a lapsed lease. On
+    Postgres the candidates are locked with FOR UPDATE SKIP LOCKED, so
+    concurrent workers take disjoint jobs without waiting on each other.
+    SQLite does not render the lock clause; there the single statement is
+    serialized by the database write lock instead.
+    """
+    due = or_(
+        and_(JDJob.status == "queued", JDJob.run_after <= now),
+        and_(JDJob.status == "running", JDJob.locked_until < now),
+    )
+    candidates = (
+        select(JDJob.id)
+        .where(due)
+        .order_by(JDJob.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(JDJob)
+        .where(JDJob.id.in_(candidates), due)
+        .values(
+            status="running",
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=get_settings().jd_job_visibility_timeout),
+            attempts=JDJob.attempts + 1,
+        )
+        .returning(JDJob)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _owned(job_id, worker_id: str):
+    return and_(JDJob.id == job_id, JDJob.status == "running", JDJob.locked_by == worker_id)
+
+
+async def claim(worker_id: str, limit: int) -> list:
+    if limit <= 0:
+        return []
+    async with async_session() as db:
+        with stage("db_write"):
+            jobs = (await db.execute(claim_statement(worker_id, limit, datetime.utcnow()))).scalars().all()
+            await db.commit()
+    return list(jobs)
+
+
+async def renew_lease(job_id, worker_id: str) -> bool:
+    async with async_session() as db:
+        result = await db.execute(
+            update(JDJob)
+            .where(_owned(job_id, worker_id))
+            .values(locked_until=datetime.utcnow() + timedelta(seconds=get_settings().jd_job_visibility_timeout)),
+            execution_options={"synchronize_session": False},
+        )
+        await db.commit()
+    return result.rowcount == 1
+
+
+async def _finish(job_id, worker_id: str, outcome: str, **values) -> bool:
+    async with async_session() as db:
+        with stage("db_write"):
+            result = await db.execute(
+                update(JDJob)
+                .where(_owned(job_id, worker_id))
+                .values(locked_by=None, locked_until=None, **values),
+                execution_options={"synchronize_session": False},
+            )
+            await db.commit()
+
+    if result.rowcount != 1:
+        # Lease lapsed and another worker took the job over; its result wins.
+        JD_JOBS_TOTAL.labels("lease_lost").inc()
+        return False
+    JD_JOBS_TOTAL.labels(outcome).inc()
+    return True
+
+
+async def complete(job: JDJob, worker_id: str, jd_json: dict) -> bool:
+    return await _finish(
+        job.id, worker_id, "done",
+        status="done", result=jd_json, last_error=None, finished_at=datetime.utcnow(),
+    )
+
+
+async def fail(job: JDJob, worker_id: str, error: Exception) -> bool:
+    """Requeue with a backoff while attempts remain, else dead-letter."""
+    message = f"{type(error).__name__}: {error}"
+    if is_retryable(error) and job.attempts < job.max_attempts:
+        return await _finish(
+            job.id, worker_id, "retried",
+            status="queued",
+            last_error=message,
+            run_after=datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts)),
+        )
+    return await _finish(
+        job.id, worker_id, "dead",
+        status="dead", last_error=message, finished_at=datetime.utcnow(),
+    )
@@ -0,0 +1,378 @@
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import select, tuple_
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: one process per index directory there
+    fcntl = None
+
+from databases.database import async_session
+from models.model import JobDescription
+from settings import Settings, get_settings
+from utils.embedding import EMBEDDING_VERSION, embed_fields, embed_profile, token_set
+from utils.metrics import SEMANTIC_CACHE_SIMILARITY, SEMANTIC_CACHE_TOTAL, stage
+
+logger = logging.getLogger(__name__)
+
+# Optional: vectorized search and a memory-mapped index. Imported where
+# used, so that only processes with the cache enabled pay for it.
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+REFRESH_BATCH = 1000
+
+
+class SemanticIndex:
+    """
+    Unit vectors of approved JDs' profiles, searched by cosine similarity.
+
+    With numpy and a directory, rows are persisted append-only as raw
+    float32 (vectors.f32) next to their JD ids (ids.txt) and the DB
+    high-water mark (meta.json); startup memory-maps them and only embeds
+    what was approved since. Without numpy it is a plain in-memory list.
+
+    The directory is shared by every process on the host (uvicorn and
+    worker processes): the one holding writer.lock appends to it and may
+    repair it; the others map what is there and keep newer rows in memory.
+    """
+
+    def __init__(self, dim: int, directory: str = ""):
+        self.dim = dim
+        self.directory = Path(directory) if directory and HAS_NUMPY else None
+        self.ids = []
+        self.watermark = None
+        self._known = set()
+        self._base = None
+        self._tail = []
+        self._tail_matrix = None
+        self.writer = False
+        self._lock_file = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, jd_id: str):
+        return jd_id in self._known
+
+    # ----------------------------
+    # persistence
+    # ----------------------------
+
+    def _paths(self):
+        return (
+            self.directory / "vectors.f32",
+            self.directory / "ids.txt",
+            self.directory / "meta.json",
+        )
+
+    def _acquire_writer(self) -> bool:
+        """Become the directory's single writer, unless another process is."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            return True
+        lock_file = open(self.directory / "writer.lock", "a")
+        try:
+            # Held until the process exits; the OS releases it on a crash.
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def load(self):
+        if self.directory is None:
+            return
+        self.writer = self._acquire_writer()
+        vectors_path, ids_path, meta_path = self._paths()
+        if not meta_path.exists():
+            return
+
+        meta = json.loads(meta_path.read_text())
+        if meta.get("dim") != self.dim or meta.get("version") != EMBEDDING_VERSION:
+            if self.writer:
+                logger.info("Semantic index built with other settings, rebuilding")
+                for path in (vectors_path, ids_path, meta_path):
+                    path.unlink(missing_ok=True)
+            return
+
+        # Only newline-terminated ids: the writer may be mid-append.
+        ids = ids_path.read_text().split("\n")[:-1] if ids_path.exists() else []
+        rows = vectors_path.stat().st_size // (4 * self.dim) if vectors_path.exists() else 0
+        # A crash between the two appends leaves one side longer: cut both
+        # to the common prefix. meta.json is written last, so its mark is
+        # never ahead of the rows and the refresh re-adds what was cut.
+        # Readers use the same prefix, so nothing they mapped is cut.
+        count = min(rows, len(ids))
+        if self.writer and (rows != count or len(ids) != count):
+            if vectors_path.exists():
+                os.truncate(vectors_path, count * 4 * self.dim)
+            ids_path.write_text("".join(jd_id + "\n" for jd_id in ids[:count]))
+        if count:
+            import numpy as np
+
+            self._base = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        self.ids = ids[:count]
+        self._known = set(self.ids)
+        if meta.get("watermark"):
+            self.watermark = datetime.fromisoformat(meta["watermark"])
+
+    def _append(self, ids: list, vectors: list):
+        vectors_path, ids_path, meta_path = self._paths()
+        import numpy as np
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(vectors_path, "ab") as f:
+            f.write(np.asarray(vectors, dtype=np.float32).tobytes())
+        with open(ids_path, "a") as f:
+            f.write("".join(jd_id + "\n" for jd_id in ids))
+        meta_path.write_text(json.dumps({
+            "dim": self.dim,
+            "version": EMBEDDING_VERSION,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+        }))
+
+    # ----------------------------
+    # index
+    # ----------------------------
+
+    def add(self, entries: list, watermark: datetime):
+        """Add [(jd_id, vector)] and advance the high-water mark."""
+        entries = [(jd_id, vector) for jd_id, vector in entries if jd_id not in self._known]
+        if watermark is not None:
+            self.watermark = max(self.watermark or watermark, watermark)
+        if not entries:
+            return
+
+        for jd_id, vector in entries:
+            self.ids.append(jd_id)
+            self._known.add(jd_id)
+            self._tail.append(vector)
+        self._tail_matrix = None
+
+        if self.directory is not None and self.writer:
+            self._append([jd_id for jd_id, _ in entries], [vector for _, vector in entries])
+
+    def search(self, vector: list):
+        """(jd_id, similarity) of the nearest row, or (None, 0.0) when empty."""
+        if not self.ids:
+            return None, 0.0
+
+        if not HAS_NUMPY:
+            scores = [sum(a * b for a, b in zip(row, vector)) for row in self._tail]
+            best = max(range(len(scores)), key=scores.__getitem__)
+            return self.ids[best], scores[best]
+
+        import numpy as np
+
+        query = np.asarray(vector, dtype=np.float32)
+        if self._tail and self._tail_matrix is None:
+            self._tail_matrix = np.asarray(self._tail, dtype=np.float32)
+        parts = [m @ query for m in (self._base, self._tail_matrix) if m is not None]
+        scores = np.concatenate(parts)
+        best = int(np.argmax(scores))
+        return self.ids[best], float(scores[best])
+
+
+def _jd_fields(jd_json: dict) -> dict:
+    """JDs approved before profiles were stored: index their own fields."""
+    return {field: value for field, value in jd_json.items() if isinstance(value, (str, list))}
+
+
+def _answers(profile: dict) -> dict:
+    return {item["field"]: item["answer"] for item in profile.get("qa", [])}
+
+
+def exact_fields_match(profile: dict, candidate: dict, fields: tuple) -> bool:
+    """
+    Whether `profile` agrees with the candidate's answers (its stored
+    profile, or for older rows its jd_json) on every exact field both have.
+    """
+    answers = _answers(profile)
+    return all(
+        token_set(answers[field]) == token_set(candidate[field])
+        for field in fields
+        if field in answers and field in candidate
+    )
+
+
+def adapt(jd_json: dict, profile: dict) -> dict:
+    """The cached JD with the requester's own job title (e.g. "Sr." vs "Senior")."""
+    answers = _answers(profile)
+    adapted = dict(jd_json)
+    if isinstance(answers.get("job_title"), str) and answers["job_title"].strip():
+        adapted["job_title"] = answers["job_title"].strip()
+    return adapted
+
+
+class SemanticCache:
+    """
+    Similarity cache in front of JD generation.
+
+    Profiles are embedded with a hashed n-gram vectorizer (utils/embedding)
+    and matched against profiles of approved JDs; above the threshold, and
+    with the exact fields agreeing, the approved JD is served (adapted)
+    instead of calling the LLM. The index is
+    refreshed incrementally from the DB: everything approved since its
+    high-water mark.
+    """
+
+    def __init__(
+        self,
+        index: SemanticIndex,
+        threshold: float,
+        exact_fields: tuple,
+        refresh_seconds: float,
+        enabled: bool,
+    ):
+        self.index = index
+        self.threshold = threshold
+        self.exact_fields = exact_fields
+        self.refresh_seconds = refresh_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._loaded = False
+        self._refreshed_at = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SemanticCache":
+        return cls(
+            SemanticIndex(settings.jd_semantic_dim, settings.jd_semantic_index_dir),
+            settings.jd_semantic_threshold,
+            settings.jd_semantic_exact_fields,
+            settings.jd_semantic_refresh_seconds,
+            settings.jd_semantic_cache,
+        )
+
+    async def load(self):
+        """Startup: map the persisted index, then catch up with the DB."""
+        if not self.enabled or self._loaded:
+            return
+        self._loaded = True
+        started = time.perf_counter()
+        self.index.load()
+        loaded = len(self.index)
+        await self.refresh()
+        logger.info(
+            "Semantic index: %s JDs (%s mapped from disk) in %.2fs",
+            len(self.index), loaded, time.perf_counter() - started,
+        )
+
+    async def refresh(self):
+        async with self._lock:
+            self._refreshed_at = time.monotonic()
+            last = None
+            while True:
+                stmt = (
+                    select(
+                        JobDescription.id,
+                        JobDescription.profile,
+                        JobDescription.jd_json,
+                        JobDescription.approved_at,
+                    )
+                    .where(JobDescription.status == "approved")
+                    .order_by(JobDescription.approved_at, JobDescription.id)
+                    .limit(REFRESH_BATCH)
+                )
+                if last is not None:
+                    # Keyset on (approved_at, id): a bulk approval gives many
+                    # rows the same approved_at, possibly more than a page.
+                    stmt = stmt.where(
+                        tuple_(JobDescription.approved_at, JobDescription.id) > tuple_(*last)
+                    )
+                elif self.index.watermark is not None:
+                    # >=: rows approved in the same instant as the mark; known ids are skipped.
+                    stmt = stmt.where(JobDescription.approved_at >= self.index.watermark)
+
+                async with async_session() as db:
+                    with stage("db_read"):
+                        rows = (await db.execute(stmt)).all()
+
+                fresh = [row for row in rows if str(row.id) not in self.index]
+                self.index.add(
+                    [
+                        (
+                            str(row.id),
+                            embed_profile(row.profile, self.index.dim)
+                            if row.profile
+                            else embed_fields(_jd_fields(row.jd_json), self.index.dim),
+                        )
+                        for row in fresh
+                    ],
+                    rows[-1].approved_at if rows else None,
+                )
+                if len(rows) < REFRESH_BATCH:
+                    return
+                last = (rows[-1].approved_at, rows[-1].id)
+
+    async def lookup(self, profile: dict):
+        """An approved near-duplicate's JD adapted to `profile`, or None."""
+        if not self.enabled:
+            return None
+        if not self._loaded:
+            await self.load()
+        elif time.monotonic() - self._refreshed_at > self.refresh_seconds:
+            await self.refresh()
+
+        with stage("semantic_lookup"):
+            jd_id, score = self.index.search(embed_profile(profile, self.index.dim))
+        if jd_id is not None:
+            SEMANTIC_CACHE_SIMILARITY.observe(score)
+        if jd_id is None or score < self.threshold:
+            self.misses += 1
+            SEMANTIC_CACHE_TOTAL.labels("miss").inc()
+            return None
+
+        async with async_session() as db:
+            with stage("db_read"):
+                match = (
+                    await db.execute(
+                        select(JobDescription.profile, JobDescription.jd_json).where(
+                            JobDescription.id == uuid.UUID(jd_id),
+                            # Regenerated since it was indexed: no longer approved.
+                            JobDescription.status == "approved",
+                        )
+                    )
+                ).first()
+        if match is None:
+            self.misses += 1
+            SEMANTIC_CACHE_TOTAL.labels("stale").inc()
+            return None
+
+        candidate = _answers(match.profile) if match.profile else match.jd_json
+        if not exact_fields_match(profile, candidate, self.exact_fields):
+            self.misses += 1
+            SEMANTIC_CACHE_TOTAL.labels("mismatch").inc()
+            return None
+        jd_json = match.jd_json
+
+        self.hits += 1
+        SEMANTIC_CACHE_TOTAL.labels("hit").inc()
+        logger.debug("Semantic cache hit (similarity %.3f)", score)
+        return adapt(jd_json, profile)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "indexed": len(self.index),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_mapped": self.index.directory is not None,
+            "index_writer": self.index.writer,
+        }
+
+
+semantic_cache = SemanticCache.from_settings(get_settings())
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import logging
+
+from sqlalchemy import func, select
+
+from databases.database import async_session
+from models.model import ChatHistory, EmployeeProfileDB
+from services.jd_cache import LRUTTLCache
+from services.write_buffer import write_buffer
+from settings import Settings, get_settings
+from utils.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# Question field -> employee_profiles column, filled in once a session is complete.
+PROFILE_COLUMNS = {
+    "job_title": "current_role",
+    "key_responsibilities": "responsibilities",
+    "required_skills": "skills",
+    "tools_and_technologies": "tools",
+    "work_environment": "work_type",
+    "reporting_structure": "reporting_to",
+    "achievements": "achievements",
+    "leadership": "leadership",
+}
+
+
+class AnswerOutOfOrder(ValueError):
+    pass
+
+
+def _profile_value(answer):
+    if isinstance(answer, list):
+        return ", ".join(str(item) for item in answer)
+    return None if answer is None else str(answer)
+
+
+class ChatSessionStore:
+    """
+    Server-side answers of in-progress chat sessions.
+
+    Lets a client send only the new answer each turn instead of the whole
+    qa list. State lives in a bounded LRU with TTL; with persistence on,
+    each answer is also appended to chat_history through the write buffer
+    (batched, off the request path unless write_buffer_durability asks
+    otherwise), and a session missing from memory is reloaded in one query.
+    With `shared` set, a session in memory is also reloaded when the DB has
+    rows it has not seen, e.g. written by another replica.
+    """
+
+    def __init__(self, memory: LRUTTLCache, persist: bool = True, shared: bool = False):
+        self.memory = memory
+        self.persist = persist
+        self.shared = persist and shared
+        self.reloads = 0
+        self.stale_hits = 0
+        self._pending = set()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ChatSessionStore":
+        return cls(
+            LRUTTLCache(settings.chat_session_max_entries, settings.chat_session_ttl_seconds),
+            persist=settings.chat_session_persist,
+            shared=settings.chat_session_shared,
+        )
+
+    @staticmethod
+    def _key(employee_id: str, jd_session_id: str):
+        return employee_id, jd_session_id
+
+    async def load(self, employee_id: str, jd_session_id: str) -> list:
+        qa_list, _ = await self._load(employee_id, jd_session_id)
+        return list(qa_list)
+
+    async def _load(self, employee_id: str, jd_session_id: str):
+        """The session's (qa_list, newest chat_history id seen)."""
+        key = self._key(employee_id, jd_session_id)
+        entry = self.memory.get(key)
+        if entry is not None and self.shared:
+            if await self._last_id(employee_id, jd_session_id) != entry[1]:
+                self.stale_hits += 1
+                entry = None
+        if entry is None:
+            entry = await self._reload(employee_id, jd_session_id) if self.persist else ([], None)
+            self.memory.set(key, entry)
+        return entry
+
+    async def answer(self, employee_id: str, jd_session_id: str, qa: dict, questions: list) -> list:
+        """
+        Record one answer and return the session's full qa list.
+
+        The answer must be for the next unanswered field; re-sending an
+        already answered field replaces it, so a retried turn is harmless.
+        """
+        qa_list, last_id = await self._load(employee_id, jd_session_id)
+        qa_list = list(qa_list)
+        fields = [q["field"] for q in questions]
+
+        answered = [item["field"] for item in qa_list]
+        if qa["field"] in answered:
+            index = answered.index(qa["field"])
+            qa_list[index] = qa
+        elif len(qa_list) < len(fields) and qa["field"] == fields[len(qa_list)]:
+            index = len(qa_list)
+            qa_list.append(qa)
+        else:
+            expected = fields[len(qa_list)] if len(qa_list) < len(fields) else None
+            raise AnswerOutOfOrder(f"Expected an answer for '{expected}', got '{qa['field']}'")
+
+        self.memory.set(self._key(employee_id, jd_session_id), (qa_list, last_id))
+        if self.persist:
+            await write_buffer.add(ChatHistory, {
+                "employee_id": employee_id,
+                "jd_session_id": jd_session_id,
+                "sender": "user",
+                "message": json.dumps({"index": index, **qa}),
+            })
+            if len(qa_list) == len(fields):
+                self._write_behind(self._persist_profile(employee_id, jd_session_id, qa_list))
+        return list(qa_list)
+
+    # ----------------------------
+    # persistence
+    # ----------------------------
+
+    def _write_behind(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task):
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Chat session write-behind failed: %s", task.exception())
+
+    @staticmethod
+    def _of_session(employee_id: str, jd_session_id: str) -> tuple:
+        return (
+            ChatHistory.jd_session_id == jd_session_id,
+            ChatHistory.employee_id == employee_id,
+            ChatHistory.sender == "user",
+        )
+
+    async def _last_id(self, employee_id: str, jd_session_id: str):
+        # This instance's own answers still in the write buffer are not
+        # counted; once flushed they move the id and cost one reload.
+        async with async_session() as db:
+            with stage("db_read"):
+                return (
+                    await db.execute(
+                        select(func.max(ChatHistory.id)).where(*self._of_session(employee_id, jd_session_id))
+                    )
+                ).scalar()
+
+    async def _reload(self, employee_id: str, jd_session_id: str) -> tuple:
+        # Answers of this session still in this instance's write buffer count
+        # too; other sessions' rows are left to batch up.
+        if write_buffer.has_pending(ChatHistory, employee_id=employee_id, jd_session_id=jd_session_id):
+            await write_buffer.flush()
+        async with async_session() as db:
+            with stage("db_read"):
+                rows = (
+                    await db.execute(
+                        select(ChatHistory.id, ChatHistory.message)
+                        .where(*self._of_session(employee_id, jd_session_id))
+                        .order_by(ChatHistory.id)
+                    )
+                ).all()
+
+        if rows:
+            self.reloads += 1
+        # Later rows win: a replaced answer is written again under its index.
+        by_index = {}
+        for _, message in rows:
+            entry = json.loads(message)
+            by_index[entry["index"]] = {"field": entry["field"], "answer": entry["answer"]}
+        return [by_index[i] for i in sorted(by_index)], rows[-1].id if rows else None
+
+    async def _persist_profile(self, employee_id: str, jd_session_id: str, qa_list: list):
+        values = {
+            PROFILE_COLUMNS[item["field"]]: _profile_value(item["answer"])
+            for item in qa_list
+            if item["field"] in PROFILE_COLUMNS
+        }
+        async with async_session() as db:
+            with stage("db_write"):
+                profile = (
+                    await db.execute(
+                        select(EmployeeProfileDB).where(
+                            EmployeeProfileDB.employee_id == employee_id,
+                            EmployeeProfileDB.jd_session_id == jd_session_id,
+                        )
+                    )
+                ).scalars().first()
+                if profile is None:
+                    db.add(EmployeeProfileDB(employee_id=employee_id, jd_session_id=jd_session_id, **values))
+                else:
+                    for column, value in values.items():
+                        setattr(profile, column, value)
+                await db.commit()
+
+    async def flush(self):
+        """Wait for pending write-behind tasks (shutdown)."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.memory),
+            "evictions": self.memory.evictions,
+            "reloads": self.reloads,
+            "stale_hits": self.stale_hits,
+            "pending_writes": len(self._pending),
+            "persist": self.persist,
+        }
+
+
+session_store = ChatSessionStore.from_settings(get_settings())
@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+from llm.rate_limiter import estimate_tokens
+from services.jd_service import agenerate_jd, build_prompts
+from settings import Settings, get_settings
+from utils.metrics import SPECULATION_TOTAL, SPECULATION_WASTED_TOKENS
+
+
+def _answers(qa_list: list, deferred: tuple) -> dict:
+    return {item["field"]: item["answer"] for item in qa_list if item["field"] not in deferred}
+
+
+class Draft:
+    def __init__(self, qa_list: list, task: asyncio.Task):
+        self.qa_list = qa_list
+        self.task = task
+        self.started_at = time.monotonic()
+
+
+class Speculator:
+    """
+    Speculative JD drafts for sessions that are still answering questions.
+
+    maybe_start() launches a background generation once only the deferred
+    fields are left, and restarts it if an earlier answer is changed
+    meanwhile; claim() at the final turn hands the draft over (with the
+    profile it was generated from) if every other answer is unchanged, or
+    cancels it. Unused drafts are counted as wasted tokens.
+    """
+
+    def __init__(self, enabled: bool, budget: int, deferred_fields: tuple, ttl_seconds: float):
+        self.enabled = enabled and budget > 0 and bool(deferred_fields)
+        self.budget = budget
+        self.deferred_fields = deferred_fields
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._drafts = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "Speculator":
+        return cls(
+            settings.jd_speculative,
+            settings.jd_speculative_budget,
+            settings.jd_speculative_deferred_fields,
+            settings.jd_speculative_ttl_seconds,
+        )
+
+    def running(self) -> int:
+        return sum(1 for draft in self._drafts.values() if not draft.task.done())
+
+    def _matches(self, draft: Draft, qa_list: list) -> bool:
+        return _answers(draft.qa_list, self.deferred_fields) == _answers(qa_list, self.deferred_fields)
+
+    def maybe_start(self, session_key: str, qa_list: list, pending: list):
+        """Draft from qa_list if only deferred fields are `pending` (unanswered)."""
+        if not self.enabled or not all(field in self.deferred_fields for field in pending):
+            return
+
+        draft = self._drafts.get(session_key)
+        if draft is not None:
+            if self._matches(draft, qa_list):
+                return
+            # An earlier answer was changed: this draft can no longer hit.
+            self._discard(self._drafts.pop(session_key), "miss")
+
+        self._expire()
+        if self.running() >= self.budget:
+            SPECULATION_TOTAL.labels("skipped_budget").inc()
+            return
+
+        profile = {"qa": list(qa_list)}
+        task = asyncio.ensure_future(agenerate_jd(profile))
+        # Retrieve a failure here so it is not reported as never retrieved.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._drafts[session_key] = Draft(list(qa_list), task)
+        SPECULATION_TOTAL.labels("started").inc()
+
+    async def claim(self, session_key: str, qa_list: list):
+        """
+        (draft JD, profile it was generated from) for the final answers, or
+        None to generate normally.
+        """
+        draft = self._drafts.pop(session_key, None)
+        if draft is None:
+            return None
+
+        if not self._matches(draft, qa_list):
+            self._discard(draft, "miss")
+            return None
+
+        try:
+            jd = await asyncio.shield(draft.task)
+        except Exception:
+            SPECULATION_TOTAL.labels("failed").inc()
+            return None
+
+        self.hits += 1
+        SPECULATION_TOTAL.labels("hit").inc()
+        return jd, {"qa": draft.qa_list}
+
+    def discard(self, session_key: str):
+        draft = self._drafts.pop(session_key, None)
+        if draft is not None:
+            self._discard(draft, "miss")
+
+    def _discard(self, draft: Draft, outcome: str):
+        if outcome == "miss":
+            self.misses += 1
+        SPECULATION_TOTAL.labels(outcome).inc()
+
+        system, user = build_prompts({"qa": draft.qa_list})
+        wasted = estimate_tokens(system) + estimate_tokens(user)
+        if draft.task.done() and not draft.task.cancelled() and draft.task.exception() is None:
+            wasted += estimate_tokens(draft.task.result().model_dump_json())
+        else:
+            draft.task.cancel()
+        SPECULATION_WASTED_TOKENS.inc(wasted)
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        for session_key in [k for k, d in self._drafts.items() if d.started_at < cutoff]:
+            self._discard(self._drafts.pop(session_key), "expired")
+
+    def stats(self) -> dict:
+        claimed = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "budget": self.budget,
+            "running": self.running(),
+            "drafts": len(self._drafts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / claimed if claimed else 0.0,
+        }
+
+
+speculator = Speculator.from_settings(get_settings())
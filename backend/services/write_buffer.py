@@ -0,0 +1,280 @@
+import asyncio
+import json
+import logging
+
+from sqlalchemy import JSON, insert
+
+from databases.database import async_session
+from models.model import AuditLog
+from settings import Settings, get_settings
+from utils.metrics import WRITE_BUFFER_PENDING, WRITE_BUFFER_ROWS, stage
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("buffered", "commit", "direct")
+
+
+def _complete_row(table, row: dict) -> dict:
+    """
+    The row with every column present, Python-side defaults applied.
+
+    executemany batching needs the same keys in every row, and COPY bypasses
+    SQLAlchemy's default handling altogether. Autoincrement keys are left
+    to the database.
+    """
+    complete = {}
+    for column in table.columns:
+        if column.name in row:
+            complete[column.name] = row[column.name]
+        elif column.primary_key and column.autoincrement in (True, "auto"):
+            continue
+        elif column.default is not None and column.default.is_callable:
+            complete[column.name] = column.default.arg(None)
+        elif column.default is not None and column.default.is_scalar:
+            complete[column.name] = column.default.arg
+        else:
+            complete[column.name] = None
+    return complete
+
+
+class WriteBuffer:
+    """
+    Write-behind buffer for append-only rows (chat history, audit log).
+
+    Rows are collected in memory and inserted in one transaction per flush,
+    one executemany INSERT per table (COPY on Postgres), instead of a
+    commit per row.
+    A flush runs when max_rows are pending or the oldest row has waited
+    flush_seconds, and on shutdown (close(), from the FastAPI lifespan).
+    Rows of a failed flush go back in front of the queue, within
+    max_pending, and are retried on the next flush; after max_retries
+    failed flushes in a row they are dropped. In commit mode the writers
+    get the error instead.
+    """
+
+    def __init__(
+        self,
+        max_rows: int,
+        flush_seconds: float,
+        max_pending: int,
+        durability: str = "buffered",
+        use_copy: bool = True,
+        max_retries: int = 5,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown write buffer durability: {durability}")
+        self.max_rows = max(1, max_rows)
+        self.flush_seconds = flush_seconds
+        self.max_pending = max(self.max_rows, max_pending)
+        self.durability = durability
+        self.use_copy = use_copy
+        self.max_retries = max_retries
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.retried_rows = 0
+        self._failures = 0
+        self._rows = {}
+        self._flushing = {}
+        self._waiters = []
+        self._pending = 0
+        self._lock = asyncio.Lock()
+        self._timer = None
+        self._drainer = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "WriteBuffer":
+        return cls(
+            settings.write_buffer_max_rows,
+            settings.write_buffer_flush_seconds,
+            settings.write_buffer_max_pending,
+            settings.write_buffer_durability.lower(),
+            settings.write_buffer_copy,
+            settings.write_buffer_max_retries,
+        )
+
+    def pending(self) -> int:
+        return self._pending
+
+    def has_pending(self, model, **match) -> bool:
+        """Whether rows of `model` with these column values are not committed yet."""
+        table = model.__table__
+        return any(
+            all(row.get(column) == value for column, value in match.items())
+            for batch in (self._rows, self._flushing)
+            for row in batch.get(table, ())
+        )
+
+    async def add(self, model, row: dict):
+        table = model.__table__
+        row = _complete_row(table, row)
+
+        if self.durability == "direct":
+            await self._write({table: [row]})
+            return
+
+        # Backpressure instead of unbounded growth when the DB falls behind;
+        # while it is down, retry every flush_seconds rather than spin.
+        while self._pending >= self.max_pending:
+            if not await self.flush():
+                await asyncio.sleep(self.flush_seconds)
+
+        self._rows.setdefault(table, []).append(row)
+        self._pending += 1
+        waiter = None
+        if self.durability == "commit":
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+
+        # Group commit flushes right away: rows added while a flush is
+        # running go into the next one.
+        if self._pending >= self.max_rows or waiter is not None:
+            self._flush_soon()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.ensure_future(self._flush_later())
+
+        if waiter is not None:
+            await waiter
+
+    def _flush_soon(self):
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.ensure_future(self._drain())
+
+    async def _drain(self):
+        while self._pending >= self.max_rows or self._waiters:
+            if not await self.flush():
+                # Retried by the timer rather than in a tight loop.
+                self._flush_after_failure()
+                return
+
+    def _flush_after_failure(self):
+        if self._pending and (self._timer is None or self._timer.done()):
+            self._timer = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_seconds)
+        if not await self.flush():
+            self._timer = None
+            self._flush_after_failure()
+
+    async def flush(self) -> bool:
+        """Write everything pending; False if the write failed."""
+        async with self._lock:
+            if not self._pending:
+                return True
+            batch, waiters = self._rows, self._waiters
+            self._rows, self._waiters, self._pending = {}, [], 0
+            self._flushing = batch
+
+            try:
+                await self._write(batch)
+            except Exception as e:
+                self._failures += 1
+                count = sum(len(rows) for rows in batch.values())
+                logger.warning("Write buffer flush of %s rows failed (%s in a row): %s", count, self._failures, e)
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+                # Writers in commit mode were told; the rest is retried.
+                self._requeue({} if waiters else batch)
+                return False
+            else:
+                self._failures = 0
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+                return True
+            finally:
+                self._flushing = {}
+
+    def _requeue(self, batch: dict):
+        """Put a failed batch back in front of the queue, or drop it once out of retries or room."""
+        room = self.max_pending - self._pending if self._failures <= self.max_retries else 0
+        for table, rows in batch.items():
+            kept = rows[:max(0, room)]
+            room -= len(kept)
+            if kept:
+                self._rows[table] = kept + self._rows.get(table, [])
+                self._pending += len(kept)
+                self.retried_rows += len(kept)
+                WRITE_BUFFER_ROWS.labels(table.name, "retried").inc(len(kept))
+            dropped = len(rows) - len(kept)
+            if dropped:
+                self.failed_rows += dropped
+                WRITE_BUFFER_ROWS.labels(table.name, "failed").inc(dropped)
+                logger.error("Write buffer dropped %s %s rows", dropped, table.name)
+
+    async def _write(self, batch: dict):
+        async with async_session() as db:
+            with stage("db_write"):
+                connection = await db.connection()
+                copy = (
+                    self.use_copy
+                    and connection.dialect.name == "postgresql"
+                    and connection.dialect.driver == "asyncpg"
+                )
+                for table, rows in batch.items():
+                    if copy:
+                        await self._copy(connection, table, rows)
+                    else:
+                        # executemany: SQLAlchemy sends it as batched
+                        # multi-row VALUES ("insertmanyvalues") where the
+                        # driver benefits, with one cached statement instead
+                        # of compiling a huge literal VALUES list.
+                        await connection.execute(insert(table), rows)
+                await db.commit()
+
+        self.flushes += 1
+        for table, rows in batch.items():
+            self.flushed_rows += len(rows)
+            WRITE_BUFFER_ROWS.labels(table.name, "flushed").inc(len(rows))
+
+    @staticmethod
+    async def _copy(connection, table, rows: list):
+        columns = list(rows[0])
+        # asyncpg's COPY codecs take JSON as text.
+        json_columns = {c for c in columns if isinstance(table.c[c].type, JSON)}
+        records = [
+            tuple(
+                json.dumps(row[c]) if c in json_columns and row[c] is not None else row[c]
+                for c in columns
+            )
+            for row in rows
+        ]
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name, records=records, columns=columns, schema_name=table.schema
+        )
+
+    async def close(self):
+        """Flush everything still pending (shutdown), retrying a failed flush."""
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._drainer is not None:
+            await asyncio.gather(self._drainer, return_exceptions=True)
+        while not await self.flush() and self._pending:
+            await asyncio.sleep(self.flush_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "durability": self.durability,
+            "pending": self._pending,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "retried_rows": self.retried_rows,
+            "failed_rows": self.failed_rows,
+        }
+
+
+write_buffer = WriteBuffer.from_settings(get_settings())
+WRITE_BUFFER_PENDING.set_function(write_buffer.pending)
+
+
+async def audit(action: str, employee_id, jd_session_id, **detail):
+    """Append an audit_log row through the write buffer."""
+    await write_buffer.add(AuditLog, {
+        "action": action,
+        "employee_id": str(employee_id),
+        "jd_session_id": str(jd_session_id),
+        "detail": detail or None,
+    })
@@ -0,0 +1,204 @@
+import os
+from dataclasses import dataclass, fields
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Every tunable of the app, read once per process by get_settings().
+
+    Each field is set from the environment variable of the same name in
+    upper case (database_url <- DATABASE_URL); unset or empty keeps the
+    default. Tuples are comma-separated, booleans accept 1 / true / yes.
+    """
+
+    database_url: str = None
+    gemini_api_key: str = None
+
+    # --- Database pool (None: 1 / 0 for SQLite, 10 / 20 otherwise) ---
+    db_pool_size: int = None
+    db_max_overflow: int = None
+    db_pool_timeout: float = 30
+    # Recycle before server / proxy idle timeouts drop the connection.
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Run `alembic upgrade head` on startup. Turn off when several replicas
+    # start at once and migrations are applied as a separate deploy step.
+    db_auto_migrate: bool = True
+
+    # --- LLM backends ---
+    # Single-backend switch ("gemini" or "fake"), used when llm_backends is unset.
+    llm_backend: str = "gemini"
+    # Named backends: Gemini model names, or "stub" for the offline FakeLLM.
+    # More than one enables latency-aware routing.
+    llm_backends: tuple = ()
+    # HTTP connection pool shared by every request to the provider.
+    llm_pool_size: int = 100
+    llm_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 60
+    llm_timeout_seconds: float = 60
+    llm_prewarm: bool = True
+
+    # Stub backend behaviour, for load tests and benchmarks.
+    fake_llm_latency: str = "fixed:0"
+    fake_llm_quota_error_rate: float = 0
+    fake_llm_failure_rate: float = 0
+    fake_llm_malformed_rate: float = 0
+    fake_llm_seed: int = 0
+    fake_llm_context_cache: bool = True
+    fake_llm_prefill_seconds_per_1k: float = 0
+
+    # Provider rate limits, and the adaptive concurrency kept under them.
+    llm_rpm: float = 1000
+    llm_tpm: float = 1000000
+    llm_min_concurrency: int = 1
+    llm_max_concurrency: int = 64
+    llm_initial_concurrency: int = 8
+    # Output tokens are unknown up front; reserve this many per call.
+    llm_expected_output_tokens: int = 800
+
+    # Routing between several backends.
+    llm_hedge: bool = False
+    # Hedge delay until a backend has enough samples for a p95.
+    llm_hedge_default_delay: float = 8
+    llm_max_error_rate: float = 0.5
+    # An unhealthy backend gets a probe request after this long.
+    llm_unhealthy_cooldown: float = 30
+    # Share of calls sent to a non-best backend to keep its latency current.
+    llm_explore_rate: float = 0.05
+
+    # Register the static system prompt as provider-side cached content, so
+    # each call only sends (and pays full price for) the per-request part.
+    gemini_context_cache: bool = True
+    gemini_context_cache_ttl: int = 3600
+    # The provider refuses to cache less than this many tokens (4096 for the
+    # Pro models); shorter system prompts are sent inline without asking.
+    gemini_context_cache_min_tokens: int = 1024
+    # Constrain decoding to the JDOutput schema (required fields, non-empty
+    # arrays) instead of paying a retry when the output misses it.
+    gemini_response_schema: bool = True
+
+    # --- Prompts ---
+    # How often (seconds) a template file is re-statted for hot reload.
+    prompt_reload_interval: float = 2
+    # Token budgets for the profile in the user prompt (0 = unlimited). Any
+    # single answer is cut to prompt_answer_max_tokens; if the whole profile
+    # is still over prompt_profile_max_tokens, the longest answers are cut further.
+    prompt_answer_max_tokens: int = 400
+    prompt_profile_max_tokens: int = 2000
+    # How much of a failed attempt's error is quoted back in the correction.
+    prompt_error_max_items: int = 5
+    prompt_error_max_chars: int = 400
+
+    # --- Caches ---
+    jd_cache_max_entries: int = 1024
+    jd_cache_ttl_seconds: float = 86400
+    jd_cache_sql: bool = False
+    # Opt-in: a near-duplicate approved JD is served instead of generating.
+    jd_semantic_cache: bool = False
+    # Cosine similarity a profile needs with an approved one to reuse its JD.
+    # Watch jd_semantic_cache_similarity before lowering it.
+    jd_semantic_threshold: float = 0.9
+    jd_semantic_dim: int = 1024
+    # Answers that must match word for word (ignoring order, case and known
+    # abbreviations) on top of the similarity: a Junior profile is very close
+    # to a Senior one, and so is a remote one to an onsite one.
+    jd_semantic_exact_fields: tuple = ("job_title", "work_environment")
+    # Where the index is persisted (and memory-mapped from on startup); needs
+    # numpy. Empty: rebuilt from the DB on every start.
+    jd_semantic_index_dir: str = ""
+    # How often lookups pick up JDs approved since (by any replica).
+    jd_semantic_refresh_seconds: float = 60
+
+    # --- Chat sessions ---
+    chat_session_max_entries: int = 10000
+    chat_session_ttl_seconds: float = 3600
+    # Write answers behind to chat_history so a session survives eviction,
+    # restarts and other replicas.
+    chat_session_persist: bool = True
+    # Memory is per instance: without sticky routing (every turn of a session
+    # to the same replica) another replica's answers are missed. Set this when
+    # turns can land anywhere; each memory hit then checks the session's newest
+    # chat_history id and reloads when it moved (one extra query per turn).
+    chat_session_shared: bool = False
+
+    # Opt-in: start drafting the JD before the last questions are answered.
+    jd_speculative: bool = False
+    # Max speculative generations in flight per instance, so drafts never take
+    # more than this share of the LLM concurrency from real requests.
+    jd_speculative_budget: int = 4
+    # Drafting starts once only these are left unanswered, and a draft is
+    # reused whatever the final answers to them are (the JD is saved with the
+    # profile it was drafted from, so what it left out stays visible).
+    # Every other answer must be unchanged at the final turn.
+    jd_speculative_deferred_fields: tuple = ("leadership",)
+    # Drafts of sessions that never finish are dropped after this long.
+    jd_speculative_ttl_seconds: float = 900
+
+    # --- Write buffer ---
+    # Flush once this many rows are pending...
+    write_buffer_max_rows: int = 500
+    # ...or once the oldest pending row has waited this long.
+    write_buffer_flush_seconds: float = 1.0
+    # Memory bound: past this, writers wait for a flush instead of queueing more.
+    write_buffer_max_pending: int = 10000
+    # buffered: add() returns at once; a crash loses up to one flush interval,
+    #           and so does a DB outage longer than write_buffer_max_retries
+    #           flushes (the rows are then dropped and counted as failed).
+    # commit:   add() returns once the batch holding the row is committed
+    #           (group commit: concurrent writers still share one transaction).
+    # direct:   one transaction per row, no buffering.
+    write_buffer_durability: str = "buffered"
+    # Postgres + asyncpg: flush with COPY instead of INSERT.
+    write_buffer_copy: bool = True
+    # Failed flushes in a row whose rows are re-queued before they are dropped.
+    write_buffer_max_retries: int = 5
+
+    # --- Batches, job queue and workers ---
+    batch_max_concurrency: int = 8
+    batch_max_items: int = 1000
+    # Chat route default: enqueue the generation and return a job id instead of
+    # generating inside the request. A request can still choose with `enqueue`.
+    jd_job_queue: bool = False
+    jd_job_max_attempts: int = 3
+    # Lease a worker holds on a claimed job; renewed while it is running, so it
+    # only lapses when the worker dies or hangs.
+    jd_job_visibility_timeout: float = 120
+    jd_job_retry_backoff_seconds: float = 10
+    # How often job status streams re-read the row.
+    jd_job_watch_interval: float = 0.5
+    jd_worker_processes: int = 1
+    jd_worker_concurrency: int = 8
+    # Idle poll interval when the queue is empty.
+    jd_worker_poll_seconds: float = 1.0
+
+    # --- Observability ---
+    # Level of the app's own log lines (DEBUG shows cache hits and attempts).
+    log_level: str = "INFO"
+    # Optional OTLP export of the same spans to a local collector.
+    otel_exporter_otlp_endpoint: str = None
+    otel_service_name: str = "jd-generator"
+
+
+def _parse(value: str, kind: type):
+    if kind is bool:
+        return value.lower() in ("1", "true", "yes")
+    if kind is tuple:
+        return tuple(item.strip() for item in value.split(",") if item.strip())
+    return kind(value)
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    # .env is read here, on first use, so no module has to be imported
+    # before another for its values to apply.
+    load_dotenv()
+    values = {}
+    for field in fields(Settings):
+        value = os.getenv(field.name.upper())
+        if value:
+            values[field.name] = _parse(value.strip(), field.type)
+    return Settings(**values)
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+import databases.database as database
+from settings import get_settings
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """Sets environment variables and re-reads the settings from them."""
+
+    def set_env(**values):
+        for name, value in values.items():
+            monkeypatch.setenv(name, str(value))
+        get_settings.cache_clear()
+
+    yield set_env
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def sqlite_url(tmp_path, monkeypatch):
+    """A throwaway SQLite DATABASE_URL, with the app's engines built against it."""
+    url = f"sqlite:///{tmp_path}/app.db"
+    monkeypatch.setenv("DATABASE_URL", url)
+    get_settings.cache_clear()
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(database, "_async_engine", None)
+    yield url
+    if database._async_engine is not None:
+        asyncio.run(database._async_engine.dispose())
+    if database._engine is not None:
+        database._engine.dispose()
+    get_settings.cache_clear()
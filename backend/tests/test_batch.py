@@ -0,0 +1,50 @@
+import asyncio
+import uuid
+
+import pytest
+
+import services.batch_service as batch_service
+from schema.schema import BatchItem, QA
+from services.batch_service import InvalidBatch, start_batch, stream_results
+
+
+def items(*session_ids):
+    return [BatchItem(jd_session_id=s, qa=[QA(field="job_title", answer="Engineer")]) for s in session_ids]
+
+
+@pytest.mark.parametrize("employee_id, session_ids", [
+    ("not-a-uuid", [None]),
+    (str(uuid.uuid4()), [str(uuid.uuid4()), "not-a-uuid"]),
+])
+def test_bad_ids_are_rejected_before_generating(monkeypatch, employee_id, session_ids):
+    called = []
+    monkeypatch.setattr(batch_service, "agenerate_jd", lambda profile: called.append(profile))
+    with pytest.raises(InvalidBatch):
+        start_batch(employee_id, items(*session_ids))
+    assert not called
+
+
+def test_failed_save_reports_the_lost_sessions(monkeypatch):
+    class JD:
+        def model_dump(self):
+            return {"job_title": "Engineer"}
+
+    async def generate(profile):
+        return JD()
+
+    async def persist(rows):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(batch_service, "agenerate_jd", generate)
+    monkeypatch.setattr(batch_service, "_persist", persist)
+    session_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+
+    async def run():
+        job = start_batch(str(uuid.uuid4()), items(*session_ids))
+        return [event async for event in stream_results(job)]
+
+    events = asyncio.run(run())
+    error = next(e for e in events if e["type"] == "error")
+    assert sorted(error["unsaved_jd_session_ids"]) == sorted(session_ids)
+    assert events[-1]["status"] == "failed"
+    assert events[-1]["unsaved"] == 2
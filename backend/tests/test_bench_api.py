@@ -0,0 +1,27 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+BENCH = Path(__file__).resolve().parent.parent / "bench" / "bench_api.py"
+
+spec = importlib.util.spec_from_file_location("bench_api", BENCH)
+bench_api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_api)
+
+BASELINE = {"jd_throughput_ratio": 0.2, "jd_p95_ratio": 3.0, "question_p95_ms": 1.5}
+
+
+def test_ratio_metrics_use_their_own_tolerance():
+    slower = {**BASELINE, "jd_throughput_ratio": 0.14, "jd_p95_ratio": 3.5}
+    assert bench_api.regressions(slower, BASELINE) == ["jd_throughput_ratio: 0.14 < baseline 0.2"]
+
+
+def test_absolute_question_latency_only_fails_on_a_blowup():
+    assert bench_api.regressions({**BASELINE, "question_p95_ms": 5.0}, BASELINE) == []
+    assert bench_api.regressions({**BASELINE, "question_p95_ms": 6.0}, BASELINE) != []
+
+
+def test_stub_latency_matches_the_spec():
+    stub = bench_api.stub_latency("fixed:0.2", seed=1, samples=10)
+    assert stub == pytest.approx({"mean_ms": 200.0, "p95_ms": 200.0, "p99_ms": 200.0})
@@ -0,0 +1,69 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import null
+from sqlalchemy.exc import IntegrityError
+
+from databases.database import Base, async_session, get_engine
+from routes.chat_routes import QUESTIONS, router
+from services.jd_store import JDAlreadyApproved, save_jd
+
+
+@pytest.fixture
+def client(sqlite_url):
+    Base.metadata.create_all(get_engine())
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize("path, body", [
+    (f"/agent/approve/not-a-uuid/{uuid.uuid4()}", None),
+    (f"/agent/approve/{uuid.uuid4()}/not-a-uuid", None),
+    ("/agent/approve/not-a-uuid", {"jd_session_ids": [str(uuid.uuid4())]}),
+    (f"/agent/approve/{uuid.uuid4()}", {"jd_session_ids": ["not-a-uuid"]}),
+])
+def test_approve_rejects_malformed_ids(client, path, body):
+    assert client.post(path, json=body).status_code == 422
+
+
+def test_regenerating_an_approved_jd_is_refused(client):
+    employee_id, jd_session_id = str(uuid.uuid4()), str(uuid.uuid4())
+
+    async def save(**kwargs):
+        async with async_session() as db:
+            return (await save_jd(db, employee_id, jd_session_id, kwargs.pop("jd_json"), **kwargs)).jd_json
+
+    asyncio.run(save(jd_json={"job_title": "Engineer"}, payload_hash="h"))
+    assert client.post(f"/agent/approve/{employee_id}/{jd_session_id}").status_code == 200
+
+    with pytest.raises(JDAlreadyApproved):
+        asyncio.run(save(jd_json={"job_title": "Manager"}, payload_hash="h", replace=True))
+    assert asyncio.run(save(jd_json={}, payload_hash="h")) == {"job_title": "Engineer"}
+
+
+def test_save_reraises_an_integrity_error_that_is_not_a_duplicate(sqlite_url):
+    Base.metadata.create_all(get_engine())
+
+    async def save():
+        async with async_session() as db:
+            # NOT NULL jd_json, not a lost race on uq_jd_session_payload.
+            await save_jd(db, str(uuid.uuid4()), str(uuid.uuid4()), null(), payload_hash="h")
+
+    with pytest.raises(IntegrityError):
+        asyncio.run(save())
+
+
+@pytest.mark.parametrize("suffix", ["", "/stream"])
+@pytest.mark.parametrize("employee_id, jd_session_id", [
+    ("not-a-uuid", str(uuid.uuid4())),
+    (str(uuid.uuid4()), "not-a-uuid"),
+])
+def test_chat_rejects_malformed_ids(client, suffix, employee_id, jd_session_id):
+    qa = [{"field": q["field"], "answer": "x"} for q in QUESTIONS]
+    response = client.post(f"/agent/chat/{employee_id}/{jd_session_id}{suffix}", json={"qa": qa})
+    assert response.status_code == 422
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+pytest.importorskip("google.genai")
+
+import llm.gemini as gemini
+from llm.errors import LLMError
+from llm.gemini import GeminiLLM
+from settings import get_settings
+
+
+class CachesClient:
+    """A Gemini client whose caches.create fails `failures` times, then succeeds."""
+
+    def __init__(self, failures: int = 0):
+        self.creates = 0
+        self.failures = failures
+
+        def create(model, config):
+            self.creates += 1
+            if self.failures:
+                self.failures -= 1
+                raise httpx.ConnectError("connection refused")
+            return SimpleNamespace(name="cachedContents/1")
+
+        self.caches = SimpleNamespace(create=create)
+
+
+def long_prompt() -> str:
+    return "x" * 4 * get_settings().gemini_context_cache_min_tokens
+
+
+def test_prompt_below_the_minimum_is_never_cached():
+    client = CachesClient()
+    llm = GeminiLLM(client=client)
+    assert llm._context("You write job descriptions.") is None
+    assert client.creates == 0
+
+
+def test_transport_error_on_create_is_translated_and_retried_next_call():
+    client = CachesClient(failures=1)
+    llm = GeminiLLM(client=client)
+    assert llm._context(long_prompt()) is None
+    assert llm._context(long_prompt()) == "cachedContents/1"
+    assert client.creates == 2
+
+
+def test_pro_models_need_a_longer_prompt():
+    client = CachesClient()
+    assert GeminiLLM("gemini-2.5-pro", client=client)._context(long_prompt()) is None
+    assert client.creates == 0
+
+
+@pytest.mark.parametrize("error, stale", [
+    (LLMError("404 NOT_FOUND", status_code=404), True),
+    (LLMError("400 INVALID_ARGUMENT: CachedContent has expired", status_code=400), True),
+    (LLMError("400 INVALID_ARGUMENT: contents must not be empty", status_code=400), False),
+])
+def test_only_errors_about_the_context_count_as_stale(error, stale):
+    assert gemini._stale_context(error) is stale
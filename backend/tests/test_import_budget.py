@@ -0,0 +1,19 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+BENCH = Path(__file__).resolve().parent.parent / "bench" / "bench_import.py"
+spec = importlib.util.spec_from_file_location("bench_import", BENCH)
+bench_import = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_import)
+
+
+@pytest.mark.parametrize("module", ["main", "worker"])
+def test_import_stays_within_budget(module):
+    result = bench_import.measure(module)
+
+    assert result["ok"], result["error"]
+    assert result["forbidden"] == []
+    slowest = {name: round(ms, 1) for name, ms in result["top"][:5]}
+    assert result["total_ms"] <= bench_import.BUDGET_MS, f"slowest imports: {slowest}"
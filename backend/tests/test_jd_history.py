@@ -0,0 +1,105 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from databases.database import SessionLocal
+from databases.migrate import upgrade_db
+from models.model import JobDescription
+from routes.jd_routes import router
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def client(sqlite_url):
+    upgrade_db()  # the FTS5 table and its triggers come from the migrations
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client
+
+
+def add_jds(*specs) -> list:
+    """(created_at, job_title, required_skills) rows; returns them as inserted."""
+    rows = [
+        JobDescription(
+            id=uuid.uuid4(),
+            jd_session_id=uuid.uuid4(),
+            employee_id=uuid.uuid4(),
+            jd_json={"job_title": title, "required_skills": skills},
+            created_at=created_at,
+        )
+        for created_at, title, skills in specs
+    ]
+    with SessionLocal() as db:
+        db.add_all(rows)
+        db.commit()
+        return [(row.created_at, row.id) for row in rows]
+
+
+def newest_first(keys: list) -> list:
+    return [str(jd_id) for _, jd_id in sorted(keys, reverse=True)]
+
+
+def walk(client, path: str, limit: int, **params) -> list:
+    ids, cursor = [], None
+    while True:
+        query = {**params, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get(path, params=query).json()
+        assert len(page["items"]) <= limit
+        ids += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_cursor_walks_equal_timestamps_without_gaps_or_repeats(client, limit):
+    # Ties on created_at, across and inside page boundaries: the id
+    # tiebreak must order them the same way on every page.
+    keys = add_jds(*[(T0 + timedelta(seconds=i // 3), f"Role {i}", []) for i in range(7)])
+
+    assert walk(client, "/agent/jds", limit) == newest_first(keys)
+
+
+def test_last_page_has_no_cursor(client):
+    add_jds((T0, "Engineer", []), (T0, "Manager", []))
+    page = client.get("/agent/jds", params={"limit": 2}).json()
+    assert len(page["items"]) == 2 and page["next_cursor"] is None
+
+
+def test_malformed_cursor_is_a_400(client):
+    assert client.get("/agent/jds", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_search_matches_title_and_skills_on_sqlite(client):
+    python = add_jds(
+        (T0, "Python Developer", ["Django"]),
+        (T0, "Data Engineer", ["Python", "SQL"]),
+        (T0 + timedelta(seconds=1), "Backend Engineer", ["python"]),
+    )
+    add_jds((T0, "Sales Manager", ["Negotiation"]))
+
+    assert walk(client, "/agent/jds/search", 2, q="python") == newest_first(python)
+    assert walk(client, "/agent/jds/search", 5, q="sales negotiation") != []
+    assert walk(client, "/agent/jds/search", 5, q="python sales") == []
+
+
+def test_search_index_follows_updates(client):
+    [(_, jd_id)] = add_jds((T0, "Python Developer", []))
+    with SessionLocal() as db:
+        jd = db.get(JobDescription, jd_id)
+        jd.jd_json = {"job_title": "Rust Developer", "required_skills": []}
+        db.commit()
+
+    assert walk(client, "/agent/jds/search", 5, q="python") == []
+    assert walk(client, "/agent/jds/search", 5, q="rust") == [str(jd_id)]
+
+
+@pytest.mark.parametrize("q", ['c++ "OR', "NEAR(a b)", "title:*", "-x AND"])
+def test_search_input_is_never_parsed_as_fts5_syntax(client, q):
+    add_jds((T0, "C++ Developer", []))
+    assert client.get("/agent/jds/search", params={"q": q}).status_code == 200
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from llm.errors import LLMError, LLMQuotaError, LLMTransportError
+from services.jd_store import JDAlreadyApproved
+from services.job_queue import is_retryable
+
+
+@pytest.mark.parametrize("error", [
+    LLMTransportError("503 UNAVAILABLE", status_code=503),
+    LLMQuotaError("429 RESOURCE_EXHAUSTED", status_code=429),
+    OperationalError("SELECT 1", {}, Exception("connection refused")),
+    ConnectionResetError(),
+    asyncio.TimeoutError(),
+])
+def test_transient_failures_are_retried(error):
+    assert is_retryable(error)
+
+
+@pytest.mark.parametrize("error", [
+    LLMError("401 UNAUTHENTICATED", status_code=401),
+    JDAlreadyApproved("JD is approved"),
+    ValueError("Model output failed schema validation"),
+    KeyError("job_title"),
+])
+def test_permanent_failures_are_dead_lettered(error):
+    assert not is_retryable(error)
@@ -0,0 +1,42 @@
+import pytest
+
+from utils.json_extractor import extract_json, top_level_objects
+
+JD = '{"job_title": "Engineer", "skills": ["python"], "meta": {"level": {"band": 3}}}'
+PARSED = {"job_title": "Engineer", "skills": ["python"], "meta": {"level": {"band": 3}}}
+
+
+@pytest.mark.parametrize("text", [
+    JD,
+    f"```json\n{JD}\n```",
+    f"```\n{JD}\n```  ",
+    f"Here is the job description:\n{JD}\nLet me know if you need changes.",
+    f"Sure! ```json\n{JD}\n``` Hope this helps {{:}}",
+])
+def test_extracts_the_object_from_wrapped_output(text):
+    assert extract_json(text) == PARSED
+
+
+def test_fence_inside_a_string_value_is_kept():
+    text = '```json\n{"job_summary": "Write ```code``` daily", "n": 1}\n```'
+    assert extract_json(text) == {"job_summary": "Write ```code``` daily", "n": 1}
+
+
+def test_braces_and_quotes_inside_strings_do_not_end_the_object():
+    text = 'Output: {"a": "}{ not \\" a brace", "b": {"c": "{"}} trailing'
+    assert extract_json(text) == {"a": '}{ not " a brace', "b": {"c": "{"}}
+
+
+def test_top_level_objects_yields_each_balanced_top_level_span():
+    text = 'x {"a": {"b": 1}} y {"c": "}"} z {"unclosed": '
+    assert list(top_level_objects(text)) == ['{"a": {"b": 1}}', '{"c": "}"}']
+
+
+def test_skips_an_object_that_does_not_parse():
+    assert extract_json("{not json} then " + JD) == PARSED
+
+
+@pytest.mark.parametrize("text", ["no json here", '{"truncated": "val'])
+def test_raises_without_a_complete_object(text):
+    with pytest.raises(ValueError):
+        extract_json(text)
@@ -0,0 +1,26 @@
+import json
+
+import pytest
+
+from utils.json_repair import repair_json
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ('```json\n{"a": "x"}\n```', {"a": "x"}),
+    ('{"a": {"b": 1}, "c": "trunc', {"a": {"b": 1}, "c": "trunc"}),
+    ('{"a": ["x", "y"', {"a": ["x", "y"]}),
+    ('{"a": 1, "b":', {"a": 1}),
+])
+def test_repairs_near_miss_output(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+def test_brace_in_trailing_prose_is_not_part_of_the_object():
+    text = '{"job_title": "Engineer"} Note: use {placeholders} for names.'
+    assert json.loads(repair_json(text)) == {"job_title": "Engineer"}
+
+
+def test_no_object_at_all_raises():
+    with pytest.raises(ValueError):
+        repair_json("sorry, I cannot help with that")
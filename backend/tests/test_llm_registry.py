@@ -0,0 +1,43 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.genai")
+
+import llm.gemini as gemini
+import llm.registry as registry
+
+
+class FakeClient:
+    """Records the calls the backends make on a shared Gemini client."""
+
+    def __init__(self, log: list):
+        self.log = log
+
+        async def delete(name):
+            assert "closed" not in log, f"{name} deleted on a closed client"
+            log.append(f"delete {name}")
+
+        async def aclose():
+            log.append("closed")
+
+        self.aio = SimpleNamespace(caches=SimpleNamespace(delete=delete), aclose=aclose)
+
+    def close(self):
+        pass
+
+
+def test_shared_client_is_closed_once_after_every_context_is_deleted(monkeypatch, env):
+    log = []
+    monkeypatch.setattr(gemini, "make_client", lambda http_options=None: FakeClient(log))
+    env(LLM_BACKENDS="gemini-a, gemini-b")
+    monkeypatch.setattr(registry, "_llm", None)
+
+    llm = registry.get_llm()
+    for name, backend in llm.backends.items():
+        backend.inner._contexts["key"] = (f"cachedContents/{name}", time.monotonic() + 60)
+
+    asyncio.run(registry.close_llm())
+    assert log == ["delete cachedContents/gemini-a", "delete cachedContents/gemini-b", "closed"]
@@ -0,0 +1,70 @@
+import pytest
+import sqlalchemy as sa
+
+from databases.migrate import upgrade_db
+
+
+def create_legacy_schema(url: str, dedup: bool):
+    """
+    Tables as create_all built them before migrations: the original models,
+    or (dedup) after payload_hash and jd_cache were added.
+    """
+    metadata = sa.MetaData()
+    extra = [
+        sa.Column("payload_hash", sa.String(64)),
+        sa.UniqueConstraint("jd_session_id", "payload_hash", name="uq_jd_session_payload"),
+    ] if dedup else []
+    sa.Table(
+        "job_descriptions", metadata,
+        sa.Column("id", sa.Uuid, primary_key=True),
+        sa.Column("jd_session_id", sa.Uuid, nullable=False),
+        sa.Column("employee_id", sa.Uuid, nullable=False),
+        sa.Column("jd_json", sa.JSON, nullable=False),
+        sa.Column("status", sa.String),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("approved_at", sa.DateTime),
+        *extra,
+    )
+    if dedup:
+        sa.Table(
+            "jd_cache", metadata,
+            sa.Column("key", sa.String(64), primary_key=True),
+            sa.Column("jd_json", sa.JSON, nullable=False),
+            sa.Column("created_at", sa.DateTime),
+            sa.Column("expires_at", sa.DateTime, nullable=False, index=True),
+        )
+    sa.Table(
+        "chat_history", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("employee_id", sa.String, index=True),
+        sa.Column("jd_session_id", sa.String, index=True),
+        sa.Column("sender", sa.String),
+        sa.Column("message", sa.String),
+        sa.Column("created_at", sa.DateTime),
+    )
+    engine = sa.create_engine(url)
+    metadata.create_all(engine)
+    engine.dispose()
+
+
+def assert_current_schema(url: str):
+    engine = sa.create_engine(url)
+    inspector = sa.inspect(engine)
+    columns = {c["name"] for c in inspector.get_columns("job_descriptions")}
+    constraints = {c["name"] for c in inspector.get_unique_constraints("job_descriptions")}
+    assert {"payload_hash", "version", "profile"} <= columns
+    assert "uq_jd_session_payload" in constraints
+    assert inspector.has_table("jd_cache")
+    engine.dispose()
+
+
+def test_fresh_database(sqlite_url):
+    upgrade_db()
+    assert_current_schema(sqlite_url)
+
+
+@pytest.mark.parametrize("dedup", [False, True])
+def test_legacy_create_all_database_is_adopted(sqlite_url, dedup):
+    create_legacy_schema(sqlite_url, dedup)
+    upgrade_db()
+    assert_current_schema(sqlite_url)
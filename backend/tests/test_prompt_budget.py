@@ -0,0 +1,80 @@
+import threading
+
+from pydantic import BaseModel
+
+from llm.rate_limiter import estimate_tokens
+from utils.prompt_budget import TRIM_MARKER, fit_profile, summarize_error, trim_answer
+from utils.prompt_registry import compact_json
+
+
+def qa(*answers):
+    return {"qa": [{"field": f"f{i}", "answer": answer} for i, answer in enumerate(answers)]}
+
+
+def test_small_profile_is_returned_as_is():
+    profile = qa("Senior Data Engineer", ["Python", "SQL"])
+    assert fit_profile(profile, 400, 2000) == (profile, 0)
+
+
+def test_long_text_is_cut_at_a_word_boundary():
+    fitted, trimmed = fit_profile(qa("We build pipelines. " * 500), 50, 2000)
+    answer = fitted["qa"][0]["answer"]
+    assert trimmed == 1
+    assert answer.endswith("pipelines." + TRIM_MARKER)
+    assert estimate_tokens(answer) <= 51
+
+
+def test_long_list_keeps_first_items_and_counts_the_rest():
+    answer = trim_answer([f"skill {i}" for i in range(200)], 20)
+    assert answer[0] == "skill 0"
+    assert answer[-1] == f"(+{200 - len(answer) + 1} more)"
+
+
+def test_profile_budget_shrinks_the_longest_answer():
+    fitted, _ = fit_profile(qa("short", "x " * 3000, "y " * 200), 10_000, 300)
+    assert estimate_tokens(compact_json(fitted)) <= 300
+    assert fitted["qa"][0]["answer"] == "short"
+
+
+def fit_within(seconds, *args):
+    """fit_profile in a thread, so a regression fails instead of hanging the run."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fit_profile(*args)), daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert result, "fit_profile did not terminate"
+    return result[0]
+
+
+def test_non_text_answers_are_trimmed():
+    # QA.answer is Any: a dict used to be returned unchanged, looping forever.
+    fitted, trimmed = fit_within(5, qa({"k": "v" * 10000}), 400, 2000)
+    assert trimmed == 1
+    assert estimate_tokens(fitted["qa"][0]["answer"]) <= 401
+
+
+def test_unshrinkable_profile_terminates():
+    fitted, _ = fit_within(5, qa(*[{"k": "v" * 200} for _ in range(50)]), 10_000, 10)
+    assert len(fitted["qa"]) == 50
+
+
+def test_schema_errors_are_summarized_per_field():
+    class Out(BaseModel):
+        title: str
+        skills: list
+
+    try:
+        try:
+            Out.model_validate({"title": 3})
+        except Exception as e:
+            raise ValueError(f"Schema validation error: {e}") from e
+    except ValueError as e:
+        summary = summarize_error(e)
+
+    assert summary == (
+        "Schema validation failed: title: Input should be a valid string; skills: Field required"
+    )
+
+
+def test_other_errors_keep_their_first_line():
+    assert summarize_error(ValueError("bad json\nat offset 3")) == "bad json"
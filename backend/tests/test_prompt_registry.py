@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from utils.prompt_registry import PromptRegistry
+
+GOOD = "role: Writer\nuser_prompt: 'Profile: {{profile}}'\n"
+
+
+@pytest.fixture
+def registry(tmp_path, env):
+    env(PROMPT_RELOAD_INTERVAL=0)
+    (tmp_path / "jd.yaml").write_text(GOOD)
+    registry = PromptRegistry(tmp_path)
+    registry.load_all()
+    return registry
+
+
+def touch(path):
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+@pytest.mark.parametrize("broken", ["role: [unclosed\n", "- just\n- a list\n", ""])
+def test_invalid_reload_keeps_the_last_good_template(registry, tmp_path, broken):
+    good = registry.get("jd")
+    path = tmp_path / "jd.yaml"
+    path.write_text(broken)
+    touch(path)
+
+    assert registry.get("jd") is good
+
+    path.write_text(GOOD.replace("Writer", "Editor"))
+    touch(path)
+    assert registry.get("jd").system == "Editor"
+
+
+def test_deleted_template_keeps_serving(registry, tmp_path):
+    good = registry.get("jd")
+    (tmp_path / "jd.yaml").unlink()
+    assert registry.get("jd") is good
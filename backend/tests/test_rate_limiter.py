@@ -0,0 +1,53 @@
+import asyncio
+
+from llm.errors import LLMQuotaError
+from llm.fake import FakeLLM
+from llm.rate_limiter import AdaptiveConcurrency, RateLimitedLLM, RateLimiter
+
+
+def limited(fake: FakeLLM, initial: int = 16) -> RateLimitedLLM:
+    return RateLimitedLLM(fake, RateLimiter(1e6, 1e9), AdaptiveConcurrency(initial, 1, 64))
+
+
+async def burst(llm: RateLimitedLLM, n: int) -> list:
+    calls = [llm.agenerate("system", '{"field": "job_title", "answer": "Engineer"}') for _ in range(n)]
+    return await asyncio.gather(*calls, return_exceptions=True)
+
+
+def test_a_throttled_burst_cuts_the_limit_once():
+    llm = limited(FakeLLM(latency="fixed:0.05", quota_error_rate=1.0, seed=1))
+    results = asyncio.run(burst(llm, 16))
+
+    assert all(isinstance(r, LLMQuotaError) for r in results)
+    assert llm.concurrency.limit == 8
+    assert llm.stats()["throttled"] == 16
+    assert llm.stats()["throttles_ignored"] == 15
+
+
+def test_throttles_after_a_cut_cut_again():
+    llm = limited(FakeLLM(latency="fixed:0.01", quota_error_rate=1.0, seed=1))
+
+    async def run():
+        await burst(llm, 16)
+        await burst(llm, 8)  # sent at the new limit
+
+    asyncio.run(run())
+    assert llm.concurrency.limit == 4
+
+
+def test_limit_recovers_after_throttling_stops():
+    fake = FakeLLM(latency="fixed:0.01", quota_error_rate=0.3, seed=7)
+    llm = limited(fake)
+
+    async def run():
+        for _ in range(5):
+            await burst(llm, 16)
+        throttled_limit = llm.concurrency.limit
+        fake.quota_error_rate = 0.0
+        for _ in range(5):
+            await burst(llm, 16)
+        return throttled_limit
+
+    throttled_limit = asyncio.run(run())
+    assert 1 <= throttled_limit < 16
+    assert llm.concurrency.limit > throttled_limit
@@ -0,0 +1,34 @@
+import asyncio
+
+from llm.router import RoutedLLM
+
+
+class SlowLLM:
+    def __init__(self):
+        self.called = False
+        self.cancelled = False
+
+    async def agenerate(self, system, user):
+        self.called = True
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def test_cancelled_caller_cancels_the_unhedged_request():
+    backends = {"a": SlowLLM(), "b": SlowLLM()}
+    llm = RoutedLLM(backends, hedge=True)
+
+    async def run():
+        call = asyncio.create_task(llm.agenerate("system", "user"))
+        await asyncio.sleep(0.05)  # still inside the hedge delay
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        # Checked inside the loop: asyncio.run cancels leftovers on exit.
+        called = [backend for backend in backends.values() if backend.called]
+        assert len(called) == 1 and called[0].cancelled
+
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+import services.semantic_cache as semantic_cache
+from databases.migrate import upgrade_db
+from models.model import JobDescription
+from services.semantic_cache import SemanticCache, SemanticIndex
+
+
+def approve(url: str, count: int, approved_at: datetime):
+    engine = sa.create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(sa.insert(JobDescription.__table__), [
+            {
+                "id": uuid.uuid4(),
+                "jd_session_id": uuid.uuid4(),
+                "employee_id": uuid.uuid4(),
+                "jd_json": {"job_title": f"Engineer {i}"},
+                "profile": {"qa": [{"field": "job_title", "answer": f"Engineer {i}"}]},
+                "status": "approved",
+                "created_at": approved_at,
+                "approved_at": approved_at,
+            }
+            for i in range(count)
+        ])
+    engine.dispose()
+
+
+def cache(directory: str = "") -> SemanticCache:
+    return SemanticCache(SemanticIndex(64, directory), 0.9, ("job_title",), 60, True)
+
+
+def test_refresh_pages_past_rows_sharing_one_approved_at(sqlite_url, monkeypatch):
+    # A bulk approval stamps every row with the same approved_at.
+    monkeypatch.setattr(semantic_cache, "REFRESH_BATCH", 10)
+    upgrade_db()
+    instant = datetime(2026, 1, 1)
+    approve(sqlite_url, 25, instant)
+
+    async def run():
+        semantic = cache()
+        await semantic.load()
+        first = len(semantic.index)
+        approve(sqlite_url, 15, instant)
+        await semantic.refresh()
+        return first, len(semantic.index)
+
+    assert asyncio.run(run()) == (25, 40)
+
+
+def test_one_process_writes_a_shared_index_directory(tmp_path):
+    pytest.importorskip("numpy")
+    writer, reader = SemanticIndex(4, str(tmp_path)), SemanticIndex(4, str(tmp_path))
+    writer.load()
+    reader.load()
+    assert writer.writer and not reader.writer
+
+    writer.add([("a", [1.0, 0.0, 0.0, 0.0])], datetime(2026, 1, 1))
+    reader.add([("b", [0.0, 1.0, 0.0, 0.0])], datetime(2026, 1, 1))
+
+    assert (tmp_path / "ids.txt").read_text() == "a\n"
+    assert (tmp_path / "vectors.f32").stat().st_size == 4 * 4
+    assert reader.search([0.0, 1.0, 0.0, 0.0])[0] == "b"
+
+    restarted = SemanticIndex(4, str(tmp_path))
+    restarted.load()
+    assert restarted.ids == ["a"] and not restarted.writer
@@ -0,0 +1,36 @@
+import asyncio
+
+from databases.database import Base, get_engine
+from services.jd_cache import LRUTTLCache
+from services.session_store import ChatSessionStore
+from services.write_buffer import write_buffer
+
+QUESTIONS = [{"field": "job_title"}, {"field": "required_skills"}, {"field": "location"}]
+
+
+def replica(shared: bool) -> ChatSessionStore:
+    return ChatSessionStore(LRUTTLCache(100, 60), persist=True, shared=shared)
+
+
+def run_two_replicas(shared: bool) -> list:
+    a, b = replica(shared), replica(shared)
+
+    async def run():
+        await a.answer("e", "s", {"field": "job_title", "answer": "Engineer"}, QUESTIONS)
+        await write_buffer.flush()
+        # The next turn lands on the other replica, the one after back on a.
+        await b.answer("e", "s", {"field": "required_skills", "answer": ["python"]}, QUESTIONS)
+        await write_buffer.flush()
+        return await a.load("e", "s")
+
+    return asyncio.run(run())
+
+
+def test_shared_store_sees_answers_written_by_another_replica(sqlite_url):
+    Base.metadata.create_all(get_engine())
+    assert [item["field"] for item in run_two_replicas(shared=True)] == ["job_title", "required_skills"]
+
+
+def test_unshared_store_relies_on_sticky_routing(sqlite_url):
+    Base.metadata.create_all(get_engine())
+    assert [item["field"] for item in run_two_replicas(shared=False)] == ["job_title"]
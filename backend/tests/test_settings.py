@@ -0,0 +1,44 @@
+from databases.database import pool_options
+from llm.registry import backend_names
+from settings import Settings, get_settings
+
+
+def test_fields_are_read_from_their_upper_case_variables(env):
+    env(
+        LLM_RPM="250",
+        JD_WORKER_CONCURRENCY="3",
+        JD_SEMANTIC_CACHE="Yes",
+        WRITE_BUFFER_COPY="false",
+        JD_SPECULATIVE_DEFERRED_FIELDS="leadership, achievements,",
+        OTEL_SERVICE_NAME=" jd-api ",
+    )
+    settings = get_settings()
+
+    assert settings.llm_rpm == 250.0
+    assert settings.jd_worker_concurrency == 3
+    assert settings.jd_semantic_cache is True
+    assert settings.write_buffer_copy is False
+    assert settings.jd_speculative_deferred_fields == ("leadership", "achievements")
+    assert settings.otel_service_name == "jd-api"
+
+
+def test_unset_or_empty_variables_keep_the_defaults(env, monkeypatch):
+    monkeypatch.delenv("LLM_TPM", raising=False)
+    env(JD_CACHE_MAX_ENTRIES="")
+    settings = get_settings()
+
+    assert settings.llm_tpm == Settings.llm_tpm
+    assert settings.jd_cache_max_entries == Settings.jd_cache_max_entries
+
+
+def test_settings_are_read_at_use_not_at_import(env, monkeypatch):
+    monkeypatch.delenv("LLM_BACKENDS", raising=False)
+    env(LLM_BACKEND="fake")
+    assert backend_names() == ("fake",)
+
+    env(LLM_BACKENDS="gemini-a,stub")
+    assert backend_names() == ("gemini-a", "stub")
+
+    env(DB_POOL_SIZE="3")
+    assert pool_options("sqlite:///app.db")["pool_size"] == 3
+    assert pool_options("postgresql://db/app")["max_overflow"] == 20
@@ -0,0 +1,68 @@
+import asyncio
+
+import services.speculation as speculation
+from services.speculation import Speculator
+
+FIELDS = ["job_title", "required_skills", "leadership"]
+
+
+def qa(*answers):
+    return [{"field": field, "answer": answer} for field, answer in zip(FIELDS, answers)]
+
+
+def pending(qa_list):
+    return FIELDS[len(qa_list):]
+
+
+class JD(dict):
+    def model_dump_json(self):
+        return str(self)
+
+
+def speculator(monkeypatch, generated: list) -> Speculator:
+    async def fake_generate(profile):
+        generated.append(profile["qa"])
+        return JD(drafted_from=profile["qa"])
+
+    monkeypatch.setattr(speculation, "agenerate_jd", fake_generate)
+    return Speculator(True, 2, ("leadership",), 60)
+
+
+def run_session(spec, turns: list, final: list):
+    async def run():
+        for answers in turns:
+            spec.maybe_start("s", answers, pending(answers))
+            await asyncio.sleep(0)
+        return await spec.claim("s", final)
+
+    return asyncio.run(run())
+
+
+def test_draft_is_claimed_once_every_field_is_answered(monkeypatch):
+    generated = []
+    spec = speculator(monkeypatch, generated)
+    turns = [qa("Engineer"), qa("Engineer", ["python"])]
+
+    jd, profile = run_session(spec, turns, qa("Engineer", ["python"], "Leads a team of 4"))
+
+    assert generated == [qa("Engineer", ["python"])]  # only once the last question is pending
+    assert jd == {"drafted_from": qa("Engineer", ["python"])}
+    assert profile == {"qa": qa("Engineer", ["python"])}
+    assert spec.stats()["hits"] == 1
+
+
+def test_changed_answer_restarts_the_draft(monkeypatch):
+    generated = []
+    spec = speculator(monkeypatch, generated)
+    turns = [qa("Engineer", ["python"]), qa("Engineer", ["go"])]
+
+    jd, _ = run_session(spec, turns, qa("Engineer", ["go"], "Leads"))
+
+    assert generated == turns
+    assert jd == {"drafted_from": qa("Engineer", ["go"])}
+    assert spec.stats()["misses"] == 1
+
+
+def test_claim_misses_when_an_answer_changed_at_the_final_turn(monkeypatch):
+    spec = speculator(monkeypatch, [])
+    assert run_session(spec, [qa("Engineer", ["python"])], qa("Manager", ["python"], "Leads")) is None
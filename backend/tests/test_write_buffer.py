@@ -0,0 +1,89 @@
+import asyncio
+
+from models.model import ChatHistory
+from services.write_buffer import WriteBuffer
+
+
+class FlakyBuffer(WriteBuffer):
+    """WriteBuffer whose first `failures` writes fail; written rows are kept."""
+
+    def __init__(self, failures: int, max_rows: int = 100, max_pending: int = 1000, **kwargs):
+        super().__init__(max_rows=max_rows, flush_seconds=0.01, max_pending=max_pending, **kwargs)
+        self.failures = failures
+        self.attempts = 0
+        self.written = []
+
+    async def _write(self, batch: dict):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database went away")
+        for rows in batch.values():
+            self.written.extend(rows)
+
+
+def message(i: int) -> dict:
+    return {"employee_id": "e", "jd_session_id": "s", "sender": "user", "message": str(i)}
+
+
+def test_failed_flush_is_retried_in_order():
+    async def run():
+        buffer = FlakyBuffer(failures=2)
+        for i in range(3):
+            await buffer.add(ChatHistory, message(i))
+        assert not await buffer.flush()
+        await buffer.add(ChatHistory, message(3))
+        await buffer.close()
+        return buffer
+
+    buffer = asyncio.run(run())
+    assert [row["message"] for row in buffer.written] == ["0", "1", "2", "3"]
+    assert buffer.failed_rows == 0
+    assert buffer.retried_rows >= 6
+
+
+def test_rows_are_dropped_after_max_retries():
+    async def run():
+        buffer = FlakyBuffer(failures=10, max_retries=2)
+        await buffer.add(ChatHistory, message(0))
+        await buffer.close()
+        return buffer
+
+    buffer = asyncio.run(run())
+    assert buffer.written == []
+    assert buffer.failed_rows == 1
+    assert buffer.pending() == 0
+
+
+def test_has_pending_matches_only_that_session():
+    async def run():
+        buffer = FlakyBuffer(failures=0)
+        await buffer.add(ChatHistory, message(0))
+        before = (
+            buffer.has_pending(ChatHistory, employee_id="e", jd_session_id="s"),
+            buffer.has_pending(ChatHistory, employee_id="e", jd_session_id="other"),
+        )
+        await buffer.close()
+        return before + (buffer.has_pending(ChatHistory, employee_id="e", jd_session_id="s"),)
+
+    assert asyncio.run(run()) == (True, False, False)
+
+
+def test_writer_blocked_at_max_pending_backs_off_while_the_db_is_down():
+    async def run():
+        buffer = FlakyBuffer(failures=50, max_rows=2, max_pending=2, max_retries=100)
+        buffer.flush_seconds = 0.05
+        # Full without arming the timer, so only the blocked writer flushes.
+        buffer._rows[ChatHistory.__table__] = [message(0), message(1)]
+        buffer._pending = 2
+
+        blocked = asyncio.ensure_future(buffer.add(ChatHistory, message(2)))
+        await asyncio.sleep(0.2)
+        attempts, done = buffer.attempts, blocked.done()
+        blocked.cancel()
+        await asyncio.gather(blocked, return_exceptions=True)
+        return attempts, done
+
+    attempts, done = asyncio.run(run())
+    assert not done
+    assert 1 <= attempts <= 6
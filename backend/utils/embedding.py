@@ -0,0 +1,99 @@
+import math
+import re
+import zlib
+
+from utils.hashing import normalize_profile
+
+# Bump when the features below change: persisted vectors are then rebuilt.
+EMBEDDING_VERSION = 1
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+
+# Spellings that should land on the same features.
+ABBREVIATIONS = {
+    "sr": "senior",
+    "snr": "senior",
+    "jr": "junior",
+    "mgr": "manager",
+    "eng": "engineer",
+    "engg": "engineering",
+    "dev": "developer",
+    "devs": "developers",
+    "admin": "administrator",
+    "k8s": "kubernetes",
+    "js": "javascript",
+    "ts": "typescript",
+    "postgres": "postgresql",
+}
+
+# How much each answer counts towards similarity; unlisted fields are ignored.
+FIELD_WEIGHTS = {
+    "job_title": 3.0,
+    "required_skills": 2.0,
+    "key_responsibilities": 1.5,
+    "tools_and_technologies": 1.0,
+    "job_summary": 1.0,
+    "preferred_qualifications": 0.5,
+    "work_environment": 0.5,
+    "reporting_structure": 0.5,
+}
+
+
+def _tokens(text: str) -> list:
+    return [ABBREVIATIONS.get(t, t) for t in _TOKEN.findall(text.lower().replace(".", " "))]
+
+
+def _features(text: str):
+    """Words plus their character trigrams, so inflections and typos still overlap."""
+    for token in _tokens(text):
+        yield "w:" + token
+        padded = f"<{token}>"
+        for i in range(len(padded) - 2):
+            yield "c:" + padded[i:i + 3]
+
+
+def _add_text(vector: list, text: str, weight: float):
+    """Add the feature-hashed, unit-normalized `text` into `vector`, scaled by weight."""
+    dim = len(vector)
+    counts = {}
+    for feature in _features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        # Signed hashing keeps collisions from only ever adding up.
+        index, sign = h % dim, 1.0 if (h >> 31) & 1 else -1.0
+        counts[index] = counts.get(index, 0.0) + sign
+
+    norm = math.sqrt(sum(v * v for v in counts.values()))
+    if not norm:
+        return
+    for index, value in counts.items():
+        vector[index] += weight * value / norm
+
+
+def _as_text(answer) -> str:
+    if isinstance(answer, list):
+        # Order-insensitive by construction: it is a bag of features.
+        return " ".join(str(item) for item in answer)
+    return "" if answer is None else str(answer)
+
+
+def token_set(answer) -> frozenset:
+    """Order- and spelling-insensitive key of an answer ("Sr. Data Engineer" == "senior data engineer")."""
+    return frozenset(_tokens(_as_text(answer)))
+
+
+def embed_fields(fields: dict, dim: int) -> list:
+    """Unit vector (list of floats) for {field: answer}, weighted by FIELD_WEIGHTS."""
+    vector = [0.0] * dim
+    for field, answer in fields.items():
+        weight = FIELD_WEIGHTS.get(field)
+        if weight:
+            _add_text(vector, _as_text(answer), weight)
+
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+def embed_profile(profile: dict, dim: int) -> list:
+    """Embedding of a {"qa": [...]} profile, after the same normalization as its hash."""
+    qa = normalize_profile(profile).get("qa", [])
+    return embed_fields({item["field"]: item["answer"] for item in qa}, dim)
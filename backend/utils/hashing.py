@@ -0,0 +1,31 @@
+import hashlib
+import json
+import re
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_value(value):
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip()
+    if isinstance(value, list):
+        items = [_normalize_value(v) for v in value]
+        return [v for v in items if v not in ("", None)]
+    if isinstance(value, dict):
+        return {k: _normalize_value(v) for k, v in value.items()}
+    return value
+
+
+def normalize_profile(profile: dict) -> dict:
+    """Whitespace-normalize every answer so trivially different payloads match."""
+    return _normalize_value(profile)
+
+
+def stable_hash(*parts) -> str:
+    """sha256 over a canonical JSON encoding of the given parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def profile_hash(profile: dict) -> str:
+    return stable_hash(normalize_profile(profile))
@@ -1,20 +1,90 @@
 import json
 import re
 
+try:
+    import orjson
+except ImportError:  # optional speed-up, stdlib json otherwise
+    orjson = None
+
+# A markdown fence opening or closing the whole output; ``` anywhere else
+# may be inside a string value and is left alone.
+_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*\n?|\n?\s*```\s*$")
+_STRUCTURAL = re.compile(r'[{}"\\]')
+
+
+def loads(text: str):
+    """Parse JSON with orjson when installed; both raise a ValueError subclass."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def strip_fences(text: str) -> str:
+    return _FENCE.sub("", text.strip())
+
+
+def top_level_objects(text: str):
+    """
+    Yield every balanced top-level {...} span of `text`, left to right, in a
+    single pass. Braces inside JSON strings are skipped; text outside an
+    object (prose, code fences) is never treated as a string.
+    """
+    depth = 0
+    start = 0
+    in_string = False
+    skip_to = 0
+
+    # Jump between structural characters instead of walking every char.
+    for match in _STRUCTURAL.finditer(text):
+        i = match.start()
+        if i < skip_to:
+            continue  # character escaped by a preceding backslash
+        c = match.group()
+
+        if in_string:
+            if c == "\\":
+                skip_to = i + 2
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = depth > 0
+        elif c == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif c == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield text[start:i + 1]
+
 
 def extract_json(text: str) -> dict:
     """
     Extract JSON object from LLM response safely.
-    """
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
 
-    # fallback: extract JSON inside text
-    match = re.search(r"\{[\s\S]*\}", text)
+    Tries the whole text first, then the first complete top-level object
+    that parses, with a markdown fence around the output removed. Linear in the length of the
+    output; a truncated object is left to utils.json_repair.
+    """
+    stripped = text.strip()
+    if stripped.startswith("{"):
+        try:
+            parsed = loads(stripped)
+            if isinstance(parsed, dict):
+                return parsed
+        except ValueError:
+            pass
 
-    if not match:
-        raise ValueError("No JSON object found in LLM output")
+    last_error = None
+    for candidate in top_level_objects(strip_fences(stripped)):
+        try:
+            parsed = loads(candidate)
+        except ValueError as e:
+            last_error = e
+            continue
+        if isinstance(parsed, dict):
+            return parsed
 
-    return json.loads(match.group())
+    if last_error is not None:
+        raise ValueError(f"Malformed JSON in LLM output: {last_error}")
+    raise ValueError("No JSON object found in LLM output")
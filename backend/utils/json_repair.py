@@ -0,0 +1,76 @@
+import re
+
+from utils.json_extractor import strip_fences, top_level_objects
+
+_DANGLING_KEY = re.compile(r',?\s*"(?:[^"\\]|\\.)*"\s*:\s*$')
+
+
+def _outer_object(text: str) -> str:
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("No JSON object found in LLM output")
+    # The balanced object opening at the first brace; braces in prose after
+    # it do not count. None balanced: keep the tail, it is probably truncated.
+    return next(top_level_objects(text[start:]), text[start:])
+
+
+def _drop_trailing_commas_and_close(text: str) -> str:
+    """
+    Single string-aware pass: drop commas directly before '}' / ']' and
+    close whatever strings, arrays and objects are still open at the end.
+    """
+    out = []
+    stack = []
+    in_string = False
+    escape = False
+    pending_comma = None
+
+    for c in text:
+        if in_string:
+            out.append(c)
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+
+        if c.isspace():
+            out.append(c)
+            continue
+
+        if pending_comma is not None:
+            if c not in "}]":
+                out.insert(pending_comma, ",")
+            pending_comma = None
+
+        if c == ",":
+            pending_comma = len(out)
+            continue
+
+        out.append(c)
+        if c == '"':
+            in_string = True
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+        elif c in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        out.append('"')
+    repaired = "".join(out).rstrip()
+    # A key cut off before its value cannot be completed; drop it.
+    repaired = _DANGLING_KEY.sub("", repaired)
+    return repaired + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort local fix of near-miss model output, tried before spending
+    another LLM round trip: markdown fences, prose around the object,
+    trailing commas and unclosed strings / brackets. The result still has
+    to pass schema validation, so a bad repair only costs the retry it
+    was trying to save.
+    """
+    return _drop_trailing_commas_and_close(_outer_object(strip_fences(text)))
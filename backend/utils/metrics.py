@@ -0,0 +1,185 @@
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60,
+)
+
+STAGE_SECONDS = Histogram(
+    "jd_stage_seconds",
+    "Time spent in each stage of the JD pipeline",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+ATTEMPT_SECONDS = Histogram(
+    "jd_attempt_seconds",
+    "Duration of each JD generation attempt",
+    ["attempt", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens reported in provider usage metadata",
+    ["model", "kind"],
+)
+
+LLM_CALLS_PER_JD = Histogram(
+    "jd_llm_calls_per_jd",
+    "LLM calls spent per generated JD (1 = no retry)",
+    ["outcome"],
+    buckets=(1, 2, 3, 4, 5),
+)
+
+JSON_REPAIRS = Counter(
+    "jd_json_repairs_total",
+    "Local repairs of malformed LLM output, by outcome",
+    ["outcome"],
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a pooled DB connection",
+    ["engine"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "DB connections currently checked out of the pool",
+    ["engine"],
+)
+
+SPECULATION_TOTAL = Counter(
+    "jd_speculation_total",
+    "Speculative JD drafts by outcome (started, hit, miss, expired, failed, skipped_budget)",
+    ["outcome"],
+)
+
+SPECULATION_WASTED_TOKENS = Counter(
+    "jd_speculation_wasted_tokens_total",
+    "Estimated tokens spent on speculative drafts that were not used",
+)
+
+JD_JOBS_TOTAL = Counter(
+    "jd_jobs_total",
+    "Queued JD generation jobs by outcome (enqueued, reused, done, retried, dead, lease_lost)",
+    ["outcome"],
+)
+
+WRITE_BUFFER_ROWS = Counter(
+    "write_buffer_rows_total",
+    "Rows passed through the write-behind buffer by table and outcome (flushed, retried, failed)",
+    ["table", "outcome"],
+)
+
+WRITE_BUFFER_PENDING = Gauge(
+    "write_buffer_pending_rows",
+    "Rows waiting in the write-behind buffer",
+)
+
+SEMANTIC_CACHE_TOTAL = Counter(
+    "jd_semantic_cache_total",
+    "Semantic (near-duplicate) JD cache lookups by outcome (hit, miss, mismatch, stale)",
+    ["outcome"],
+)
+
+SEMANTIC_CACHE_SIMILARITY = Histogram(
+    "jd_semantic_cache_similarity",
+    "Best cosine similarity found per semantic cache lookup",
+    buckets=(0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.925, 0.95, 0.975, 0.99, 1.0),
+)
+
+PROMPT_INPUT_TOKENS = Histogram(
+    "jd_prompt_input_tokens",
+    "Estimated input tokens (system + user prompt) per JD generation attempt",
+    ["attempt"],
+    buckets=(250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 16000),
+)
+
+PROMPT_TRIMMED_ANSWERS = Counter(
+    "jd_prompt_trimmed_answers_total",
+    "Profile answers shortened to fit the prompt token budget",
+)
+
+_tracer = None
+
+
+def setup_logging():
+    """Root logging for an entry point (API lifespan, worker process)."""
+    logging.basicConfig(level=get_settings().log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+def setup_tracing():
+    """Export spans over OTLP when OTEL_EXPORTER_OTLP_ENDPOINT is set."""
+    global _tracer
+    settings = get_settings()
+    if not settings.otel_exporter_otlp_endpoint or _tracer is not None:
+        return
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT set but opentelemetry-sdk is not installed")
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.otel_service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("jd_pipeline")
+
+
+@contextmanager
+def stage(name: str, **attributes):
+    """Time a pipeline stage into jd_stage_seconds (and a span, if tracing)."""
+    span = _tracer.start_as_current_span(name, attributes=attributes) if _tracer else nullcontext()
+    started = time.perf_counter()
+    with span:
+        try:
+            yield
+        finally:
+            STAGE_SECONDS.labels(name).observe(time.perf_counter() - started)
+
+
+def record_attempt(attempt: int, started: float, outcome: str):
+    ATTEMPT_SECONDS.labels(str(attempt), outcome).observe(time.perf_counter() - started)
+
+
+def record_token_usage(model: str, usage):
+    """Count tokens from a Gemini usage_metadata object (missing fields skipped)."""
+    if usage is None:
+        return
+
+    for kind, attr in (
+        ("prompt", "prompt_token_count"),
+        ("output", "candidates_token_count"),
+        ("cached", "cached_content_token_count"),
+        ("thoughts", "thoughts_token_count"),
+    ):
+        count = getattr(usage, attr, None)
+        if count:
+            LLM_TOKENS.labels(model, kind).inc(count)
+
+
+def record_jd_calls(calls: int, outcome: str):
+    LLM_CALLS_PER_JD.labels(outcome).observe(calls)
+
+
+def record_prompt_tokens(attempt: int, tokens: int):
+    PROMPT_INPUT_TOKENS.labels(str(attempt)).observe(tokens)
+
+
+def record_repair(outcome: str):
+    JSON_REPAIRS.labels(outcome).inc()
@@ -1,5 +1,8 @@
-import yaml
+from utils.prompt_registry import prompt_registry
 
 def load_prompt(name: str):
-    with open(f"prompts/{name}.yaml", "r") as f:
-        return yaml.safe_load(f)
+    return prompt_registry.get(name).data
+
+def prompt_hash(name: str) -> str:
+    """Content hash of a prompt file, so a prompt edit changes cache keys."""
+    return prompt_registry.get(name).content_hash
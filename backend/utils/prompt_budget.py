@@ -0,0 +1,125 @@
+from pydantic import ValidationError
+
+from llm.rate_limiter import estimate_tokens
+from settings import get_settings
+from utils.prompt_registry import compact_json
+
+TRIM_MARKER = " …"
+# Answers are never cut below this, whatever the profile budget.
+MIN_ANSWER_TOKENS = 16
+
+
+def _answer_tokens(answer) -> int:
+    return estimate_tokens(answer if isinstance(answer, str) else compact_json(answer))
+
+
+def trim_text(text: str, max_tokens: int) -> str:
+    """`text` cut to about max_tokens, at a sentence or word boundary when one is close."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    cut = text[: max(1, max_tokens * 4 - len(TRIM_MARKER))]
+    for separator in (". ", "\n", " "):
+        end = cut.rfind(separator)
+        if end >= len(cut) // 2:
+            cut = cut[: end + 1]
+            break
+    return cut.rstrip() + TRIM_MARKER
+
+
+def trim_answer(answer, max_tokens: int):
+    """
+    An answer shortened to about max_tokens: text is cut, lists keep their
+    first items and say how many were dropped. Anything else over budget
+    (QA.answer is Any) is cut as its JSON text.
+    """
+    if isinstance(answer, str):
+        return trim_text(answer, max_tokens)
+    if _answer_tokens(answer) <= max_tokens:
+        return answer
+    if not isinstance(answer, list):
+        return trim_text(compact_json(answer), max_tokens)
+
+    kept, used = [], 0
+    for item in answer:
+        cost = _answer_tokens(item)
+        if used + cost > max_tokens:
+            if not kept and isinstance(item, str):
+                kept.append(trim_text(item, max_tokens))
+            break
+        kept.append(item)
+        used += cost
+    return kept + [f"(+{len(answer) - len(kept)} more)"]
+
+
+def fit_profile(
+    profile: dict,
+    answer_tokens: int = None,
+    profile_tokens: int = None,
+):
+    """
+    The profile with its answers trimmed to the token budgets (0 = unlimited;
+    None: prompt_answer_max_tokens / prompt_profile_max_tokens), and how many
+    answers were shortened. Any single answer is cut to answer_tokens; if
+    the whole profile is still over profile_tokens, the longest answers are
+    cut further. Deterministic, so the same profile always renders the same
+    prompt.
+    """
+    settings = get_settings()
+    if answer_tokens is None:
+        answer_tokens = settings.prompt_answer_max_tokens
+    if profile_tokens is None:
+        profile_tokens = settings.prompt_profile_max_tokens
+    originals = [item.get("answer") for item in profile.get("qa", [])]
+    answers = [
+        trim_answer(answer, answer_tokens) if answer_tokens > 0 else answer
+        for answer in originals
+    ]
+
+    def size():
+        return estimate_tokens(compact_json(
+            {**profile, "qa": [{**item, "answer": a} for item, a in zip(profile.get("qa", []), answers)]}
+        ))
+
+    # Still over: halve the longest answer until it fits or none can shrink.
+    while profile_tokens > 0 and answers and size() > profile_tokens:
+        sizes = [_answer_tokens(answer) for answer in answers]
+        longest = max(range(len(answers)), key=sizes.__getitem__)
+        if sizes[longest] <= MIN_ANSWER_TOKENS:
+            break
+        shorter = trim_answer(originals[longest], max(MIN_ANSWER_TOKENS, sizes[longest] // 2))
+        if _answer_tokens(shorter) >= sizes[longest]:
+            break  # cannot be cut any further
+        answers[longest] = shorter
+
+    trimmed = sum(1 for original, answer in zip(originals, answers) if answer is not original)
+    if not trimmed:
+        return profile, 0
+    qa = [{**item, "answer": answer} for item, answer in zip(profile["qa"], answers)]
+    return {**profile, "qa": qa}, trimmed
+
+
+def summarize_error(error: Exception) -> str:
+    """
+    A short description of why an attempt's output was rejected, for the
+    correction prompt: the failing fields of a schema error instead of
+    pydantic's full dump (input values, docs links), else the first line.
+    """
+    settings = get_settings()
+    cause = error if isinstance(error, ValidationError) else error.__cause__ or error.__context__
+    if isinstance(cause, ValidationError):
+        problems = [
+            f"{'.'.join(str(part) for part in e['loc']) or 'output'}: {e['msg']}"
+            for e in cause.errors()
+        ]
+        shown = problems[:settings.prompt_error_max_items]
+        if len(problems) > len(shown):
+            shown.append(f"(+{len(problems) - len(shown)} more)")
+        summary = "Schema validation failed: " + "; ".join(shown)
+    else:
+        lines = str(error).strip().splitlines()
+        summary = lines[0] if lines else type(error).__name__
+
+    if len(summary) > settings.prompt_error_max_chars:
+        summary = summary[: settings.prompt_error_max_chars - 1].rstrip() + "…"
+    return summary
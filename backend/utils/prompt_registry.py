@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+PROFILE_PLACEHOLDER = "{{profile}}"
+
+
+def compact_json(obj) -> str:
+    """JSON without indentation or padding; a third fewer prompt tokens."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    data: dict
+    content_hash: str
+    mtime: float
+    # user_prompt split around {{profile}}, so rendering is one concatenation
+    prefix: str
+    suffix: str
+
+    @property
+    def system(self) -> str:
+        # Persona + instructions + schema: identical for every request, so
+        # providers can cache it as a context prefix.
+        instructions = self.data.get("instructions")
+        if not instructions:
+            return self.data["role"]
+        return self.data["role"].rstrip() + "\n\n" + instructions
+
+    def render(self, profile: dict) -> str:
+        return self.prefix + compact_json(profile) + self.suffix
+
+
+def compile_template(path: Path) -> PromptTemplate:
+    # Imported here: templates are compiled in the lifespan, not on import.
+    import yaml
+
+    raw = path.read_bytes()
+    data = yaml.safe_load(raw)
+    if not isinstance(data, dict) or "role" not in data:
+        raise ValueError(f"{path.name}: expected a mapping with at least a role")
+    prefix, _, suffix = data.get("user_prompt", "").partition(PROFILE_PLACEHOLDER)
+
+    return PromptTemplate(
+        name=path.stem,
+        data=data,
+        content_hash=hashlib.sha256(raw).hexdigest(),
+        mtime=path.stat().st_mtime,
+        prefix=prefix,
+        suffix=suffix,
+    )
+
+
+class PromptRegistry:
+    """
+    Every template in prompts/, parsed once and kept compiled in memory.
+
+    Files are re-checked at most every prompt_reload_interval seconds and
+    recompiled when their mtime changes, so prompt edits apply without a
+    restart. A reload that fails (file missing, invalid YAML) is logged and
+    the last good version keeps being served; it is retried at the next
+    check. Each version carries a content hash for cache keys and audit.
+    """
+
+    def __init__(self, directory: Path = PROMPTS_DIR):
+        self.directory = directory
+        self._templates = {}
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def load_all(self):
+        for path in sorted(self.directory.glob("*.yaml")):
+            self._load(path)
+        return list(self._templates)
+
+    def _load(self, path: Path) -> PromptTemplate:
+        template = compile_template(path)
+        with self._lock:
+            self._templates[template.name] = template
+            self._checked[template.name] = time.monotonic()
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        template = self._templates.get(name)
+        path = self.directory / f"{name}.yaml"
+
+        if template is None:
+            return self._load(path)
+
+        now = time.monotonic()
+        if now - self._checked.get(name, 0) >= get_settings().prompt_reload_interval:
+            self._checked[name] = now
+            try:
+                if path.stat().st_mtime != template.mtime:
+                    logger.info("Reloading prompt %s", name)
+                    return self._load(path)
+            except Exception as e:
+                logger.warning("Prompt %s reload failed, keeping the loaded version: %s", name, e)
+
+        return template
+
+    def versions(self) -> dict:
+        return {name: t.content_hash for name, t in self._templates.items()}
+
+
+prompt_registry = PromptRegistry()
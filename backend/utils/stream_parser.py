@@ -0,0 +1,208 @@
+import json
+from typing import get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from schema.schema import JDOutput
+
+
+class StreamValidationError(ValueError):
+    pass
+
+
+class IncrementalJDParser:
+    """
+    Incremental parser for a streamed JSON object of the JDOutput shape.
+
+    Chunks are fed as they arrive from the model. Every top-level field is
+    validated as soon as its value is complete, and every element of an
+    array field as soon as it is complete, so a malformed stream fails on
+    the first bad value instead of after the full payload.
+
+    feed() returns the events produced by the chunk:
+        {"type": "item", "field": ..., "index": ..., "value": ...}
+        {"type": "field", "field": ..., "value": ...}
+    """
+
+    def __init__(self, model: type[BaseModel] = JDOutput):
+        self.model = model
+        self.fields = {}
+
+        self._text = ""
+        self._pos = 0
+        self._state = "start"
+
+        self._key_start = 0
+        self._key = None
+        self._after_comma = False
+
+        self._value_start = 0
+        self._is_array = False
+        self._items = []
+        self._item_start = None
+        self._item_comma = False
+
+        self._nest = 0
+        self._in_string = False
+        self._escape = False
+
+    # ----------------------------
+    # helpers
+    # ----------------------------
+
+    def _fail(self, msg: str):
+        raise StreamValidationError(f"{msg} (at offset {self._pos})")
+
+    def _annotation(self, key):
+        return self.model.model_fields[key].annotation
+
+    def _item_annotation(self, key):
+        args = get_args(self._annotation(key))
+        return args[0] if args else object
+
+    def _validate(self, annotation, raw: str, what: str):
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self._fail(f"Malformed JSON in {what}: {e.msg}")
+        try:
+            return TypeAdapter(annotation).validate_python(value)
+        except ValidationError as e:
+            self._fail(f"Invalid value for {what}: {e.errors()[0]['msg']}")
+
+    def _expects_array(self, key) -> bool:
+        return get_origin(self._annotation(key)) in (list, tuple, set)
+
+    def _finish_item(self, events):
+        raw = self._text[self._item_start:self._pos].strip()
+        if not raw:
+            self._fail(f"Empty element in '{self._key}'")
+        index = len(self._items)
+        value = self._validate(
+            self._item_annotation(self._key), raw, f"{self._key}[{index}]"
+        )
+        self._items.append(value)
+        self._item_start = None
+        events.append(
+            {"type": "item", "field": self._key, "index": index, "value": value}
+        )
+
+    def _finish_value(self, events):
+        raw = self._text[self._value_start:self._pos].strip()
+        value = self._validate(self._annotation(self._key), raw, f"'{self._key}'")
+        self.fields[self._key] = value
+        events.append({"type": "field", "field": self._key, "value": value})
+        self._key = None
+
+    # ----------------------------
+    # public API
+    # ----------------------------
+
+    def feed(self, chunk: str) -> list:
+        self._text += chunk
+        events = []
+
+        while self._pos < len(self._text):
+            c = self._text[self._pos]
+            state = self._state
+
+            if state == "start":
+                if c == "{":
+                    self._state = "key"
+                elif not c.isspace():
+                    self._fail("Expected '{' at start of stream")
+
+            elif state == "key":
+                if c == '"':
+                    self._key_start = self._pos
+                    self._state = "key_string"
+                elif c == "}" and not self._after_comma:
+                    self._state = "done"
+                elif not c.isspace():
+                    self._fail("Expected a field name")
+
+            elif state == "key_string":
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    key = json.loads(self._text[self._key_start:self._pos + 1])
+                    if key not in self.model.model_fields:
+                        self._fail(f"Unexpected field '{key}'")
+                    if key in self.fields:
+                        self._fail(f"Duplicate field '{key}'")
+                    self._key = key
+                    self._state = "colon"
+
+            elif state == "colon":
+                if c == ":":
+                    self._state = "value_start"
+                elif not c.isspace():
+                    self._fail(f"Expected ':' after '{self._key}'")
+
+            elif state == "value_start":
+                if not c.isspace():
+                    self._is_array = self._expects_array(self._key)
+                    if self._is_array and c != "[":
+                        self._fail(f"Field '{self._key}' must be an array")
+                    if not self._is_array and c in "[{":
+                        self._fail(f"Field '{self._key}' must be a scalar")
+                    self._value_start = self._pos
+                    self._items = []
+                    self._item_start = None
+                    self._item_comma = False
+                    self._nest = 0
+                    self._state = "value"
+                    continue  # re-read this char in the value state
+
+            elif state == "value":
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif c == "\\":
+                        self._escape = True
+                    elif c == '"':
+                        self._in_string = False
+                else:
+                    if self._is_array and self._nest == 1:
+                        if c == ",":
+                            if self._item_start is None:
+                                self._fail(f"Empty element in '{self._key}'")
+                            self._finish_item(events)
+                            self._item_comma = True
+                        elif c == "]":
+                            if self._item_start is not None:
+                                self._finish_item(events)
+                            elif self._item_comma:
+                                self._fail(f"Trailing comma in '{self._key}'")
+                        elif self._item_start is None and not c.isspace():
+                            self._item_start = self._pos
+
+                    if c == '"':
+                        self._in_string = True
+                    elif c in "[{":
+                        self._nest += 1
+                    elif c in "]}" and self._nest > 0:
+                        self._nest -= 1
+                    elif c in ",}" and self._nest == 0:
+                        self._finish_value(events)
+                        self._after_comma = c == ","
+                        self._state = "key" if c == "," else "done"
+
+            elif state == "done":
+                if not c.isspace():
+                    self._fail("Unexpected data after end of JSON object")
+
+            self._pos += 1
+
+        return events
+
+    def finish(self):
+        """Validate the complete object once the stream has ended."""
+        if self._state != "done":
+            raise StreamValidationError("Stream ended before the JSON object was complete")
+        try:
+            return self.model.model_validate(self.fields)
+        except ValidationError as e:
+            raise StreamValidationError(f"Schema validation error: {e}")
@@ -1,15 +1,35 @@
-
 from schema.schema import JDOutput
 from pydantic import ValidationError
 from utils.json_extractor import extract_json
+from utils.json_repair import repair_json
+from utils.metrics import record_repair, stage
+
+
+def parse_jd_json(raw_text: str) -> dict:
+    """Extract the JSON object, repairing near-miss output locally first."""
+    try:
+        return extract_json(raw_text)
+    except ValueError as e:
+        original = e
+
+    try:
+        parsed = extract_json(repair_json(raw_text))
+    except ValueError:
+        record_repair("failed")
+        raise original
+    record_repair("repaired")
+    return parsed
+
 
 def validate_jd_output(raw_text: str) -> JDOutput:
     try:
-        parsed = extract_json(raw_text)
-        return JDOutput.model_validate(parsed)
+        with stage("extract_json"):
+            parsed = parse_jd_json(raw_text)
+        with stage("validate"):
+            return JDOutput.model_validate(parsed)
 
     except ValidationError as e:
-        raise ValueError(f"Schema validation error: {e}")
+        raise ValueError(f"Schema validation error: {e}") from e
 
     except Exception as e:
-        raise ValueError(str(e))
\ No newline at end of file
+        raise ValueError(str(e))
@@ -0,0 +1,165 @@
+"""
+JD generation worker: drains the jd_jobs queue filled by the chat route
+(JD_JOB_QUEUE / ChatRequest.enqueue).
+
+Runs --processes worker processes with up to --concurrency generations in
+flight each, so LLM workers scale independently of the API replicas.
+
+    python worker.py --processes 2 --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+
+from prometheus_client import start_http_server
+
+from databases.database import dispose_engines
+from llm.registry import close_llm, init_llm, warmup_llm
+from services.jd_store import generate_and_save
+from services.job_queue import claim, complete, fail, renew_lease
+from services.write_buffer import write_buffer
+from settings import get_settings
+from utils.metrics import setup_logging
+from utils.prompt_registry import prompt_registry
+
+logger = logging.getLogger(__name__)
+
+
+async def keep_leased(job, worker_id: str):
+    while True:
+        await asyncio.sleep(get_settings().jd_job_visibility_timeout / 3)
+        try:
+            if not await renew_lease(job.id, worker_id):
+                return
+        except Exception as e:
+            logger.warning("Lease renewal failed for job %s: %s", job.id, e)
+
+
+async def process(job, worker_id: str):
+    if job.attempts > job.max_attempts:
+        # Reclaimed after its lease lapsed on every attempt: the job itself
+        # is probably what takes the worker down.
+        await fail(job, worker_id, RuntimeError("lease expired on every attempt"))
+        return
+
+    heartbeat = asyncio.create_task(keep_leased(job, worker_id))
+    try:
+        logger.info("Job %s attempt %s/%s", job.id, job.attempts, job.max_attempts)
+        jd_json = await generate_and_save(
+            str(job.employee_id),
+            str(job.jd_session_id),
+            job.profile,
+            job.payload_hash,
+            job.regenerate,
+        )
+    except Exception as e:
+        logger.warning("Job %s failed: %s", job.id, e)
+        await fail(job, worker_id, e)
+    else:
+        await complete(job, worker_id, jd_json)
+    finally:
+        heartbeat.cancel()
+
+
+async def run_worker(worker_id: str, concurrency: int, poll_seconds: float, stop: asyncio.Event):
+    prompt_registry.load_all()
+    init_llm()
+    await warmup_llm()
+    logger.info("Worker %s started (concurrency %s)", worker_id, concurrency)
+
+    running = set()
+    try:
+        while not stop.is_set():
+            free = concurrency - len(running)
+            try:
+                jobs = await claim(worker_id, free)
+            except Exception as e:
+                logger.warning("Claim failed: %s", e)
+                jobs = []
+
+            for job in jobs:
+                task = asyncio.create_task(process(job, worker_id))
+                running.add(task)
+                task.add_done_callback(running.discard)
+
+            if len(jobs) < free or not free:
+                # Queue drained or all slots busy: wait for a slot or the next poll.
+                if running:
+                    await asyncio.wait(running, timeout=poll_seconds, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    await asyncio.sleep(poll_seconds)
+
+        # Let in-flight jobs finish; anything cut short is reclaimed once
+        # its lease lapses.
+        if running:
+            logger.info("Worker %s draining %s job(s)", worker_id, len(running))
+            await asyncio.gather(*running, return_exceptions=True)
+    finally:
+        await write_buffer.close()
+        await close_llm()
+        await dispose_engines()
+
+
+def worker_main(index: int, concurrency: int, poll_seconds: float, metrics_port: int = None):
+    setup_logging()
+    if metrics_port:
+        start_http_server(metrics_port + index)
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await run_worker(worker_id, concurrency, poll_seconds, stop)
+
+    asyncio.run(main())
+
+
+def main_cli():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--processes", type=int, default=settings.jd_worker_processes)
+    parser.add_argument("--concurrency", type=int, default=settings.jd_worker_concurrency,
+                        help="generations in flight per process")
+    parser.add_argument("--poll-seconds", type=float, default=settings.jd_worker_poll_seconds)
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve /metrics on this port (+ process index)")
+    args = parser.parse_args()
+
+    worker_args = (max(1, args.concurrency), args.poll_seconds, args.metrics_port)
+    if args.processes <= 1:
+        worker_main(0, *worker_args)
+        return 0
+
+    # Spawn, not fork: every process builds its own engine and LLM client.
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=worker_main, args=(index, *worker_args), name=f"jd-worker-{index}")
+        for index in range(args.processes)
+    ]
+    for process_ in processes:
+        process_.start()
+
+    def forward(signum, frame):
+        for process_ in processes:
+            if process_.is_alive():
+                process_.terminate()
+
+    signal.signal(signal.SIGTERM, forward)
+    # Ctrl-C already reaches the whole process group.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    for process_ in processes:
+        process_.join()
+    return 1 if any(p.exitcode for p in processes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
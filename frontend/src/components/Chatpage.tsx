@@ -1,6 +1,8 @@
 import { useState, useRef, useEffect } from "react";
 import axios from "axios";
 
+const API_BASE = "https://sample-connection.onrender.com";
+
 type Sender = "agent" | "user" | "jd";
 
 interface Project {
@@ -30,7 +32,8 @@ interface JDJson {
 interface Message {
   sender: Sender;
   text?: string;
-  jdJson?: JDJson;
+  jdJson?: Partial<JDJson>;
+  streaming?: boolean;
 }
 
 interface QA {
@@ -44,7 +47,6 @@ export default function Chatpage() {
   ]);
 
   const [input, setInput] = useState("");
-  const [qaList, setQaList] = useState<QA[]>([]);
   const [currentField, setCurrentField] = useState<string | null>(null);
   const [inputType, setInputType] = useState<"string" | "array">("string");
   const [loading, setLoading] = useState(false);
@@ -72,6 +74,66 @@ export default function Chatpage() {
     chatEndRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages]);
 
+  // ======================
+  // SSE STREAM
+  // ======================
+  // Incremental mode: only this turn's answer is sent, the server keeps
+  // the session's earlier answers (no answer = "where was I?").
+  const streamChat = async (
+    answer: QA | null,
+    onEvent: (event: string, data: any) => void
+  ) => {
+    const res = await fetch(
+      `${API_BASE}/agent/chat/${employeeId}/${jdSessionId}/stream`,
+      {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(answer ? { answer } : { incremental: true })
+      }
+    );
+
+    if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+
+      let sep;
+      while ((sep = buffer.indexOf("\n\n")) !== -1) {
+        const frame = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+
+        let event = "message";
+        let data = "";
+        for (const line of frame.split("\n")) {
+          if (line.startsWith("event:")) event = line.slice(6).trim();
+          else if (line.startsWith("data:")) data += line.slice(5).trim();
+        }
+
+        if (data) onEvent(event, JSON.parse(data));
+      }
+    }
+  };
+
+  // Update the JD that is still streaming in, creating it on first field.
+  const updateStreamingJD = (
+    update: (jd: Partial<JDJson>) => Partial<JDJson>
+  ) => {
+    setMessages(prev => {
+      const last = prev[prev.length - 1];
+      if (last?.sender === "jd" && last.streaming) {
+        return [...prev.slice(0, -1), { ...last, jdJson: update(last.jdJson ?? {}) }];
+      }
+      return [...prev, { sender: "jd", streaming: true, jdJson: update({}) }];
+    });
+  };
+
   // ======================
   // SEND MESSAGE
   // ======================
@@ -86,42 +148,52 @@ export default function Chatpage() {
       parsed = input.split(",").map(v => v.trim()).filter(Boolean);
     }
 
-    const updatedQA =
-      currentField !== null
-        ? [...qaList, { field: currentField, answer: parsed }]
-        : qaList;
+    const answer =
+      currentField !== null ? { field: currentField, answer: parsed } : null;
 
-    setQaList(updatedQA);
     setInput("");
     setLoading(true);
 
     try {
-      const res = await axios.post(
-        `https://sample-connection.onrender.com/agent/chat/${employeeId}/${jdSessionId}`,
-        { qa: updatedQA }
-      );
-
-      const data = res.data;
-
-      if (data.type === "question") {
-        setCurrentField(data.field);
-        setInputType(data.input_type);
-
-        setMessages(prev => [
-          ...prev,
-          { sender: "agent", text: data.question }
-        ]);
-      }
-
-      if (data.type === "job_description") {
-        setGeneratedJD(data.jd_json);
-
-        setMessages(prev => [
-          ...prev,
-          { sender: "agent", text: "✅ Job Description Generated" },
-          { sender: "jd", jdJson: data.jd_json }
-        ]);
-      }
+      await streamChat(answer, (event, data) => {
+        if (event === "question") {
+          setCurrentField(data.field);
+          setInputType(data.input_type);
+
+          setMessages(prev => [
+            ...prev,
+            { sender: "agent", text: data.question }
+          ]);
+        }
+
+        if (event === "item") {
+          updateStreamingJD(jd => {
+            const items = ((jd as any)[data.field] ?? []) as string[];
+            return { ...jd, [data.field]: [...items, data.value] };
+          });
+        }
+
+        if (event === "field") {
+          updateStreamingJD(jd => ({ ...jd, [data.field]: data.value }));
+        }
+
+        if (event === "complete") {
+          setGeneratedJD(data.jd_json);
+
+          setMessages(prev => [
+            ...prev.filter(m => !m.streaming),
+            { sender: "agent", text: "✅ Job Description Generated" },
+            { sender: "jd", jdJson: data.jd_json }
+          ]);
+        }
+
+        if (event === "error") {
+          setMessages(prev => [
+            ...prev.filter(m => !m.streaming),
+            { sender: "agent", text: "❌ Backend error" }
+          ]);
+        }
+      });
 
     } catch {
       setMessages(prev => [
@@ -141,7 +213,7 @@ export default function Chatpage() {
 
     try {
       await axios.post(
-        `https://sample-connection.onrender.com/agent/approve/${employeeId}/${jdSessionId}`
+        `${API_BASE}/agent/approve/${employeeId}/${jdSessionId}`
       );
 
       setMessages(prev => [
@@ -177,20 +249,22 @@ export default function Chatpage() {
               <div>
                 <pre>{JSON.stringify(m.jdJson, null, 2)}</pre>
 
-                <button
-                  onClick={approveJD}
-                  style={{
-                    marginTop: 10,
-                    background: "green",
-                    color: "white",
-                    padding: "10px 20px",
-                    borderRadius: 6,
-                    border: "none",
-                    cursor: "pointer"
-                  }}
-                >
-                  ✅ Approve JD
-                </button>
+                {!m.streaming && (
+                  <button
+                    onClick={approveJD}
+                    style={{
+                      marginTop: 10,
+                      background: "green",
+                      color: "white",
+                      padding: "10px 20px",
+                      borderRadius: 6,
+                      border: "none",
+                      cursor: "pointer"
+                    }}
+                  >
+                    ✅ Approve JD
+                  </button>
+                )}
               </div>
             ) : (
               <span>{m.text}</span>